@@ -0,0 +1,161 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Worker-local snapshot of the catalog data stored in Redis.
+Values stored under 'modules-data', 'vendors-data' and 'all-catalog-data' keys
+are tens of MB of JSON, so each worker decodes them only once and keeps
+decoded data together with the catalog generation they belong to.
+Cache loader publishes new catalog generation every time catalog data are
+reloaded, so data are decoded again only after published generation changed.
+Indexes derived from decoded data are kept in the same snapshot, so they are
+also built only once per catalog generation.
+Gzip compressed variant of the data stored in Redis is kept the same way
+for the endpoints which pass the data to the client without decoding them.
+"""
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import collections
+import gzip
+import json
+from threading import RLock
+
+from utility.redisCatalog import current_generation, get_catalog_data
+
+
+class Snapshot:
+
+    def __init__(self, generation, data):
+        self.generation = generation
+        self.data = data
+        self.indexes = {}
+
+
+class CatalogCache:
+
+    def __init__(self, redis, resolve_generation=None):
+        """
+        Arguments:
+            :param redis                (Redis) Redis client used to get catalog data
+            :param resolve_generation   (function) function which resolves published catalog generation
+                                        - published generation is read from Redis by default
+        """
+        self.__redis = redis
+        self.__resolve_generation = resolve_generation or (lambda: current_generation(redis))
+        self.__lock = RLock()
+        self.__snapshots = {}
+        self.__compressed = {}
+
+    def generation(self):
+        """Get published generation of catalog data stored in Redis.
+        None is returned if cache loader did not publish any generation yet.
+        """
+        return self.__resolve_generation()
+
+    def raw(self, key: str):
+        """Get data stored in Redis under specified key in published generation without decoding them.
+        None is returned if no data or only empty JSON object is stored under specified key.
+        """
+        data = get_catalog_data(self.__redis, self.generation(), key)
+        if data == b'{}':
+            return None
+        return data
+
+    def get(self, key: str):
+        """Get decoded data stored in Redis under specified key.
+        Returned data are shared by all the requests handled by the worker, so they must not be modified.
+        Empty dictionary is returned if no data is stored under specified key.
+
+        Argument:
+            :param key  (str) Redis key under which catalog data are stored
+            :return decoded data from snapshot of current catalog generation
+            :rtype OrderedDict
+        """
+        return self.__snapshot(key).data
+
+    def index(self, key: str, name: str, builder):
+        """Get index built from decoded data stored in Redis under specified key.
+        Index is built only once per catalog generation and it is shared by all the requests
+        handled by the worker, so it must not be modified.
+
+        Arguments:
+            :param key      (str) Redis key under which catalog data are stored
+            :param name     (str) name of the index
+            :param builder  (function) function which creates index from decoded data
+            :return index created by builder from snapshot of current catalog generation
+        """
+        snapshot = self.__snapshot(key)
+        index = snapshot.indexes.get(name)
+        if index is None:
+            with self.__lock:
+                index = snapshot.indexes.get(name)
+                if index is None:
+                    index = builder(snapshot.data)
+                    snapshot.indexes[name] = index
+        return index
+
+    def compressed(self, key: str):
+        """Get gzip compressed data stored in Redis under specified key without decoding them.
+        Data are compressed only once per catalog generation.
+        None is returned if no data or only empty JSON object is stored under specified key.
+
+        Argument:
+            :param key  (str) Redis key under which catalog data are stored
+            :return gzip compressed data of current catalog generation
+            :rtype bytes
+        """
+        generation = self.generation()
+        if generation is None:
+            return self.__compress(get_catalog_data(self.__redis, None, key))
+        compressed = self.__compressed.get(key)
+        if compressed is not None and compressed[0] == generation:
+            return compressed[1]
+        with self.__lock:
+            compressed = self.__compressed.get(key)
+            if compressed is None or compressed[0] != generation:
+                compressed = (generation, self.__compress(get_catalog_data(self.__redis, generation, key)))
+                self.__compressed[key] = compressed
+        return compressed[1]
+
+    def __snapshot(self, key: str):
+        generation = self.generation()
+        if generation is None:
+            # Nothing to stamp snapshot with - always use data stored in Redis
+            return Snapshot(None, self.__decode(get_catalog_data(self.__redis, None, key)))
+        snapshot = self.__snapshots.get(key)
+        if snapshot is not None and snapshot.generation == generation:
+            return snapshot
+        with self.__lock:
+            # Other thread might have already decoded the same generation while we were waiting for lock
+            snapshot = self.__snapshots.get(key)
+            if snapshot is None or snapshot.generation != generation:
+                snapshot = Snapshot(generation, self.__decode(get_catalog_data(self.__redis, generation, key)))
+                self.__snapshots[key] = snapshot
+        return snapshot
+
+    def __compress(self, data):
+        if data is None or data == b'{}':
+            return None
+        return gzip.compress(data)
+
+    def __decode(self, data):
+        if data is None:
+            data = '{}'
+        else:
+            data = data.decode('utf-8')
+        return json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode(data)
@@ -0,0 +1,136 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local snapshot of the catalog last loaded from ConfD. Catalog is recorded
+to the snapshot file while it is streamed from ConfD and the snapshot is
+replaced only after the whole catalog was loaded successfully. When Redis
+does not contain any catalog yet, it is seeded from the memory mapped
+snapshot, so API can respond before the catalog is loaded from ConfD again.
+"""
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import mmap
+import os
+import tempfile
+
+
+class CatalogSnapshot:
+
+    def __init__(self, path: str):
+        """
+        Arguments:
+            :param path     (str) path to the snapshot file
+        """
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def record(self, chunks):
+        """Record chunks of the catalog to the temporary file of its own while they are iterated.
+        Each call is independent of the others, so workers loading the catalog at the same time
+        never write to the same file.
+
+        Argument:
+            :param chunks   (iterable) chunks of the catalog in bytes
+            :return SnapshotRecording iterating the same chunks
+        """
+        return SnapshotRecording(self.path, chunks)
+
+    def read(self, chunk_size: int = 1 << 20):
+        """Yield chunks of the memory mapped snapshot. OSError is raised if snapshot can not be read.
+
+        Argument:
+            :param chunk_size   (int) size of the chunks in bytes
+            :return generator of the chunks in bytes
+        """
+        with open(self.path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as snapshot:
+                for start in range(0, len(snapshot), chunk_size):
+                    yield snapshot[start:start + chunk_size]
+
+
+class SnapshotRecording:
+    """Catalog chunks written to the temporary file while they are iterated."""
+
+    def __init__(self, path: str, chunks):
+        """
+        Arguments:
+            :param path     (str) path to the snapshot file replaced by the recording
+            :param chunks   (iterable) chunks of the catalog in bytes
+        """
+        self.path = path
+        self.__chunks = chunks
+        self.__temp_path = None
+        self.__recorded = False
+
+    def __iter__(self):
+        """Yield the chunks and write them to the temporary file at the same time.
+        Recording is stopped without affecting the chunks if the file can not be written.
+        """
+        self.discard()
+        try:
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            fd, self.__temp_path = tempfile.mkstemp(prefix='{}.'.format(os.path.basename(self.path)),
+                                                    suffix='.tmp', dir=directory)
+            f = os.fdopen(fd, 'wb')
+        except OSError:
+            f = None
+        try:
+            for chunk in self.__chunks:
+                if f is not None:
+                    try:
+                        f.write(chunk)
+                    except OSError:
+                        f.close()
+                        f = None
+                yield chunk
+            self.__recorded = f is not None
+        finally:
+            if f is not None:
+                f.close()
+
+    def save(self) -> bool:
+        """Replace the snapshot by the recorded catalog if it was recorded completely.
+
+        :return True if the snapshot was replaced
+        """
+        if not self.__recorded:
+            self.discard()
+            return False
+        # Temporary files are created readable only by the owner
+        os.chmod(self.__temp_path, 0o644)
+        os.replace(self.__temp_path, self.path)
+        self.__temp_path = None
+        self.__recorded = False
+        return True
+
+    def discard(self):
+        """Delete the recorded catalog."""
+        self.__recorded = False
+        if self.__temp_path is None:
+            return
+        try:
+            os.remove(self.__temp_path)
+        except FileNotFoundError:
+            pass
+        self.__temp_path = None
@@ -0,0 +1,112 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Persistent cache of the pyang --check-update-from results.
+Module files in save-file-dir are never changed once they are saved, so
+formatted errors found by pyang for a pair of module files are stored
+on disk under the hashes of both module files and the pyang version.
+Cache is shared by /services/.../check-update-from endpoint and by
+semantic version resolution of the populate script.
+"""
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import hashlib
+import os
+
+import pyang
+from pyang import error
+from utility.util import context_check_update_from
+
+
+class CheckUpdateFromCache:
+
+    def __init__(self, cache_dir: str):
+        """
+        Arguments:
+            :param cache_dir    (str) directory where results of the comparisons are stored
+        """
+        self.cache_dir = cache_dir
+
+    def key(self, old_schema: str, new_schema: str) -> str:
+        """Create cache key from the content of both yang files and pyang version.
+        OSError is raised if any of the yang files can not be read.
+
+        Arguments:
+            :param old_schema   (str) full path to the yang file with older revision
+            :param new_schema   (str) full path to the yang file with newer revision
+            :return key under which result of the comparison is cached
+        """
+        return '{}-{}-{}'.format(file_hash(old_schema), file_hash(new_schema), pyang.__version__)
+
+    def get(self, key: str):
+        """Get formatted errors stored under specified key. None is returned if result is not cached."""
+        try:
+            with open(self.__path(key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, errors: str):
+        """Store formatted errors under specified key."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.__path(key)
+        # Write to temporary file first, so other processes never read partially written result
+        temp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(errors)
+        os.replace(temp_path, path)
+
+    def check_update_from(self, old_schema: str, new_schema: str, yang_models: str, save_file_dir: str) -> str:
+        """Get formatted errors found by pyang --check-update-from from cache or perform validation
+        and store its result in cache.
+
+        Arguments:
+            :param old_schema       (str) full path to the yang file with older revision
+            :param new_schema       (str) full path to the yang file with newer revision
+            :param yang_models      (str) path to the directory where YangModels/yang repo is cloned
+            :param save_file_dir    (str) path to the directory where all the yang files are saved
+            :return formatted errors - empty string if no error was found
+        """
+        key = self.key(old_schema, new_schema)
+        errors = self.get(key)
+        if errors is None:
+            ctx, _ = context_check_update_from(old_schema, new_schema, yang_models, save_file_dir)
+            errors = format_errors(ctx)
+            self.set(key, errors)
+        return errors
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, '{}.txt'.format(key))
+
+
+def file_hash(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        sha256.update(f.read())
+    return sha256.hexdigest()
+
+
+def format_errors(ctx) -> str:
+    """Format errors found by pyang, one error per line."""
+    errors = []
+    for ctx_err in ctx.errors:
+        ref = '{}:{}:'.format(ctx_err[0].ref, ctx_err[0].line)
+        err_message = error.err_to_str(ctx_err[1], ctx_err[2])
+        errors.append('{} {}\n'.format(ref, err_message))
+    return ''.join(errors)
@@ -0,0 +1,104 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Side-by-side diffs of the yang files and yang trees created in-process.
+Diffs are rendered to HTML by difflib and the rendered HTML is kept
+in worker-local cache under the hashes of the two compared contents,
+so the same two files are diffed only once. Least recently used diffs
+are evicted once the cache contains more than the maximum number of entries.
+HtmlDiff is pure Python and blocks the worker while it renders. It compares
+each pair of lines of the replaced blocks to find intraline changes, so the
+diff is rendered as unified diff without them if the replaced blocks or the
+files are too large. Only the changed lines with their context are shown
+for large files.
+"""
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import collections
+import difflib
+import hashlib
+import html
+from threading import Lock
+
+# Files with more lines are shown only with the context of the changed lines
+full_diff_lines = 2000
+# Files with more lines are shown as unified diff
+max_side_by_side_lines = 20000
+# Maximum number of line pairs of the replaced blocks compared by HtmlDiff - 50 x 50 lines take about 0.5 seconds
+max_compared_lines = 2500
+context_lines = 5
+
+
+class DiffCache:
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Arguments:
+            :param max_entries  (int) maximum number of diffs kept in the cache
+        """
+        self.max_entries = max_entries
+        self.__lock = Lock()
+        self.__diffs = collections.OrderedDict()
+
+    def get(self, key: tuple):
+        """Get rendered diff stored under specified key. None is returned if diff is not cached."""
+        with self.__lock:
+            html = self.__diffs.get(key)
+            if html is not None:
+                self.__diffs.move_to_end(key)
+            return html
+
+    def set(self, key: tuple, html: str):
+        """Store rendered diff under specified key and evict least recently used diffs if cache is full."""
+        with self.__lock:
+            self.__diffs[key] = html
+            self.__diffs.move_to_end(key)
+            while len(self.__diffs) > self.max_entries:
+                self.__diffs.popitem(last=False)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def render_diff(text1: str, text2: str, description1: str, description2: str) -> str:
+    """Render side-by-side diff of two texts to HTML page.
+
+    Arguments:
+        :param text1            (str) content of the first file
+        :param text2            (str) content of the second file
+        :param description1     (str) description of the first file shown in the header
+        :param description2     (str) description of the second file shown in the header
+        :return HTML page with the diff
+    """
+    lines1 = text1.splitlines()
+    lines2 = text2.splitlines()
+    size = max(len(lines1), len(lines2))
+    if size > max_side_by_side_lines or compared_lines(lines1, lines2) > max_compared_lines:
+        diff = difflib.unified_diff(lines1, lines2, description1, description2, n=context_lines, lineterm='')
+        return '<html><body><pre>{}</pre></body></html>'.format(html.escape('\n'.join(diff)))
+    html_diff = difflib.HtmlDiff(tabsize=4)
+    return html_diff.make_file(lines1, lines2, description1, description2,
+                               context=size > full_diff_lines, numlines=context_lines)
+
+
+def compared_lines(lines1: list, lines2: list) -> int:
+    """Count pairs of the lines HtmlDiff compares to find intraline changes of the replaced blocks."""
+    opcodes = difflib.SequenceMatcher(None, lines1, lines2).get_opcodes()
+    return sum((i2 - i1) * (j2 - j1) for tag, i1, i2, j1, j2 in opcodes if tag == 'replace')
@@ -0,0 +1,133 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Worker-local cache of the decoded module documents. Modules are cached
+under the catalog generation they were read from, so module of the newly
+published generation is never served from the cache of the old one.
+Publisher of the new generation sends message to the catalog channel and
+all the workers drop their cached modules at once instead of waiting for
+them to be evicted. Least recently used modules are evicted once the
+cache contains more than the maximum number of entries.
+"""
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import collections
+import json
+import os
+import threading
+
+from utility.redisCatalog import get_module
+from utility.staticVariables import redis_catalog_channel
+
+
+class ModuleCache:
+
+    def __init__(self, redis, resolve_generation, max_entries: int = 512):
+        """
+        Arguments:
+            :param redis                (Redis) Redis client
+            :param resolve_generation   (function) returns catalog generation the modules are read from
+            :param max_entries          (int) maximum number of modules kept in the cache
+        """
+        self.__redis = redis
+        self.__resolve_generation = resolve_generation
+        self.max_entries = max_entries
+        self.__modules = collections.OrderedDict()
+        self.__lock = threading.Lock()
+        self.__subscribed_pid = None
+        self.__subscriber = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str):
+        """Get decoded module stored under name@revision/organization key. None is returned if module does not exist.
+        Returned module is a shallow copy - its top-level keys can be changed, but nested data are shared.
+        """
+        self.__subscribe()
+        cache_key = (self.__resolve_generation(), key)
+        with self.__lock:
+            module = self.__modules.get(cache_key)
+            if module is not None:
+                self.__modules.move_to_end(cache_key)
+                self.hits += 1
+                return collections.OrderedDict(module)
+            self.misses += 1
+        module_data = get_module(self.__redis, cache_key[0], key)
+        if module_data is None:
+            return None
+        module = json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode(module_data.decode('utf-8'))
+        with self.__lock:
+            self.__modules[cache_key] = module
+            while len(self.__modules) > self.max_entries:
+                self.__modules.popitem(last=False)
+        return collections.OrderedDict(module)
+
+    def invalidate(self):
+        """Drop all the cached modules."""
+        with self.__lock:
+            self.__modules.clear()
+            self.invalidations += 1
+
+    def set_redis(self, redis):
+        """Read modules using new Redis client, e.g. after configuration was reloaded.
+        Subscriber of the old client is stopped and all the cached modules are dropped.
+        """
+        self.close()
+        self.__redis = redis
+        self.invalidate()
+
+    def close(self):
+        """Stop the subscriber thread of this worker. It is started again on the next use."""
+        with self.__lock:
+            subscriber = self.__subscriber if self.__subscribed_pid == os.getpid() else None
+            self.__subscriber = None
+            self.__subscribed_pid = None
+        if subscriber is not None:
+            # Unsubscribes and closes connection of the subscriber
+            subscriber.stop()
+            subscriber.join(timeout=5)
+
+    def statistics(self) -> dict:
+        with self.__lock:
+            return {
+                'pid': os.getpid(),
+                'entries': len(self.__modules),
+                'max-entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations
+            }
+
+    def __subscribe(self):
+        # Subscriber thread does not survive fork of the worker, so it is started in each worker on first use
+        if self.__subscribed_pid == os.getpid():
+            return
+        with self.__lock:
+            if self.__subscribed_pid == os.getpid():
+                return
+            self.__subscribed_pid = os.getpid()
+            self.__modules.clear()
+        try:
+            pubsub = self.__redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{redis_catalog_channel: lambda message: self.invalidate()})
+            self.__subscriber = pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except Exception:
+            # Modules are cached per generation, so the cache stays correct without the invalidation messages
+            pass
@@ -0,0 +1,227 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Persistent cache of the yang trees rendered by /services/tree endpoint.
+Module files in save-file-dir are never changed once they are saved, so
+rendered HTML is stored on disk under the hash of the module file content
+and the pyang version which rendered it. Least recently used trees are
+evicted once the cache contains more than the maximum number of entries,
+down to 90% of it, so the cache directory is scanned once per batch of stores.
+Cache can be filled in bulk after populate script added new modules.
+"""
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import hashlib
+import io
+import os
+
+import jinja2
+import pyang
+from pyang import plugin
+from pyang.plugins.tree import emit_tree
+from utility.util import get_curr_dir
+from utility.yangParser import create_context
+
+
+class TreeCache:
+
+    def __init__(self, cache_dir: str, max_entries: int = 20000):
+        """
+        Arguments:
+            :param cache_dir    (str) directory where rendered trees are stored
+            :param max_entries  (int) maximum number of trees kept in the cache
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        # Number of trees kept after eviction
+        self.low_water = int(max_entries * 0.9)
+        # Running number of cached trees, counted by scanning the cache directory only when it may be full
+        self.__entries = None
+
+    def key(self, path_to_yang: str) -> str:
+        """Create cache key from the content of the yang file and pyang version.
+        OSError is raised if yang file can not be read.
+
+        Argument:
+            :param path_to_yang     (str) path to the yang file
+            :return key under which rendered tree of the yang file is cached
+        """
+        file_hash = hashlib.sha256()
+        with open(path_to_yang, 'rb') as f:
+            file_hash.update(f.read())
+        return '{}-{}'.format(file_hash.hexdigest(), pyang.__version__)
+
+    def get(self, key: str):
+        """Get rendered tree stored under specified key. None is returned if tree is not cached.
+        Modification time of the cached tree is updated, so recently used trees are not evicted.
+        """
+        path = self.__path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                html = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return html
+
+    def set(self, key: str, html: str, evict: bool = True):
+        """Store rendered tree under specified key and evict least recently used trees if cache is full.
+
+        Arguments:
+            :param key      (str) key of the rendered tree
+            :param html     (str) rendered tree
+            :param evict    (bool) whether to evict trees now - set to False when many trees are stored at once
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.__path(key)
+        new_entry = not os.path.exists(path)
+        # Write to temporary file first, so other workers never read partially written tree
+        temp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(temp_path, path)
+        if new_entry and self.__entries is not None:
+            self.__entries += 1
+        if evict:
+            self.__evict_if_full()
+
+    def get_or_render(self, path_to_yang: str, yang_models: str, save_file_dir: str) -> str:
+        """Get rendered tree of the yang file from cache or render it and store it in cache.
+        OSError is raised if yang file can not be read.
+
+        Arguments:
+            :param path_to_yang     (str) path to the yang file
+            :param yang_models      (str) path to the directory with yang modules from GitHub
+            :param save_file_dir    (str) path to the directory where all the modules are saved
+            :return preformatted HTML with tree of the yang file
+        """
+        key = self.key(path_to_yang)
+        html = self.get(key)
+        if html is None:
+            html = render_tree(path_to_yang, yang_models, save_file_dir)
+            self.set(key, html)
+        return html
+
+    def prefill(self, paths: list, yang_models: str, save_file_dir: str, LOGGER=None):
+        """Render trees of all the yang files which are not cached yet.
+
+        Arguments:
+            :param paths            (list) paths to the yang files
+            :param yang_models      (str) path to the directory with yang modules from GitHub
+            :param save_file_dir    (str) path to the directory where all the modules are saved
+            :param LOGGER           (obj) formated logger with the specified name
+            :return number of newly rendered trees
+        """
+        rendered = 0
+        for path_to_yang in paths:
+            try:
+                key = self.key(path_to_yang)
+                if os.path.exists(self.__path(key)):
+                    continue
+                self.set(key, render_tree(path_to_yang, yang_models, save_file_dir), evict=False)
+                rendered += 1
+            except Exception as e:
+                if LOGGER is not None:
+                    LOGGER.warning('Could not render tree of {}: {}'.format(path_to_yang, e))
+        if rendered > 0:
+            self.__evict_if_full()
+        return rendered
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, '{}.html'.format(key))
+
+    def __evict_if_full(self):
+        # Other workers store trees too, so the directory is scanned again once the running count is over the limit
+        if self.__entries is None or self.__entries > self.max_entries:
+            self.__evict()
+
+    def __evict(self):
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.html')]
+        if len(entries) <= self.max_entries:
+            self.__entries = len(entries)
+            return
+        self.__entries = self.low_water
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.low_water]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                # Already evicted by other worker
+                pass
+
+
+def render_tree(path_to_yang: str, yang_models: str, save_file_dir: str) -> str:
+    """Render yang tree of the yang file to HTML.
+    OSError is raised if yang file can not be read.
+
+    Arguments:
+        :param path_to_yang     (str) path to the yang file
+        :param yang_models      (str) path to the directory with yang modules from GitHub
+        :param save_file_dir    (str) path to the directory where all the modules are saved
+        :return preformatted HTML with tree of the yang file
+    """
+    stdout, errors = create_module_tree(path_to_yang, yang_models, save_file_dir)
+    if stdout == '' and len(errors) != 0:
+        message = 'This yang file contains major errors and therefore tree can not be created.'
+        return render_template('danger.html', {'danger_message': message})
+    elif stdout != '' and len(errors) != 0:
+        message = 'This yang file contains some errors, but tree was created.'
+        return render_template('warning.html', {'warn_text': stdout, 'warn_message': message})
+    elif stdout == '' and len(errors) == 0:
+        return render_template('info.html', {})
+    else:
+        return '<html><body><pre>{}</pre></body></html>'.format(stdout)
+
+
+def create_module_tree(path_to_yang: str, yang_models: str, save_file_dir: str):
+    """Create yang tree of the yang file using pyang tree plugin.
+    OSError is raised if yang file can not be read.
+
+    Arguments:
+        :param path_to_yang     (str) path to the yang file
+        :param yang_models      (str) path to the directory with yang modules from GitHub
+        :param save_file_dir    (str) path to the directory where all the modules are saved
+        :return tuple of the yang tree and list of the pyang errors
+    """
+    plugin.plugins = []
+    plugin.init([])
+    ctx = create_context('{}:{}'.format(yang_models, save_file_dir))
+    ctx.opts.lint_namespace_prefixes = []
+    ctx.opts.lint_modulename_prefixes = []
+
+    for p in plugin.plugins:
+        p.setup_ctx(ctx)
+    with open(path_to_yang, 'r') as f:
+        a = ctx.add_module(path_to_yang, f.read())
+    if ctx.opts.tree_path is not None:
+        path = ctx.opts.tree_path.split('/')
+        if path[0] == '':
+            path = path[1:]
+    else:
+        path = None
+
+    ctx.validate()
+    f = io.StringIO()
+    emit_tree(ctx, [a], f, ctx.opts.tree_depth, ctx.opts.tree_line_length, path)
+    return f.getvalue(), ctx.errors
+
+
+def render_template(filename: str, context: dict) -> str:
+    path = os.path.join(get_curr_dir(__file__), '../template')
+    return jinja2.Environment(loader=jinja2.FileSystemLoader(path)).get_template(filename).render(context)
@@ -22,13 +22,17 @@ import time
 from threading import Lock
 
 import redis
-
+from api.cache.catalogCache import CatalogCache
+from api.cache.catalogSnapshot import CatalogSnapshot
+from api.cache.checkUpdateFromCache import CheckUpdateFromCache
+from api.cache.diffCache import DiffCache
+from api.cache.moduleCache import ModuleCache
+from api.cache.treeCache import TreeCache
+from api.sender import Sender
 from elasticsearch import Elasticsearch
-
+from flask import g, has_request_context
 from utility import log
-
-
-from api.sender import Sender
+from utility.redisCatalog import current_generation
 
 if sys.version_info >= (3, 4):
     import configparser as ConfigParser
@@ -127,6 +131,12 @@ class YangCatalogApiGlobalConfig():
             host=self.redis_host,
             port=self.redis_port)
         self.check_wait_redis_connected()
+        self.catalog_cache = CatalogCache(self.redis, self.catalog_generation)
+        self.tree_cache = TreeCache('{}/trees'.format(self.cache_dir))
+        self.diff_cache = DiffCache()
+        self.check_update_from_cache = CheckUpdateFromCache('{}/check-update-from'.format(self.cache_dir))
+        self.catalog_snapshot = CatalogSnapshot('{}/catalog-snapshot.json'.format(self.cache_dir))
+        self.module_cache = ModuleCache(self.redis, self.catalog_generation)
 
     def load_config(self):
         self.config_path = '/etc/yangcatalog/yangcatalog.conf'
@@ -195,6 +205,7 @@ class YangCatalogApiGlobalConfig():
         rabbitmq_username = config.get('RabbitMQ-Section', 'username', fallback='guest')
         rabbitmq_password = config.get('Secrets-Section', 'rabbitMq-password', fallback='guest')
         self.LOGGER = log.get_logger('api', '{}/yang.log'.format(self.logs_dir))
+        self.sender.close()
         self.sender = Sender(self.logs_dir, self.temp_dir,
                              rabbitmq_host=rabbitmq_host,
                              rabbitmq_port=rabbitmq_port,
@@ -213,6 +224,23 @@ class YangCatalogApiGlobalConfig():
             host=self.redis_host,
             port=self.redis_port)
         self.check_wait_redis_connected()
+        self.catalog_cache = CatalogCache(self.redis, self.catalog_generation)
+        self.tree_cache = TreeCache('{}/trees'.format(self.cache_dir))
+        self.diff_cache = DiffCache()
+        self.check_update_from_cache = CheckUpdateFromCache('{}/check-update-from'.format(self.cache_dir))
+        self.catalog_snapshot = CatalogSnapshot('{}/catalog-snapshot.json'.format(self.cache_dir))
+        # Reused, so subscriber thread and Redis connection of the old cache are not leaked
+        self.module_cache.set_redis(self.redis)
+
+    def catalog_generation(self):
+        """Get catalog generation published in Redis. Generation is resolved only once per request,
+        so all the catalog data read while handling the request belong to the same generation.
+        """
+        if not has_request_context():
+            return current_generation(self.redis)
+        if 'catalog_generation' not in g:
+            g.catalog_generation = current_generation(self.redis)
+        return g.catalog_generation
 
     def check_wait_redis_connected(self):
         while not self.redis.ping():
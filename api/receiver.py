@@ -34,13 +34,14 @@ __email__ = "miroslav.kovac@pantheon.tech"
 
 import argparse
 import errno
+import functools
 import json
 import logging
-import multiprocessing
 import os
 import shutil
 import subprocess
 import sys
+import threading
 import time
 from datetime import datetime
 from distutils.dir_util import copy_tree
@@ -48,12 +49,16 @@ from distutils.dir_util import copy_tree
 import pika
 import requests
 import utility.log as log
+from api.cache.checkUpdateFromCache import CheckUpdateFromCache
+from api.workerPool import CRASHED, FAILED, TIMED_OUT, WorkerPool
 from parseAndPopulate.modulesComplicatedAlgorithms import \
     ModulesComplicatedAlgorithms
 from utility import messageFactory
+from utility.jobStore import JobStore
 
 from utility.util import prepare_to_indexing, send_to_indexing2
-from utility.staticVariables import confd_headers, json_headers
+from utility.staticVariables import (confd_headers, dead_letter_queue,
+                                     job_queues, json_headers)
 
 
 if sys.version_info >= (3, 4):
@@ -85,7 +90,15 @@ class Receiver:
         self.__rabbitmq_host = config.get('RabbitMQ-Section', 'host', fallback='127.0.0.1')
         self.__rabbitmq_port = int(config.get('RabbitMQ-Section', 'port', fallback='5672'))
         self.__rabbitmq_virtual_host = config.get('RabbitMQ-Section', 'virtual-host', fallback='/')
-
+        # Number of the workers dedicated to the jobs of each priority class
+        self.__workers = {
+            'interactive': int(config.get('RabbitMQ-Section', 'interactive-workers', fallback='1')),
+            'normal': int(config.get('RabbitMQ-Section', 'workers', fallback='2')),
+            'bulk': int(config.get('RabbitMQ-Section', 'bulk-workers', fallback='1'))
+        }
+        self.__job_timeout = int(config.get('RabbitMQ-Section', 'job-timeout', fallback='21600'))
+
+        self.__cache_dir = config.get('Directory-Section', 'cache')
         self.__changes_cache_dir = config.get('Directory-Section', 'changes-cache')
         self.__delete_cache_dir = config.get('Directory-Section', 'delete-cache')
         self.__lock_file = config.get('Directory-Section', 'lock')
@@ -95,6 +108,7 @@ class Receiver:
         self.LOGGER = log.get_logger('receiver', self.__log_directory + '/yang.log')
         logging.getLogger('pika').setLevel(logging.INFO)
         self.temp_dir = config.get('Directory-Section', 'temp')
+        self.__jobs = JobStore(self.temp_dir)
         self.__confd_credentials = config.get('Secrets-Section', 'confd-credentials').strip('"').split()
 
         self.LOGGER.info('Starting receiver')
@@ -116,6 +130,10 @@ class Receiver:
             password=rabbitmq_password)
         self.channel = None
         self.connection = None
+        self.__pools = {}
+        # Latest delivery of each job which is queued or running in the pools, by its correlation id
+        self.__in_flight = {}
+        self.__in_flight_lock = threading.Lock()
 
     def copytree(self, src, dst):
         for item in os.listdir(src):
@@ -521,12 +539,20 @@ class Receiver:
         self.__rabbitmq_host = config.get('RabbitMQ-Section', 'host', fallback='127.0.0.1')
         self.__rabbitmq_port = int(config.get('RabbitMQ-Section', 'port', fallback='5672'))
         self.__rabbitmq_virtual_host = config.get('RabbitMQ-Section', 'virtual-host', fallback='/')
+        # Number of the workers dedicated to the jobs of each priority class
+        self.__workers = {
+            'interactive': int(config.get('RabbitMQ-Section', 'interactive-workers', fallback='1')),
+            'normal': int(config.get('RabbitMQ-Section', 'workers', fallback='2')),
+            'bulk': int(config.get('RabbitMQ-Section', 'bulk-workers', fallback='1'))
+        }
+        self.__job_timeout = int(config.get('RabbitMQ-Section', 'job-timeout', fallback='21600'))
         rabbitmq_username = config.get('RabbitMQ-Section', 'username', fallback='guest')
         rabbitmq_password = config.get('Secrets-Section', 'rabbitMq-password', fallback='guest')
         self.__log_directory = config.get('Directory-Section', 'logs')
         self.LOGGER = log.get_logger('receiver', self.__log_directory + '/yang.log')
         logging.getLogger('pika').setLevel(logging.INFO)
         self.temp_dir = config.get('Directory-Section', 'temp')
+        self.__jobs = JobStore(self.temp_dir)
 
         if self.__notify_indexing == 'True':
             self.__notify_indexing = True
@@ -543,19 +569,75 @@ class Receiver:
         self.__rabbitmq_credentials = pika.PlainCredentials(
             username=rabbitmq_username,
             password=rabbitmq_password)
-        try:
-            self.channel.close()
-        except Exception:
-            pass
-        try:
-            self.connection.close()
-        except Exception:
-            pass
         self.LOGGER.info('config reloaded succesfully')
 
-    def on_request(self, ch, method, props, body):
-        process_reload_cache = multiprocessing.Process(target=self.on_request_thread_safe, args=(ch, method, props, body,))
-        process_reload_cache.start()
+    def on_request(self, ch, method, props, body, priority='normal'):
+        """Pass the message to the pool of workers of its priority class. Message is acknowledged
+        only after its job is over, so it is delivered again if receiver stops before that. Message
+        which killed its worker or did not finish in time is moved to the dead letter queue.
+        """
+        if body == b'reload_config':
+            try:
+                self.load_config()
+                # Workers are replaced, so they are forked with the reloaded configuration
+                for pool in self.__pools.values():
+                    pool.recycle()
+                final_response = self.__response_type[1]
+            except Exception as e:
+                self.LOGGER.exception('Reloading config failed')
+                final_response = '{}#split#Could not reload config: {}'.format(self.__response_type[0], e)
+            self.__jobs.set(props.correlation_id, final_response)
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+            return
+        # Jobs without correlation id are never considered to be the same
+        job = props.correlation_id if props.correlation_id is not None else object()
+        with self.__in_flight_lock:
+            running = job in self.__in_flight
+            self.__in_flight[job] = (self.connection, ch, method)
+        if running:
+            # Message was delivered again after the channel was closed while its job is still queued
+            # or running, so only the new delivery is acknowledged once the job is over
+            self.LOGGER.warning('Job {} delivered again while it is in progress'.format(props.correlation_id))
+            return
+        done = functools.partial(self.__job_done, job, props, body)
+        self.__pools[priority].submit((props, body), done)
+
+    def __process_job(self, task):
+        props, body = task
+        # Message is delivered again if channel was closed before the job was acknowledged
+        if self.__jobs.get(props.correlation_id) not in (None, 'In progress'):
+            self.LOGGER.info('Job {} is already finished'.format(props.correlation_id))
+            return
+        self.on_request_thread_safe(None, None, props, body)
+
+    def __job_done(self, job, props, body, outcome, result):
+        with self.__in_flight_lock:
+            connection, ch, method = self.__in_flight.pop(job)
+        if outcome in (TIMED_OUT, CRASHED):
+            self.__jobs.set(props.correlation_id, '{}#split#Job {}'.format(self.__response_type[0], outcome))
+            callback = functools.partial(self.__dead_letter, ch, method, props, body, outcome)
+        else:
+            if outcome == FAILED:
+                self.LOGGER.error('Job {} failed with {}'.format(props.correlation_id, result))
+                self.__jobs.set(props.correlation_id, self.__response_type[0])
+            callback = functools.partial(self.__acknowledge, ch, method)
+        try:
+            # Channel can be used only from the thread consuming the messages
+            connection.add_callback_threadsafe(callback)
+        except pika.exceptions.AMQPError:
+            self.LOGGER.warning('Connection closed before job {} was acknowledged'.format(props.correlation_id))
+
+    def __acknowledge(self, ch, method):
+        if ch.is_open:
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+
+    def __dead_letter(self, ch, method, props, body, reason):
+        if not ch.is_open:
+            return
+        self.LOGGER.error('Moving job {} to the dead letter queue, job {}'.format(props.correlation_id, reason))
+        properties = pika.BasicProperties(correlation_id=props.correlation_id, headers={'reason': reason})
+        ch.basic_publish(exchange='', routing_key=dead_letter_queue, body=body, properties=properties)
+        ch.basic_ack(delivery_tag=method.delivery_tag)
 
     def on_request_thread_safe(self, ch, method, props, body):
         """Function called when something was sent from API sender. This function
@@ -576,8 +658,6 @@ class Receiver:
             if body == 'run_ietf':
                 self.LOGGER.info('Running all ietf and openconfig modules')
                 final_response = self.run_ietf()
-            elif body == 'reload_config':
-                self.load_config()
             elif 'run_ping' == arguments[0]:
                 final_response = self.run_ping(arguments[1])
             elif 'run_script' == arguments[0]:
@@ -643,12 +723,13 @@ class Receiver:
                     if all_modules:
                         self.LOGGER.info('Running ModulesComplicatedAlgorithms from receiver.py script')
                         confd_prefix = '{}://{}:{}'.format(self.__confd_protocol, self.__confd_ip, self.__confd_port)
+                        check_update_from_cache = CheckUpdateFromCache('{}/check-update-from'.format(self.__cache_dir))
                         complicated_algorithms = ModulesComplicatedAlgorithms(self.__log_directory,
                                                                               self.__yangcatalog_api_prefix,
                                                                               self.__confd_credentials, confd_prefix,
                                                                               self.__save_file_dir, direc,
                                                                               all_modules, self.__yang_models,
-                                                                              self.temp_dir)
+                                                                              self.temp_dir, check_update_from_cache)
                         complicated_algorithms.parse_non_requests()
                         complicated_algorithms.parse_requests()
                         complicated_algorithms.populate()
@@ -658,21 +739,12 @@ class Receiver:
         self.LOGGER.info('Receiver is done with id - {} and message = {}'
                          .format(props.correlation_id, str(final_response)))
 
-        f = open('{}/correlation_ids'.format(self.temp_dir), 'r')
-        lines = f.readlines()
-        f.close()
-        with open('{}/correlation_ids'.format(self.temp_dir), 'w') as f:
-            for line in lines:
-                if props.correlation_id in line:
-                    new_line = '{} -- {} - {}\n'.format(datetime.now()
-                                                        .ctime(),
-                                                        props.correlation_id,
-                                                        str(final_response))
-                    f.write(new_line)
-                else:
-                    f.write(line)
+        self.__jobs.set(props.correlation_id, str(final_response))
 
     def start_receiving(self):
+        for priority, workers in self.__workers.items():
+            self.__pools[priority] = WorkerPool(self.__process_job, workers, self.__job_timeout, self.LOGGER,
+                                                'receiver-{}'.format(priority))
         while True:
             try:
                 self.connection = pika.BlockingConnection(pika.ConnectionParameters(
@@ -681,10 +753,12 @@ class Receiver:
                     heartbeat=10,
                     credentials=self.__rabbitmq_credentials))
                 self.channel = self.connection.channel()
-                self.channel.queue_declare(queue='module_queue')
-
-                self.channel.basic_qos(prefetch_count=1)
-                self.channel.basic_consume('module_queue', self.on_request, auto_ack=True)
+                self.channel.queue_declare(queue=dead_letter_queue)
+                for priority, queue in job_queues.items():
+                    self.channel.queue_declare(queue=queue)
+                    # Each worker gets at most one unacknowledged message of its own priority class
+                    self.channel.basic_qos(prefetch_count=self.__workers[priority])
+                    self.channel.basic_consume(queue, functools.partial(self.on_request, priority=priority))
 
                 self.LOGGER.info('Awaiting RPC request')
 
@@ -34,14 +34,17 @@ __copyright__ = "Copyright 2018 Cisco and its affiliates, Copyright The IETF Tru
 __license__ = "Apache License, Version 2.0"
 __email__ = "miroslav.kovac@pantheon.tech"
 
-import datetime
 import logging
+import os
+import threading
 import time
 import uuid
 
 import pika
 
 import utility.log as log
+from utility.jobStore import JobStore
+from utility.staticVariables import job_queues
 
 
 class Sender:
@@ -50,7 +53,8 @@ class Sender:
                  rabbitmq_port=None,
                  rabbitmq_virtual_host=None,
                  rabbitmq_username='guest',
-                 rabbitmq_password='guest'):
+                 rabbitmq_password='guest',
+                 connection_factory=None):
         self.LOGGER = log.get_logger('sender', log_directory + '/yang.log')
         logging.getLogger('pika').setLevel(logging.INFO)
         self.LOGGER.debug('Initializing sender')
@@ -62,10 +66,18 @@ class Sender:
         self.__credentials = pika.PlainCredentials(
             username=rabbitmq_username,
             password=rabbitmq_password)
-        # Let try to connect to RabbitMQ until success..
+        self.__connection_factory = connection_factory or self.__connect
+        # One connection, channel and lock per worker, created on first send and shared by its threads and greenlets
+        self.__connection = None
+        self.__channel = None
+        self.__pid = None
+        self.__lock = None
+        # Held only while the lock is created, never while waiting for I/O, so it can not block greenlets
+        self.__lock_guard = threading.Lock()
 
         self.__temp_dir = temp_dir
-        self.__response_file = 'correlation_ids'
+        # Short busy timeout, since waiting for the store blocks the whole gevent worker
+        self.__jobs = JobStore(temp_dir, timeout=2)
         self.LOGGER.debug('Sender initialized')
 
     def get_response(self, correlation_id):
@@ -77,49 +89,118 @@ class Sender:
                     :return one of the following - 'Failed', 'In progress',
                         'Finished successfully' or 'does not exist'
         """
-        self.LOGGER.debug('Trying to get response from correlation ids')
+        self.LOGGER.debug('Trying to get response from job store')
 
-        f = open('{}/{}'.format(self.__temp_dir, self.__response_file), 'r')
-        lines = f.readlines()
-        f.close()
-        for line in lines:
-            if correlation_id == line.split('- ')[1].strip():
-                return line.split('- ')[-1].strip()
+        response = self.__jobs.get(correlation_id)
+        if response is None:
+            return self.__response_type[3]
+        return response
 
-        return self.__response_type[3]
-
-    def send(self, arguments):
-        """Send data to receiver queue to process
+    def send(self, arguments, priority=None):
+        """Send data to receiver queue to process. Message is published using
+        the channel kept open by the worker and confirmed by RabbitMQ. If channel
+        was closed, it is opened again and message is published once more.
                 Arguments:
                     :param arguments: (str) arguments to process in receiver
+                    :param priority: (str) priority class of the job - 'interactive',
+                        'normal' or 'bulk', derived from the arguments by default
                     :return job_id
         """
-        self.LOGGER.info('Sending data to queue with arguments: {}'.format(arguments))
-        while (True):
+        priority = priority or job_priority(str(arguments))
+        self.LOGGER.info('Sending data to {} queue with arguments: {}'.format(priority, arguments))
+        queue = job_queues[priority]
+        corr_id = str(uuid.uuid4())
+        # Job is stored first, so it can not overwrite the response of the receiver
+        self.__jobs.set(corr_id, self.__response_type[1])
+        properties = pika.BasicProperties(correlation_id=corr_id)
+        with self.__process_lock():
+            try:
+                self.__publish(queue, str(arguments), properties)
+            except pika.exceptions.AMQPError as e:
+                self.LOGGER.warning('Publishing to rabbitMQ failed with {!r}, reconnecting'.format(e))
+                self.__close()
+                try:
+                    self.__publish(queue, str(arguments), properties)
+                except pika.exceptions.AMQPError:
+                    self.__jobs.set(corr_id, '{}#split#Job could not be sent to receiver'.format(self.__response_type[0]))
+                    raise
+        return corr_id
+
+    def close(self):
+        """Close connection to RabbitMQ of this worker."""
+        with self.__process_lock():
+            self.__close()
+
+    def __publish(self, queue, body, properties):
+        channel = self.__open_channel()
+        channel.basic_publish(exchange='',
+                              routing_key=queue,
+                              body=body,
+                              properties=properties,
+                              mandatory=True)
+
+    def __process_lock(self):
+        with self.__lock_guard:
+            if self.__pid != os.getpid():
+                # Connection opened before the fork of the worker belongs to the parent process. Lock is created
+                # in the worker too - gevent patches threading only after the fork, so lock created before it
+                # would block the whole worker instead of the greenlet
+                self.__connection = None
+                self.__channel = None
+                self.__lock = threading.Lock()
+                self.__pid = os.getpid()
+            return self.__lock
+
+    def __open_channel(self):
+        if self.__channel is not None and self.__channel.is_open:
+            return self.__channel
+        self.__close()
+        while True:
             try:
-                connection = pika.BlockingConnection(
-                    pika.ConnectionParameters(
-                        host=self.__rabbitmq_host,
-                        port=self.__rabbitmq_port,
-                        virtual_host=self.__rabbitmq_virtual_host,
-                        credentials=self.__credentials))
-                channel = connection.channel()
-                channel.queue_declare(queue='module_queue')
+                self.__connection = self.__connection_factory()
+                channel = self.__connection.channel()
+                for queue in job_queues.values():
+                    channel.queue_declare(queue=queue)
+                channel.confirm_delivery()
                 break
-            except pika.exceptions.ConnectionClosed:
+            except pika.exceptions.AMQPConnectionError:
                 self.LOGGER.debug('Cannot connect to rabbitMQ, trying after a sleep')
+                self.__close()
                 time.sleep(3)
-        corr_id = str(uuid.uuid4())
-        channel.basic_publish(exchange='',
-                                   routing_key='module_queue',
-                                   body=str(arguments),
-                                   properties=pika.BasicProperties(
-                                       correlation_id=corr_id,
-                                   )
-                              )
-        with open('{}/{}'.format(self.__temp_dir, self.__response_file), 'a') as f:
-            line = '{} -- {} - {}\n'.format(datetime.datetime.now().ctime(),
-                                            corr_id, self.__response_type[1])
-            f.write(line)
-        connection.close()
-        return corr_id
+        self.__channel = channel
+        return channel
+
+    def __connect(self):
+        return pika.BlockingConnection(
+            pika.ConnectionParameters(
+                host=self.__rabbitmq_host,
+                port=self.__rabbitmq_port,
+                virtual_host=self.__rabbitmq_virtual_host,
+                credentials=self.__credentials))
+
+    def __close(self):
+        connection = self.__connection
+        self.__connection = None
+        self.__channel = None
+        if connection is not None and connection.is_open:
+            try:
+                connection.close()
+            except pika.exceptions.AMQPError:
+                pass
+
+
+def job_priority(arguments: str) -> str:
+    """Get priority class of the job from the arguments the receiver processes it with.
+    Short jobs are 'interactive', populating of the whole repositories and admin scripts are 'bulk'.
+            Arguments:
+                :param arguments: (str) arguments separated by '#'
+                :return one of the following - 'interactive', 'normal' or 'bulk'
+    """
+    arguments = arguments.split('#')
+    if arguments[0] in ('run_ping', 'reload_config'):
+        return 'interactive'
+    if arguments[0] in ('run_ietf', 'run_script') or arguments[-1] == 'github':
+        return 'bulk'
+    if len(arguments) >= 3 and arguments[-3] in ('DELETE', 'DELETE_MULTIPLE'):
+        return 'interactive'
+    return 'normal'
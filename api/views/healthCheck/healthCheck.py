@@ -445,6 +445,12 @@ def check_cronjobs():
     return make_response(jsonify({'data': file_content}), 200)
 
 
+@app.route('/module-cache', methods=['GET'])
+def check_module_cache():
+    """Statistics of the decoded modules cache of the worker which handled the request."""
+    return make_response(jsonify({'data': yc_gc.module_cache.statistics()}), 200)
+
+
 ### HELPER DEFINITIONS ###
 def error_response(service_name, err):
     return {'info': 'Not OK - {} is not available'.format(service_name),
@@ -17,13 +17,13 @@ __copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
 __license__ = "Apache License, Version 2.0"
 __email__ = "miroslav.kovac@pantheon.tech"
 
-import json
 import multiprocessing
 
 import hashlib
 from elasticsearch import Elasticsearch, ConnectionTimeout
 from redis import Redis
 from utility import log
+from utility.redisCatalog import get_summaries
 import gevent.queue
 
 
@@ -46,7 +46,7 @@ class ElkSearch:
     def __init__(self, searched_term: str, case_sensitive: bool, searched_fields: list, type: str,
                  schema_types: list, logs_dir: str, es: Elasticsearch, latest_revision: bool,
                  redis: Redis, include_mibs: bool, yang_versions: list, needed_output_colums: list,
-                 all_output_columns: list, sub_search: list) -> None:
+                 all_output_columns: list, sub_search: list, generation: int = None) -> None:
         """
         Initialization of search under elasticsearch engine. We need to prepare a query
         that will be used to search in elasticsearch.
@@ -65,6 +65,7 @@ class ElkSearch:
         :param needed_output_colums (list) output columns that are going to be used within response json
         :param all_output_columns   (list) all existing output columns so we can get diff which we need to remove
         :param sub_search       (list of dic) search for specific part of text from output received from elasticsearch
+        :param generation       (int) catalog generation from which the modules are read
         """
         self.__response_size = 2000
         self.query = \
@@ -108,6 +109,7 @@ class ElkSearch:
         self.__type = type
         self.__es = es
         self.__redis = redis
+        self.__generation = generation
         self.__latest_revision = latest_revision
         self.__include_mibs = include_mibs
         self.__yang_versions = yang_versions
@@ -271,6 +273,7 @@ class ElkSearch:
             return response_rows
         secondary_hits = gevent.queue.JoinableQueue()
         process_scroll_search = gevent.spawn(self.__continue_scrolling, secondary_hits)
+        summaries = self.__get_summaries(hits, reject)
         for hit in hits:
             row = {}
             source = hit['_source']
@@ -286,11 +289,8 @@ class ElkSearch:
                 description = source['description']
                 statement = source['statement']
                 path = source['path']
-                module_data = self.__redis.get(module_index)
-                if module_data is not None:
-                    module_data = module_data.decode('utf-8')
-                    module_data = json.loads(module_data)
-                else:
+                module_data = summaries.get(module_index)
+                if module_data is None:
                     self.LOGGER.error('Failed to get module from redis but found in elasticsearch {}'
                                       .format(module_index))
                     reject.append(module_index)
@@ -312,7 +312,7 @@ class ElkSearch:
                     row['origin'] = 'Vendor-Specific'
                 row['organization'] = organization
                 row['maturity'] = module_data.get('maturity-level', '')
-                row['dependents'] = len(module_data.get('dependents', []))
+                row['dependents'] = module_data.get('dependents', 0)
                 row['compilation-status'] = module_data.get('compilation-status', 'unknown')
                 row['description'] = description
                 if not self.__found_in_sub_search(row):
@@ -329,6 +329,20 @@ class ElkSearch:
         process_scroll_search.join()
         return self.__process_hits(secondary_hits.get(), response_rows, reject)
 
+    def __get_summaries(self, hits: list, reject: list) -> dict:
+        """Get summaries of all the modules found in the hits which are not rejected yet
+        using single request for the module hashes and single request for the summaries.
+        """
+        keys = {}
+        for hit in hits:
+            source = hit['_source']
+            module_index = '{}@{}/{}'.format(source['module'], source['revision'].replace('02-28', '02-29'),
+                                             source['organization'])
+            if module_index not in reject:
+                keys[module_index] = None
+        keys = list(keys)
+        return dict(zip(keys, get_summaries(self.__redis, self.__generation, keys)))
+
     def __first_scroll(self, hits):
         elk_response = {}
         try:
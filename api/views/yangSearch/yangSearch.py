@@ -26,6 +26,7 @@ from api.globalConfig import yc_gc
 from api.views.yangSearch.elkSearch import ElkSearch
 from flask import Blueprint, abort, jsonify, make_response, request
 from pyang import plugin
+from utility.redisCatalog import attach_implementations
 from utility.util import get_curr_dir
 from utility.yangParser import create_context
 
@@ -292,7 +293,7 @@ def search():
     sub_search = eachKeyIsOneOf(payload, 'sub-search', __output_columns)
     elk_search = ElkSearch(searched_term, case_sensitive, searched_fields, terms_regex, schema_types, yc_gc.logs_dir,
                            yc_gc.es, latest_revision, yc_gc.redis, include_mibs, yang_versions, output_columns,
-                           __output_columns, sub_search)
+                           __output_columns, sub_search, yc_gc.catalog_generation())
     elk_search.construct_query()
     response['rows'] = elk_search.search()
     response['warning'] = elk_search.alerts()
@@ -434,15 +435,15 @@ def module_details(module: str, revision: str, json_data=False, warnings=False):
     # get module from redis
     module_index = "{}@{}/{}".format(module, revision, organization)
     app.LOGGER.info('searching for module {}'.format(module_index))
-    module_data = yc_gc.redis.get(module_index)
+    module_data = yc_gc.module_cache.get(module_index)
     if module_data is None:
         if warnings:
             return {'warning': 'module {} does not exists in API'.format(module_index)}
         else:
             abort(404, description='Provided module does not exist')
     else:
-        module_data = module_data.decode('utf-8')
-        module_data = json.loads(module_data)
+        # module details show implementations too, but they are stored separately from the module
+        attach_implementations(yc_gc.redis, yc_gc.catalog_generation(), {module_index: module_data})
     resp['metadata'] = module_data
     if json_data:
         return resp
@@ -670,12 +671,9 @@ def eachKeyIsOneOf(payload, payload_key, keys):
 
 def get_module_data(module_index):
     app.LOGGER.info('searching for module {}'.format(module_index))
-    module_data = yc_gc.redis.get(module_index)
+    module_data = yc_gc.module_cache.get(module_index)
     if module_data is None:
         abort(404, description='Provided module does not exist')
-    else:
-        module_data = module_data.decode('utf-8')
-        module_data = json.loads(module_data)
     return module_data
 
 
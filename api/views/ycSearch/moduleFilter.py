@@ -0,0 +1,139 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Filter of the modules used by search-filter endpoint. Body of the request
+is compiled only once into the list of conditions, which are then evaluated
+against each module without copying any part of the module.
+Body can contain:
+    - top-level leafs of the module (name, organization, ...)
+    - dependencies, dependents and submodule lists with name, revision and schema
+    - implementations container with list of implementation leafs (vendor, platform, feature, deviation, ...)
+If 'partial' is set to True, values are matched as substrings, otherwise they have to be equal.
+"""
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+submodule_leafs = ('dependencies', 'dependents', 'submodule')
+nested_leafs = submodule_leafs + ('implementations', 'partial')
+
+
+def equals(searched, value) -> bool:
+    return searched == value
+
+
+def contains(searched, value) -> bool:
+    if value is None:
+        return False
+    try:
+        return searched in value
+    except TypeError:
+        return False
+
+
+class ModuleFilter:
+
+    def __init__(self, body: dict):
+        """
+        Arguments:
+            :param body     (dict) content of the 'input' container of the search-filter request
+        """
+        self.partial = bool(body.get('partial'))
+        self.__match = contains if self.partial else equals
+        self.__submodules = []
+        for leaf in submodule_leafs:
+            if leaf in body:
+                conditions = [self.__compile_entry(sub, ('name', 'revision', 'schema')) for sub in body[leaf]]
+                self.__submodules.append((leaf, conditions))
+        self.__implementations = None
+        if 'implementations' in body:
+            self.__implementations = []
+            for imp in body['implementations'].get('implementation', []):
+                for leaf, value in imp.items():
+                    self.__implementations.append(self.__compile_implementation_leaf(leaf, value))
+        self.leafs = {leaf: value for leaf, value in body.items() if leaf not in nested_leafs}
+
+    def match(self, module: dict) -> bool:
+        """Check whether module meets all the conditions from the body of the request."""
+        for leaf, conditions in self.__submodules:
+            submodules = module.get(leaf)
+            if submodules is None:
+                return False
+            for condition in conditions:
+                if not any(condition(submodule) for submodule in submodules):
+                    return False
+        if self.__implementations is not None:
+            if not self.matching_implementations(module):
+                return False
+        for leaf, value in self.leafs.items():
+            module_leaf = module.get(leaf)
+            if self.partial:
+                # Modules which do not contain leaf at all are not filtered out by partial search
+                if module_leaf and not contains(value, module_leaf):
+                    return False
+            elif value != module_leaf:
+                return False
+        return True
+
+    def matching_implementations(self, module: dict) -> list:
+        """Get new list of module implementations which meet all the implementation conditions.
+        Empty list is returned if module has no implementations.
+        """
+        implementations = module.get('implementations')
+        if implementations is None:
+            return []
+        return [implementation for implementation in implementations.get('implementation', [])
+                if all(condition(implementation) for condition in self.__implementations)]
+
+    def exact_leafs(self) -> dict:
+        """Get top-level leafs with string values that have to be equal to module values.
+        These can be used to narrow the candidates before matching the modules.
+        """
+        if self.partial:
+            return {}
+        return {leaf: value for leaf, value in self.leafs.items() if isinstance(value, str)}
+
+    def __compile_entry(self, searched: dict, leafs: tuple):
+        searched = [(leaf, searched[leaf]) for leaf in leafs if searched.get(leaf)]
+        match = self.__match
+
+        def condition(entry: dict) -> bool:
+            return all(match(value, entry.get(leaf)) for leaf, value in searched)
+        return condition
+
+    def __compile_implementation_leaf(self, leaf: str, searched):
+        if leaf == 'deviation':
+            deviation_conditions = [self.__compile_entry(dev, ('name', 'revision')) for dev in searched]
+
+            def condition(implementation: dict) -> bool:
+                deviations = implementation.get('deviation')
+                if deviations is None:
+                    return False
+                return all(any(deviation_condition(deviation) for deviation in deviations)
+                           for deviation_condition in deviation_conditions)
+            return condition
+        match = self.__match
+
+        def condition(implementation: dict) -> bool:
+            value = implementation.get(leaf)
+            if value is None:
+                return False
+            if leaf == 'feature' and isinstance(value, list) and not isinstance(searched, list):
+                # Implementation contains list of features - searched feature has to be one of them
+                return any(match(searched, feature) for feature in value)
+            return match(searched, value)
+        return condition
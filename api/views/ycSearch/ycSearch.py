@@ -19,21 +19,19 @@ __email__ = "miroslav.kovac@pantheon.tech"
 
 import collections
 import errno
-import io
 import json
 import os
 import re
-from copy import deepcopy
 
 import api.yangSearch.elasticsearchIndex as inde
 import jinja2
-import requests
+from api.cache.diffCache import content_hash, render_diff
+from api.cache.treeCache import create_module_tree
 from api.globalConfig import yc_gc
+from api.views.ycSearch.moduleFilter import ModuleFilter
 from flask import Blueprint, Response, abort, jsonify, make_response, request, escape
-from pyang import error, plugin
-from pyang.plugins.tree import emit_tree
-from utility.util import context_check_update_from, get_curr_dir
-from utility.yangParser import create_context
+from utility.redisCatalog import attach_implementations, get_modules
+from utility.util import get_curr_dir
 from flask_deprecate import deprecate_route
 
 class YcSearch(Blueprint):
@@ -46,6 +44,10 @@ class YcSearch(Blueprint):
 
 app = YcSearch('ycSearch', __name__)
 
+module_keys = ['ietf/ietf-wg', 'maturity-level', 'document-name', 'author-email', 'compilation-status', 'namespace',
+               'conformance-type', 'module-type', 'organization', 'yang-version', 'name', 'revision', 'tree-type',
+               'belongs-to', 'generated-from', 'expires', 'expired', 'prefix', 'reference']
+
 
 ### ROUTE ENDPOINT DEFINITIONS ###
 @app.route('/fast', methods=['POST'])
@@ -71,50 +73,44 @@ def fast_search():
             return abort(400, description='Search is too broad. Please search for something more specific')
         res = []
         found_modules = {}
-        rejects = []
-        not_founds = []
-        errors = []
-
-        for row in search_res:
-            res_row = {}
-            res_row['node'] = row['node']
-            m_name = row['module']['name']
-            m_revision = row['module']['revision']
-            m_organization = row['module']['organization']
-            mod_sig = '{}@{}/{}'.format(m_name, m_revision, m_organization)
-            if mod_sig in rejects:
-                continue
-
-            mod_meta = None
-            try:
-                if mod_sig not in not_founds:
-                    if mod_sig in found_modules:
-                        mod_meta = found_modules[mod_sig]
-                    else:
-                        mod_meta = search_module(m_name, m_revision, m_organization)
-                        if mod_meta.status_code == 404 and m_revision.endswith('02-28'):
-                            mod_meta = search_module(m_name, m_revision.replace('02-28', '02-29'), m_organization)
-                        if mod_meta.status_code == 404:
-                            not_founds.append(mod_sig)
-                            yc_gc.LOGGER.error('index search module {}@{} not found but exist in elasticsearch'.format(m_name, m_revision))
-                            res_row = {'module': {'error': 'no {}@{} in API'.format(m_name, m_revision)}}
-                            res.append(res_row)
-                            continue
-                        else:
-                            mod_meta = mod_meta.json['module'][0]
-                            found_modules[mod_sig] = mod_meta
+        rejects = set()
+        not_founds = set()
+        errors = set()
+        module_filter = payload.get('filter', {})
+        implementations = include_implementations('implementations' in module_filter.get('module-metadata-filter', {})
+                                                  or 'implementations' in module_filter.get('module-metadata', []))
+
+        batch_size = 1000
+        for batch_start in range(0, len(search_res), batch_size):
+            batch = search_res[batch_start:batch_start + batch_size]
+            fetch_modules_metadata(batch, found_modules, not_founds | rejects, implementations)
+            for row in batch:
+                res_row = {}
+                res_row['node'] = row['node']
+                m_name = row['module']['name']
+                m_revision = row['module']['revision']
+                mod_sig = '{}@{}/{}'.format(m_name, m_revision, row['module']['organization'])
+                if mod_sig in rejects or mod_sig in not_founds:
+                    continue
 
-                if 'include-mibs' not in payload or payload['include-mibs'] is False:
-                    if re.search('yang:smiv2:', mod_meta.get('namespace')):
-                        rejects.append(mod_sig)
-                        continue
+                mod_meta = found_modules.get(mod_sig)
+                if mod_meta is None:
+                    not_founds.add(mod_sig)
+                    yc_gc.LOGGER.error('index search module {}@{} not found but exist in elasticsearch'.format(m_name, m_revision))
+                    res_row = {'module': {'error': 'no {}@{} in API'.format(m_name, m_revision)}}
+                    res.append(res_row)
+                    continue
+                try:
+                    if 'include-mibs' not in payload or payload['include-mibs'] is False:
+                        if re.search('yang:smiv2:', mod_meta.get('namespace')):
+                            rejects.add(mod_sig)
+                            continue
 
-                if mod_meta is not None and 'yang-versions' in payload and len(payload['yang-versions']) > 0:
-                    if mod_meta.get('yang-version') not in payload['yang-versions']:
-                        rejects.append(mod_sig)
-                        continue
+                    if 'yang-versions' in payload and len(payload['yang-versions']) > 0:
+                        if mod_meta.get('yang-version') not in payload['yang-versions']:
+                            rejects.add(mod_sig)
+                            continue
 
-                if mod_meta is not None:
                     if 'filter' not in payload or 'module-metadata' not in payload['filter']:
                         # If the filter is not specified, return all
                         # fields.
@@ -124,18 +120,20 @@ def fast_search():
                         for field in payload['filter']['module-metadata']:
                             if field in mod_meta:
                                 res_row['module'][field] = mod_meta[field]
-            except Exception as e:
-                count -= 1
-                if mod_sig not in errors:
-                    res_row['module'] = {
-                        'error': 'Search failed at {}: {}'.format(mod_sig, e)}
-                    errors.append(mod_sig)
-
-            if not filter_using_api(res_row, payload):
-                count += 1
-                res.append(res_row)
-            else:
-                rejects.append(mod_sig)
+                except Exception as e:
+                    count -= 1
+                    if mod_sig not in errors:
+                        res_row['module'] = {
+                            'error': 'Search failed at {}: {}'.format(mod_sig, e)}
+                        errors.add(mod_sig)
+
+                if not filter_using_api(res_row, payload):
+                    count += 1
+                    res.append(res_row)
+                else:
+                    rejects.add(mod_sig)
+                if count >= limit:
+                    break
             if count >= limit:
                 break
         return jsonify({'results': res, 'limit_reched': limit_reached})
@@ -154,33 +152,18 @@ def search(value: str):
     """
     path = value
     yc_gc.LOGGER.info('Searching for {}'.format(value))
-    split = value.split('/')[:-1]
     key = '/'.join(value.split('/')[:-1])
     value = value.split('/')[-1]
-    module_keys = ['ietf/ietf-wg', 'maturity-level', 'document-name', 'author-email', 'compilation-status', 'namespace',
-                   'conformance-type', 'module-type', 'organization', 'yang-version', 'name', 'revision', 'tree-type',
-                   'belongs-to', 'generated-from', 'expires', 'expired', 'prefix', 'reference']
-    for module_key in module_keys:
-        if key == module_key:
-            data = modules_data().get('module')
-            if data is None:
-                return abort(404, description='No module found in confd database')
-            passed_data = []
-            for module in data:
-                count = -1
-                process(module, passed_data, value, module, split, count)
-
-            if len(passed_data) > 0:
-                modules = json.JSONDecoder(object_pairs_hook=collections.OrderedDict) \
-                    .decode(json.dumps(passed_data))
-                return Response(json.dumps({
-                    'yang-catalog:modules': {
-                        'module': modules
-                    }
-                }), mimetype='application/json')
-            else:
-                return abort(404, description='No module found using provided input data')
-    return abort(400, description='Search on path {} is not supported'.format(path))
+    if key not in module_keys:
+        return abort(400, description='Search on path {} is not supported'.format(path))
+    data = modules_data().get('module')
+    if data is None:
+        return abort(404, description='No module found in confd database')
+    passed_data = leaf_index(key).get(value)
+    if passed_data:
+        return modules_response(passed_data, include_implementations())
+    else:
+        return abort(404, description='No module found using provided input data')
 
 
 @app.route('/search-filter/<leaf>', methods=['POST'])
@@ -197,9 +180,9 @@ def rpc_search_get_one(leaf: str):
     if recursive:
         body['input'].pop('recursive')
 
-    response = rpc_search(body)
-    data = json.loads(response.data)
-    modules = data['yang-catalog:modules']['module']
+    if not body['input']:
+        return abort(400, description='body request has to start with "input" container')
+    modules = search_modules(body['input'])
 
     if len(modules) == 0:
         return abort(404, description='No module found in confd database')
@@ -219,379 +202,19 @@ def rpc_search_get_one(leaf: str):
 
 
 @app.route('/search-filter', methods=['POST'])
-def rpc_search(body: dict = None):
+def rpc_search():
     """Get all the modules that contains all the leafs with data as provided in body of the request.
     """
-    from_api = False
-    if body is None:
-        body = request.json
-        from_api = True
+    body = request.json
     yc_gc.LOGGER.info('Searching and filtering modules based on RPC {}'
                       .format(json.dumps(body)))
-    data = modules_data().get('module', {})
     body = body.get('input')
     if body:
-        partial = body.get('partial')
-        if partial is None:
-            partial = False
-        passed_modules = []
-        if partial:
-            for module in data:
-                passed = True
-                if 'dependencies' in body:
-                    submodules = deepcopy(module.get('dependencies'))
-                    if submodules is None:
-                        continue
-                    for sub in body['dependencies']:
-                        found = True
-                        name = sub.get('name')
-                        revision = sub.get('revision')
-                        schema = sub.get('schema')
-                        for submodule in submodules:
-                            found = True
-                            if name:
-                                if name not in submodule['name']:
-                                    found = False
-                            if not found:
-                                continue
-                            if revision:
-                                if revision not in submodule['revision']:
-                                    found = False
-                            if not found:
-                                continue
-                            if schema:
-                                if schema not in submodule['schema']:
-                                    found = False
-                            if found:
-                                break
-
-                        if not found:
-                            passed = False
-                            break
-                if not passed:
-                    continue
-                if 'dependents' in body:
-                    submodules = deepcopy(module.get('dependents'))
-                    if submodules is None:
-                        continue
-                    for sub in body['dependents']:
-                        found = True
-                        name = sub.get('name')
-                        revision = sub.get('revision')
-                        schema = sub.get('schema')
-                        for submodule in submodules:
-                            found = True
-                            if name:
-                                if name not in submodule['name']:
-                                    found = False
-                            if not found:
-                                continue
-                            if revision:
-                                if revision not in submodule['revision']:
-                                    found = False
-                            if not found:
-                                continue
-                            if schema:
-                                if schema not in submodule['schema']:
-                                    found = False
-                            if found:
-                                break
-
-                        if not found:
-                            passed = False
-                            break
-                if not passed:
-                    continue
-                if 'submodule' in body:
-                    submodules = deepcopy(module.get('submodule'))
-                    if submodules is None:
-                        continue
-                    for sub in body['submodule']:
-                        found = True
-                        name = sub.get('name')
-                        revision = sub.get('revision')
-                        schema = sub.get('schema')
-                        for submodule in submodules:
-                            found = True
-                            if name:
-                                if name not in submodule['name']:
-                                    found = False
-                            if not found:
-                                continue
-                            if revision:
-                                if revision not in submodule['revision']:
-                                    found = False
-                            if not found:
-                                continue
-                            if schema:
-                                if schema not in submodule['schema']:
-                                    found = False
-                            if found:
-                                break
-
-                        if not found:
-                            passed = False
-                            break
-                if not passed:
-                    continue
-                if 'implementations' in body:
-                    implementations = deepcopy(module.get('implementations'))
-                    if implementations is None:
-                        continue
-                    passed = True
-                    for imp in body['implementations']['implementation']:
-                        if not passed:
-                            break
-                        for leaf in imp:
-                            found = False
-                            impls = []
-                            if leaf == 'deviation':
-                                for implementation in implementations['implementation']:
-                                    deviations = implementation.get('deviation')
-                                    if deviations is None:
-                                        continue
-                                    for dev in imp[leaf]:
-                                        found = True
-                                        name = dev.get('name')
-                                        revision = dev.get('revision')
-                                        for deviation in deviations:
-                                            found = True
-                                            if name:
-                                                if name not in deviation['name']:
-                                                    found = False
-                                            if not found:
-                                                continue
-                                            if revision:
-                                                if revision not in deviation['revision']:
-                                                    found = False
-                                            if found:
-                                                break
-                                        if not found:
-                                            break
-                                    if not found:
-                                        continue
-                                    else:
-                                        impls.append(implementation)
-                                if not found:
-                                    passed = False
-                                    break
-                            elif leaf == 'feature':
-                                for implementation in implementations['implementation']:
-                                    if implementation.get(leaf) is None:
-                                        continue
-                                    if imp[leaf] in implementation[leaf]:
-                                        found = True
-                                        impls.append(implementation)
-                                        continue
-                                if not found:
-                                    passed = False
-                            else:
-                                for implementation in implementations['implementation']:
-                                    if implementation.get(leaf) is None:
-                                        continue
-                                    if imp[leaf] in implementation[leaf]:
-                                        found = True
-                                        impls.append(implementation)
-                                        continue
-                                if not found:
-                                    passed = False
-                            if not passed:
-                                break
-                            implementations['implementation'] = impls
-                if not passed:
-                    continue
-                for leaf in body:
-                    if leaf != 'implementations' and leaf != 'submodule':
-                        module_leaf = module.get(leaf)
-                        if module_leaf:
-                            if body[leaf] not in module_leaf:
-                                passed = False
-                                break
-                if passed:
-                    passed_modules.append(module)
-        else:
-            for module in data:
-                passed = True
-                if 'dependencies' in body:
-                    submodules = deepcopy(module.get('dependencies'))
-                    if submodules is None:
-                        continue
-                    for sub in body['dependencies']:
-                        found = True
-                        name = sub.get('name')
-                        revision = sub.get('revision')
-                        schema = sub.get('schema')
-                        for submodule in submodules:
-                            found = True
-                            if name:
-                                if name != submodule['name']:
-                                    found = False
-                            if not found:
-                                continue
-                            if revision:
-                                if revision != submodule['revision']:
-                                    found = False
-                            if not found:
-                                continue
-                            if schema:
-                                if schema != submodule['schema']:
-                                    found = False
-                            if found:
-                                break
-
-                        if not found:
-                            passed = False
-                            break
-                if not passed:
-                    continue
-                if 'dependents' in body:
-                    submodules = deepcopy(module.get('dependents'))
-                    if submodules is None:
-                        continue
-                    for sub in body['dependents']:
-                        found = True
-                        name = sub.get('name')
-                        revision = sub.get('revision')
-                        schema = sub.get('schema')
-                        for submodule in submodules:
-                            found = True
-                            if name:
-                                if name != submodule['name']:
-                                    found = False
-                            if not found:
-                                continue
-                            if revision:
-                                if revision != submodule['revision']:
-                                    found = False
-                            if not found:
-                                continue
-                            if schema:
-                                if schema != submodule['schema']:
-                                    found = False
-                            if found:
-                                break
-
-                        if not found:
-                            passed = False
-                            break
-                if not passed:
-                    continue
-                if 'submodule' in body:
-                    submodules = deepcopy(module.get('submodule'))
-                    if submodules is None:
-                        continue
-                    for sub in body['submodule']:
-                        found = True
-                        name = sub.get('name')
-                        revision = sub.get('revision')
-                        schema = sub.get('schema')
-                        for submodule in submodules:
-                            found = True
-                            if name:
-                                if name != submodule['name']:
-                                    found = False
-                            if not found:
-                                continue
-                            if revision:
-                                if revision != submodule['revision']:
-                                    found = False
-                            if not found:
-                                continue
-                            if schema:
-                                if schema != submodule['schema']:
-                                    found = False
-                            if found:
-                                break
-
-                        if not found:
-                            passed = False
-                            break
-                if not passed:
-                    continue
-                if 'implementations' in body:
-                    implementations = deepcopy(module.get('implementations'))
-                    if implementations is None:
-                        continue
-                    passed = True
-                    for imp in body['implementations']['implementation']:
-                        if not passed:
-                            break
-                        for leaf in imp:
-                            found = False
-                            impls = []
-                            if leaf == 'deviation':
-                                for implementation in implementations['implementation']:
-                                    deviations = implementation.get('deviation')
-                                    if deviations is None:
-                                        continue
-                                    for dev in imp[leaf]:
-                                        found = True
-                                        name = dev.get('name')
-                                        revision = dev.get('revision')
-                                        for deviation in deviations:
-                                            found = True
-                                            if name:
-                                                if name != deviation['name']:
-                                                    found = False
-                                            if not found:
-                                                continue
-                                            if revision:
-                                                if revision != deviation['revision']:
-                                                    found = False
-                                            if found:
-                                                break
-                                        if not found:
-                                            break
-                                    if not found:
-                                        continue
-                                    else:
-                                        impls.append(implementation)
-                                if not found:
-                                    passed = False
-                                    break
-                            elif leaf == 'feature':
-                                for implementation in implementations['implementation']:
-                                    if implementation.get(leaf) is None:
-                                        continue
-                                    if imp[leaf] == implementation[leaf]:
-                                        found = True
-                                        impls.append(implementation)
-                                        continue
-                                if not found:
-                                    passed = False
-                            else:
-                                for implementation in implementations['implementation']:
-                                    if implementation.get(leaf) is None:
-                                        continue
-                                    if imp[leaf] == implementation[leaf]:
-                                        found = True
-                                        impls.append(implementation)
-                                        continue
-                                if not found:
-                                    passed = False
-                            if not passed:
-                                break
-                            implementations['implementation'] = impls
-                if not passed:
-                    continue
-                for leaf in body:
-                    if (leaf != 'implementations' and leaf != 'submodule'
-                            and leaf != 'dependencies' and leaf != 'dependents'):
-                        if body[leaf] != module.get(leaf):
-                            passed = False
-                            break
-                if passed:
-                    passed_modules.append(module)
-        if from_api and len(passed_modules) == 0:
+        passed_modules = search_modules(body)
+        if len(passed_modules) == 0:
             return abort(404, description='No modules found with provided input')
         else:
-            modules = json.JSONDecoder(object_pairs_hook=collections.OrderedDict) \
-                .decode(json.dumps(passed_modules))
-            return Response(json.dumps({
-                'yang-catalog:modules': {
-                    'module': modules
-                }
-            }), mimetype='application/json')
+            return modules_response(passed_modules, include_implementations('implementations' in body))
     else:
         return abort(400, description='body request has to start with "input" container')
 
@@ -628,136 +251,59 @@ def create_update_from(name1: str, revision1: str, name2: str, revision2: str):
             return 'Server error - could not create directory'
     new_schema = '{}/{}@{}.yang'.format(yc_gc.save_file_dir, name1, revision1)
     old_schema = '{}/{}@{}.yang'.format(yc_gc.save_file_dir, name2, revision2)
-    ctx, new_schema_ctx = context_check_update_from(old_schema, new_schema, yc_gc.yang_models, yc_gc.save_file_dir)
-
-    errors = []
-    for ctx_err in ctx.errors:
-        ref = '{}:{}:'.format(ctx_err[0].ref, ctx_err[0].line)
-        err_message = error.err_to_str(ctx_err[1], ctx_err[2])
-        err = '{} {}\n'.format(ref, err_message)
-        errors.append(err)
+    errors = yc_gc.check_update_from_cache.check_update_from(old_schema, new_schema,
+                                                             yc_gc.yang_models, yc_gc.save_file_dir)
 
-    return '<html><body><pre>{}</pre></body></html>'.format(''.join(errors))
+    return '<html><body><pre>{}</pre></body></html>'.format(errors)
 
 
 @app.route('/services/diff-file/file1=<name1>@<revision1>/file2=<name2>@<revision2>', methods=['GET'])
 def create_diff_file(name1: str, revision1: str, name2: str, revision2: str):
-    """Create preformated HTML which contains diff between two yang file.
-    Dump content of yang files into tempporary schema-file-diff.txt file.
-    Make GET request to URL https://www.ietf.org/rfcdiff/rfcdiff.pyht?url1=<file1>&url2=<file2>'.
-    Output of rfcdiff tool then represents response of the method.
+    """Create HTML page which contains side-by-side diff between two yang files.
+    Diff is rendered only once for the same content of the yang files.
         Arguments:
             :param name1:            (str) name of the first module
             :param revision1:        (str) revision of the first module in format YYYY-MM-DD
             :param name2:            (str) name of the second module
             :param revision2:        (str) revision of the second module in format YYYY-MM-DD
-            :return preformatted HTML with corresponding data
+            :return HTML page with corresponding data
     """
-    try:
-        os.makedirs(get_curr_dir(__file__) + '/temp')
-    except OSError as e:
-        # be happy if someone already created the path
-        if e.errno != errno.EEXIST:
-            return 'Server error - could not create directory'
-    schema1 = '{}/{}@{}.yang'.format(yc_gc.save_file_dir, name1, revision1)
-    schema2 = '{}/{}@{}.yang'.format(yc_gc.save_file_dir, name2, revision2)
-    file_name1 = 'schema1-file-diff.txt'
-    yang_file_1_content = ''
-    try:
-        with open(schema1, 'r', encoding='utf-8', errors='strict') as f:
-            yang_file_1_content = f.read()
-    except FileNotFoundError:
-        yc_gc.LOGGER.warn('File {}@{}.yang was not found.'.format(name1, revision1))
-
-    with open('{}/{}'.format(yc_gc.diff_file_dir, file_name1), 'w+') as f:
-        f.write('<pre>{}</pre>'.format(yang_file_1_content))
-
-    file_name2 = 'schema2-file-diff.txt'
-    yang_file_2_content = ''
-    try:
-        with open(schema2, 'r', encoding='utf-8', errors='strict') as f:
-            yang_file_2_content = f.read()
-    except FileNotFoundError:
-        yc_gc.LOGGER.warn('File {}@{}.yang was not found.'.format(name2, revision2))
-    with open('{}/{}'.format(yc_gc.diff_file_dir, file_name2), 'w+') as f:
-        f.write('<pre>{}</pre>'.format(yang_file_2_content))
-    tree1 = '{}/compatibility/{}'.format(yc_gc.my_uri, file_name1)
-    tree2 = '{}/compatibility/{}'.format(yc_gc.my_uri, file_name2)
-    diff_url = ('https://www.ietf.org/rfcdiff/rfcdiff.pyht?url1={}&url2={}'
-                .format(tree1, tree2))
-    response = requests.get(diff_url)
-    os.remove(yc_gc.diff_file_dir + '/' + file_name1)
-    os.remove(yc_gc.diff_file_dir + '/' + file_name2)
-    return '<html><body>{}</body></html>'.format(response.text)
+    yang_file_1_content = read_yang_file(name1, revision1)
+    yang_file_2_content = read_yang_file(name2, revision2)
+    key = ('file', content_hash(yang_file_1_content), content_hash(yang_file_2_content))
+    html = yc_gc.diff_cache.get(key)
+    if html is None:
+        html = render_diff(yang_file_1_content, yang_file_2_content,
+                           '{}@{}.yang'.format(name1, revision1), '{}@{}.yang'.format(name2, revision2))
+        yc_gc.diff_cache.set(key, html)
+    return html
 
 
 @app.route('/services/diff-tree/file1=<name1>@<revision1>/file2=<file2>@<revision2>', methods=['GET'])
 def create_diff_tree(name1: str, revision1: str, file2: str, revision2: str):
-    """Create preformated HTML which contains diff between two yang trees.
-    Dump content of yang files into tempporary schema-tree-diff.txt file.
-    Make GET request to URL https://www.ietf.org/rfcdiff/rfcdiff.pyht?url1=<file1>&url2=<file2>'.
-    Output of rfcdiff tool then represents response of the method.
+    """Create HTML page which contains side-by-side diff between two yang trees.
+    Diff is rendered only once for the same content of the yang files and pyang version.
         Arguments:
             :param name1:            (str) name of the first module
             :param revision1:        (str) revision of the first module in format YYYY-MM-DD
             :param name2:            (str) name of the second module
             :param revision2:        (str) revision of the second module in format YYYY-MM-DD
-            :return preformatted HTML with corresponding data
+            :return HTML page with corresponding data
     """
-    try:
-        os.makedirs(get_curr_dir(__file__) + '/temp')
-    except OSError as e:
-        # be happy if someone already created the path
-        if e.errno != errno.EEXIST:
-            return 'Server error - could not create directory'
     schema1 = '{}/{}@{}.yang'.format(yc_gc.save_file_dir, name1, revision1)
     schema2 = '{}/{}@{}.yang'.format(yc_gc.save_file_dir, file2, revision2)
-    plugin.plugins = []
-    plugin.init([])
-    ctx = create_context('{}:{}'.format(yc_gc.yang_models, yc_gc.save_file_dir))
-    ctx.opts.lint_namespace_prefixes = []
-    ctx.opts.lint_modulename_prefixes = []
-    ctx.lax_quote_checks = True
-    ctx.lax_xpath_checks = True
-    for p in plugin.plugins:
-        p.setup_ctx(ctx)
-
-    with open(schema1, 'r') as ff:
-        a = ctx.add_module(schema1, ff.read())
-    ctx.errors = []
-    if ctx.opts.tree_path is not None:
-        path = ctx.opts.tree_path.split('/')
-        if path[0] == '':
-            path = path[1:]
-    else:
-        path = None
-
-    ctx.validate()
-    f = io.StringIO()
-    emit_tree(ctx, [a], f, ctx.opts.tree_depth, ctx.opts.tree_line_length, path)
-    stdout = f.getvalue()
-    file_name1 = 'schema1-tree-diff.txt'
-    full_path_file1 = '{}/{}'.format(yc_gc.diff_file_dir, file_name1)
-    with open(full_path_file1, 'w+') as ff:
-        ff.write('<pre>{}</pre>'.format(stdout))
-    with open(schema2, 'r') as ff:
-        a = ctx.add_module(schema2, ff.read())
-    ctx.validate()
-    f = io.StringIO()
-    emit_tree(ctx, [a], f, ctx.opts.tree_depth, ctx.opts.tree_line_length, path)
-    stdout = f.getvalue()
-    file_name2 = 'schema2-tree-diff.txt'
-    full_path_file2 = '{}/{}'.format(yc_gc.diff_file_dir, file_name2)
-    with open(full_path_file2, 'w+') as ff:
-        ff.write('<pre>{}</pre>'.format(stdout))
-    tree1 = '{}/compatibility/{}'.format(yc_gc.my_uri, file_name1)
-    tree2 = '{}/compatibility/{}'.format(yc_gc.my_uri, file_name2)
-    diff_url = ('https://www.ietf.org/rfcdiff/rfcdiff.pyht?url1={}&url2={}'
-                .format(tree1, tree2))
-    response = requests.get(diff_url)
-    os.unlink(full_path_file1)
-    os.unlink(full_path_file2)
-    return '<html><body>{}</body></html>'.format(response.text)
+    try:
+        key = ('tree', yc_gc.tree_cache.key(schema1), yc_gc.tree_cache.key(schema2))
+        html = yc_gc.diff_cache.get(key)
+        if html is None:
+            tree1, _ = create_module_tree(schema1, yc_gc.yang_models, yc_gc.save_file_dir)
+            tree2, _ = create_module_tree(schema2, yc_gc.yang_models, yc_gc.save_file_dir)
+            html = render_diff(tree1, tree2, '{}@{}.yang'.format(name1, revision1),
+                               '{}@{}.yang'.format(file2, revision2))
+            yc_gc.diff_cache.set(key, html)
+    except OSError as e:
+        abort(400, description='File {} was not found'.format(e.filename))
+    return html
 
 
 @app.route('/get-common', methods=['POST'])
@@ -769,33 +315,25 @@ def get_common():
         return abort(400, description='body of request is empty')
     if body.get('input') is None:
         return abort(400, description='body of request need to start with input')
-    if body['input'].get('first') is None or body['input'].get('second') is None:
+    if not body['input'].get('first') or not body['input'].get('second'):
         return abort(400, description='body of request need to contain first and second container')
-    response_first = rpc_search({'input': body['input']['first']})
-    response_second = rpc_search({'input': body['input']['second']})
-
-    data = json.JSONDecoder(object_pairs_hook=collections.OrderedDict)\
-        .decode(response_first.get_data(as_text=True))
-    modules_first = data['yang-catalog:modules']['module']
-    data = json.JSONDecoder(object_pairs_hook=collections.OrderedDict)\
-        .decode(response_second.get_data(as_text=True))
-    modules_second = data['yang-catalog:modules']['module']
+    modules_first = search_modules(body['input']['first'])
+    modules_second = search_modules(body['input']['second'])
 
     if len(modules_first) == 0 or len(modules_second) == 0:
         return abort(404, description='No hits found either in first or second input')
 
+    names_second = set(mod_second['name'] for mod_second in modules_second)
     output_modules_list = []
-    names = []
+    names = set()
     for mod_first in modules_first:
-        for mod_second in modules_second:
-            if mod_first['name'] == mod_second['name']:
-                if mod_first['name'] not in names:
-                    names.append(mod_first['name'])
-                    output_modules_list.append(mod_first)
+        name = mod_first['name']
+        if name in names_second and name not in names:
+            names.add(name)
+            output_modules_list.append(mod_first)
     if len(output_modules_list) == 0:
         return abort(404, description='No common modules found within provided input')
-    return Response(json.dumps({'output': output_modules_list}),
-                    mimetype='application/json')
+    return stream_output(output_modules_list)
 
 
 @app.route('/compare', methods=['POST'])
@@ -808,43 +346,35 @@ def compare():
         return abort(400, description='body of request is empty')
     if body.get('input') is None:
         return abort(400, description='body of request need to start with input')
-    if body['input'].get('old') is None or body['input'].get('new') is None:
+    if not body['input'].get('old') or not body['input'].get('new'):
         return abort(400, description='body of request need to contain new and old container')
-    response_new = rpc_search({'input': body['input']['new']})
-    response_old = rpc_search({'input': body['input']['old']})
-
-    data = json.loads(response_new.data)
-    modules_new = data['yang-catalog:modules']['module']
-    data = json.loads(response_old.data)
-    modules_old = data['yang-catalog:modules']['module']
+    modules_new = search_modules(body['input']['new'])
+    modules_old = search_modules(body['input']['old'])
 
     if len(modules_new) == 0 or len(modules_old) == 0:
         return abort(404, description='No hits found either in old or new input')
 
+    old_names = set()
+    old_modules = set()
+    for mod_old in modules_old:
+        old_names.add(mod_old['name'])
+        old_modules.add((mod_old['name'], mod_old['revision']))
+
     new_mods = []
     for mod_new in modules_new:
-        new_rev = mod_new['revision']
         new_name = mod_new['name']
-        found = False
-        new_rev_found = False
-        for mod_old in modules_old:
-            old_rev = mod_old['revision']
-            old_name = mod_old['name']
-            if new_name == old_name and new_rev == old_rev:
-                found = True
-                break
-            if new_name == old_name and new_rev != old_rev:
-                new_rev_found = True
-        if not found:
-            mod_new['reason-to-show'] = 'New module'
-            new_mods.append(mod_new)
-        if new_rev_found:
+        if (new_name, mod_new['revision']) in old_modules:
+            continue
+        # Modules are shared with catalog snapshot - add reason to the copy of the module
+        mod_new = collections.OrderedDict(mod_new)
+        if new_name in old_names:
             mod_new['reason-to-show'] = 'Different revision'
-            new_mods.append(mod_new)
+        else:
+            mod_new['reason-to-show'] = 'New module'
+        new_mods.append(mod_new)
     if len(new_mods) == 0:
         return abort(404, description='No new modules or modules with different revisions found')
-    output = {'output': new_mods}
-    return make_response(jsonify(output), 200)
+    return stream_output(new_mods)
 
 
 @app.route('/check-semantic-version', methods=['POST'])
@@ -859,39 +389,31 @@ def check_semver():
         return abort(400, description='body of request is empty')
     if body.get('input') is None:
         return abort(400, description='body of request need to start with input')
-    if body['input'].get('old') is None or body['input'].get('new') is None:
+    if not body['input'].get('old') or not body['input'].get('new'):
         return abort(400, description='body of request need to contain new and old container')
-    response_new = rpc_search({'input': body['input']['new']})
-    response_old = rpc_search({'input': body['input']['old']})
-
-    data = json.loads(response_new.data)
-    modules_new = data['yang-catalog:modules']['module']
-    data = json.loads(response_old.data)
-    modules_old = data['yang-catalog:modules']['module']
+    modules_new = search_modules(body['input']['new'])
+    modules_old = search_modules(body['input']['old'])
 
     if len(modules_new) == 0 or len(modules_old) == 0:
         return abort(404, description='No hits found either in old or new input')
 
+    new_modules = {}
+    for mod_new in modules_new:
+        new_modules.setdefault((mod_new['name'], mod_new['organization']), mod_new)
+
     output_modules_list = []
     for mod_old in modules_old:
-        name_new = None
-        semver_new = None
-        revision_new = None
-        status_new = None
         name_old = mod_old['name']
         revision_old = mod_old['revision']
         organization_old = mod_old['organization']
         status_old = mod_old['compilation-status']
-        for mod_new in modules_new:
-            name_new = mod_new['name']
-            revision_new = mod_new['revision']
-            organization_new = mod_new['organization']
-            status_new = mod_new['compilation-status']
-            if name_new == name_old and organization_new == organization_old:
-                if revision_old == revision_new:
-                    break
-                semver_new = mod_new.get('derived-semantic-version')
-                break
+        mod_new = new_modules.get((name_old, organization_old))
+        if mod_new is None or mod_new['revision'] == revision_old:
+            continue
+        name_new = mod_new['name']
+        revision_new = mod_new['revision']
+        status_new = mod_new['compilation-status']
+        semver_new = mod_new.get('derived-semantic-version')
         if semver_new:
             semver_old = mod_old.get('derived-semantic-version')
             if semver_old:
@@ -932,49 +454,21 @@ def check_semver():
                     output_modules_list.append(output_mod)
     if len(output_modules_list) == 0:
         return abort(404, description='No different semantic versions with provided input')
-    output = {'output': output_modules_list}
-    return make_response(jsonify(output), 200)
+    return stream_output(output_modules_list)
 
 
 @app.route('/search/vendor/<vendor>', methods=['GET'])
 def search_vendor_statistics(vendor: str):
     """Search for os-types of <vendor> with corresponding os-versions and platforms.
+    Statistics of all the vendors are computed only once per catalog generation.
         Arguments:
             :param vendor   (str) name of the vendor
             :return statistics of the vendor's os-types, os-versions and platforms
             :rtype dict
     """
     yc_gc.LOGGER.info('Searching for vendors')
-    data = vendors_data(False).get('vendor', {})
-    ven_data = None
-    for d in data:
-        if d['name'] == vendor:
-            ven_data = d
-            break
-
-    os_type = {}
-    if ven_data is not None:
-        for plat in ven_data['platforms']['platform']:
-            version_list = set()
-            os = {}
-            for ver in plat['software-versions']['software-version']:
-                for flav in ver['software-flavors']['software-flavor']:
-                    os[ver['name']] = flav['modules']['module'][0]['os-type']
-                    if os[ver['name']] not in os_type:
-                        os_type[os[ver['name']]] = {}
-                    break
-                if ver['name'] not in os_type[os[ver['name']]]:
-                    os_type[os[ver['name']]][ver['name']] = set()
-
-                version_list.add(ver['name'])
-            for ver in version_list:
-                os_type[os[ver]][ver].add(plat['name'])
-
-    os_types = {}
-    for key, vals in os_type.items():
-        os_types[key] = {}
-        for key2, val in os_type[key].items():
-            os_types[key][key2] = list(os_type[key][key2])
+    vendors_statistics = yc_gc.catalog_cache.index('vendors-data', 'vendor-statistics', create_vendors_statistics)
+    os_types = vendors_statistics.get(vendor, {})
     return Response(json.dumps(os_types), mimetype='application/json')
 
 
@@ -988,61 +482,44 @@ def search_vendors(value: str):
             :return response to the request.
     """
     yc_gc.LOGGER.info('Searching for specific vendors {}'.format(value))
-    vendors_data = get_vendors().json
+    data = vendors_data()
+    if len(data) == 0:
+        return abort(404, description="No vendor is loaded")
 
     if 'vendor/' in value:
-        found = False
         vendor_name = value.split('vendor/')[-1].split('/')[0]
-        for vendor in vendors_data['vendor']:
-            if vendor['name'] == vendor_name:
-                vendors_data = vendor
-                found = True
-        if found == False:
+        vendors_index = yc_gc.catalog_cache.index('vendors-data', 'vendors-tree', create_vendors_index)
+        if vendor_name not in vendors_index:
             return abort(404, description='No vendors found on path {}'.format(value))
+        vendor_data, platforms = vendors_index[vendor_name]
     else:
-        return Response(json.dumps(vendors_data), mimetype='application/json')
+        return Response(json.dumps(data), mimetype='application/json')
 
     if 'platform/' in value:
-        found = False
         platform_name = value.split('platform/')[-1].split('/')[0]
-        for platform in vendors_data.get('platforms', {}).get('platform', []):
-            if platform['name'] == platform_name:
-                vendors_data = platform
-                found = True
-        if found == False:
+        if platform_name not in platforms:
             return abort(404, description='No vendors found on path {}'.format(value))
+        platform_data, software_versions = platforms[platform_name]
     else:
-        vendors_data = {'yang-catalog:vendor': [vendors_data]}
-        return Response(json.dumps(vendors_data), mimetype='application/json')
+        return Response(json.dumps({'yang-catalog:vendor': [vendor_data]}), mimetype='application/json')
 
     if 'software-version/' in value:
-        found = False
         software_version_name = value.split('software-version/')[-1].split('/')[0]
-        for software_version in vendors_data.get('software-versions', {}).get('software-version', []):
-            if software_version['name'] == software_version_name:
-                vendors_data = software_version
-                found = True
-        if found == False:
+        if software_version_name not in software_versions:
             return abort(404, description='No vendors found on path {}'.format(value))
+        software_version_data, software_flavors = software_versions[software_version_name]
     else:
-        vendors_data = {'yang-catalog:platform': [vendors_data]}
-        return Response(json.dumps(vendors_data), mimetype='application/json')
+        return Response(json.dumps({'yang-catalog:platform': [platform_data]}), mimetype='application/json')
 
     if 'software-flavor/' in value:
-        found = False
         software_flavor_name = value.split('software-flavor/')[-1].split('/')[0]
-        for software_flavor in vendors_data.get('software-flavors', {}).get('software-flavor', []):
-            if software_flavor['name'] == software_flavor_name:
-                vendors_data = software_flavor
-                found = True
-        if found == False:
+        if software_flavor_name not in software_flavors:
             return abort(404, description='No vendors found on path {}'.format(value))
-        else:
-            vendors_data = {'yang-catalog:software-flavor': [vendors_data]}
-            return Response(json.dumps(vendors_data), mimetype='application/json')
+        output = {'yang-catalog:software-flavor': [software_flavors[software_flavor_name]]}
+        return Response(json.dumps(output), mimetype='application/json')
     else:
-        vendors_data = {'yang-catalog:software-version': [vendors_data]}
-        return Response(json.dumps(vendors_data), mimetype='application/json')
+        output = {'yang-catalog:software-version': [software_version_data]}
+        return Response(json.dumps(output), mimetype='application/json')
 
 
 @app.route('/search/modules/<name>,<revision>,<organization>', methods=['GET'])
@@ -1056,12 +533,16 @@ def search_module(name: str, revision: str, organization: str):
                     see if the job is still on or Failed or Finished successfully
     """
     yc_gc.LOGGER.info('Searching for module {}, {}, {}'.format(name, revision, organization))
-    module_data = yc_gc.redis.get("{}@{}/{}".format(name, revision, organization))
-    if module_data is not None:
-        module_data = module_data.decode('utf-8')
-        return Response(json.dumps({'module': [json.JSONDecoder(object_pairs_hook=collections.OrderedDict)
-                                               .decode(module_data)]
-                                    }), mimetype='application/json')
+    key = '{}@{}/{}'.format(name, revision, organization)
+    module = yc_gc.module_cache.get(key)
+    if module is not None:
+        if include_implementations():
+            attach_implementations(yc_gc.redis, yc_gc.catalog_generation(), {key: module})
+        else:
+            module.pop('implementations', None)
+        if latest_revision_requested():
+            return Response(json.dumps([module]), mimetype='application/json')
+        return Response(json.dumps({'module': [module]}), mimetype='application/json')
     return abort(404, description='Module {}@{}/{} not found'.format(name, revision, organization))
 
 
@@ -1071,10 +552,12 @@ def get_modules():
         :return response to the request with all the modules
     """
     yc_gc.LOGGER.info('Searching for modules')
-    data = json.dumps(modules_data())
-    if data is None or data == '{}':
-        return abort(404, description="No module is loaded")
-    return Response(data, mimetype='application/json')
+    if latest_revision_requested():
+        latest_modules = latest_modules_index()
+        if not latest_modules:
+            return abort(404, description='No module is loaded')
+        return Response(json.dumps(latest_modules), mimetype='application/json')
+    return raw_catalog_response('modules-data', 'No module is loaded')
 
 
 @app.route('/search/vendors', methods=['GET'])
@@ -1083,10 +566,7 @@ def get_vendors():
         :return response to the request with all the vendors
     """
     yc_gc.LOGGER.info('Searching for vendors')
-    data = json.dumps(vendors_data())
-    if data is None or data == '{}':
-        return abort(404, description="No vendor is loaded")
-    return Response(data, mimetype='application/json')
+    return raw_catalog_response('vendors-data', 'No vendor is loaded')
 
 
 @app.route('/search/catalog', methods=['GET'])
@@ -1095,11 +575,7 @@ def get_catalog():
         :return response to the request with all the data
     """
     yc_gc.LOGGER.info('Searching for catalog data')
-    data = json.dumps(catalog_data())
-    if data is None or data == '{}':
-        return abort(404, description='No data loaded to YangCatalog')
-    else:
-        return Response(data, mimetype='application/json')
+    return raw_catalog_response('all-catalog-data', 'No data loaded to YangCatalog')
 
 
 @app.route('/services/tree/<name>@<revision>.yang', methods=['GET'])
@@ -1112,40 +588,10 @@ def create_tree(name: str, revision: str):
         :return preformatted HTML with corresponding data
     """
     path_to_yang = '{}/{}@{}.yang'.format(yc_gc.save_file_dir, name, revision)
-    plugin.plugins = []
-    plugin.init([])
-    ctx = create_context('{}:{}'.format(yc_gc.yang_models, yc_gc.save_file_dir))
-    ctx.opts.lint_namespace_prefixes = []
-    ctx.opts.lint_modulename_prefixes = []
-
-    for p in plugin.plugins:
-        p.setup_ctx(ctx)
     try:
-        with open(path_to_yang, 'r') as f:
-            a = ctx.add_module(path_to_yang, f.read())
-    except:
+        return yc_gc.tree_cache.get_or_render(path_to_yang, yc_gc.yang_models, yc_gc.save_file_dir)
+    except OSError:
         abort(400, description='File {} was not found'.format(path_to_yang))
-    if ctx.opts.tree_path is not None:
-        path = ctx.opts.tree_path.split('/')
-        if path[0] == '':
-            path = path[1:]
-    else:
-        path = None
-
-    ctx.validate()
-    f = io.StringIO()
-    emit_tree(ctx, [a], f, ctx.opts.tree_depth, ctx.opts.tree_line_length, path)
-    stdout = f.getvalue()
-    if stdout == '' and len(ctx.errors) != 0:
-        message = 'This yang file contains major errors and therefore tree can not be created.'
-        return create_bootstrap_danger(message)
-    elif stdout != '' and len(ctx.errors) != 0:
-        message = 'This yang file contains some errors, but tree was created.'
-        return create_bootstrap_warning(stdout, message)
-    elif stdout == '' and len(ctx.errors) == 0:
-        return create_bootstrap_info()
-    else:
-        return '<html><body><pre>{}</pre></body></html>'.format(stdout)
 
 
 @app.route('/services/reference/<name>@<revision>.yang', methods=['GET'])
@@ -1169,6 +615,71 @@ def create_reference(name: str, revision: str):
 
 
 # HELPER DEFINITIONS
+def read_yang_file(name: str, revision: str):
+    """Read content of the yang file with corresponding module name and revision.
+    Empty string is returned if the yang file was not found.
+    """
+    path_to_yang = '{}/{}@{}.yang'.format(yc_gc.save_file_dir, name, revision)
+    try:
+        with open(path_to_yang, 'r', encoding='utf-8', errors='strict') as f:
+            return f.read()
+    except FileNotFoundError:
+        yc_gc.LOGGER.warning('File {}@{}.yang was not found.'.format(name, revision))
+        return ''
+
+
+def fetch_modules_metadata(rows: list, found_modules: dict, skip: set, implementations: bool = False):
+    """Get metadata of all the distinct modules from the batch of Elasticsearch hits
+    which were not fetched yet. All the modules are fetched from Redis using single MGET request.
+    Elasticsearch can contain 02-28 revision of the module which is stored with 02-29 revision,
+    so these modules are looked up once more with the corrected revision.
+            Arguments:
+                :param rows: (list) batch of Elasticsearch hits
+                :param found_modules: (dict) modules already fetched - newly found modules are added to it
+                :param skip: (set) module signatures which should not be fetched
+                :param implementations: (bool) whether implementations should be fetched with the modules
+    """
+    missing = {}
+    for row in rows:
+        module = row['module']
+        mod_sig = '{}@{}/{}'.format(module['name'], module['revision'], module['organization'])
+        if mod_sig not in found_modules and mod_sig not in skip:
+            missing[mod_sig] = module
+    found_modules.update(modules_by_keys(list(missing.keys()), implementations))
+
+    retry = {}
+    for mod_sig, module in missing.items():
+        if mod_sig not in found_modules and module['revision'].endswith('02-28'):
+            key = '{}@{}/{}'.format(module['name'], module['revision'].replace('02-28', '02-29'),
+                                    module['organization'])
+            retry[key] = mod_sig
+    for key, module in modules_by_keys(list(retry.keys()), implementations).items():
+        found_modules[retry[key]] = module
+
+
+def modules_by_keys(keys: list, implementations: bool = False):
+    """Get modules stored in Redis under specified keys in published catalog generation
+    using single request for the module hashes and single MGET request for the modules.
+            Arguments:
+                :param keys: (list) Redis keys of the modules in format <name>@<revision>/<organization>
+                :param implementations: (bool) whether implementations should be attached to the modules
+                :return dictionary of keys with decoded modules - keys not stored in Redis are omitted
+                :rtype dict
+    """
+    if len(keys) == 0:
+        return {}
+    modules = {}
+    for key, module_data in zip(keys, get_modules(yc_gc.redis, yc_gc.catalog_generation(), keys)):
+        if module_data is not None:
+            module = json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode(module_data.decode('utf-8'))
+            if not implementations:
+                module.pop('implementations', None)
+            modules[key] = module
+    if implementations:
+        attach_implementations(yc_gc.redis, yc_gc.catalog_generation(), modules)
+    return modules
+
+
 def filter_using_api(res_row, payload):
     try:
         if 'filter' not in payload or 'module-metadata-filter' not in payload['filter']:
@@ -1291,107 +802,325 @@ def filter_using_api(res_row, payload):
         return False
 
 
+def search_modules(body: dict):
+    """Get all the modules that contains all the leafs with data as provided in 'input' container
+    of the search-filter request. Top-level leafs searched for exact values are used to narrow
+    the candidates using inverted leaf index before matching the modules.
+    Returned modules are shared with the catalog snapshot and must not be modified.
+            Arguments:
+                :param body: (dict) content of the 'input' container of the search-filter request
+                :return list of the modules which passed the filter
+                :rtype list
+    """
+    candidates = modules_data().get('module', [])
+    module_filter = ModuleFilter(body)
+    for leaf, value in module_filter.exact_leafs().items():
+        if leaf not in module_keys:
+            continue
+        leaf_candidates = leaf_index(leaf).get(value, [])
+        if len(leaf_candidates) < len(candidates):
+            candidates = leaf_candidates
+    return [module for module in candidates if module_filter.match(module)]
+
+
+def stream_output(output: list):
+    """Create response which streams JSON object with 'output' list item by item
+    instead of serializing whole output at once.
+            Arguments:
+                :param output: (list) items of the output list
+                :return response to the request.
+    """
+    def generate():
+        yield '{"output": ['
+        for i, item in enumerate(output):
+            if i != 0:
+                yield ', '
+            yield json.dumps(item)
+        yield ']}'
+    return Response(generate(), mimetype='application/json', status=200)
+
+
 def search_recursive(output: set, module: dict, leaf: str, resolved: set):
-    """Look for all dependencies of the module and search for data in those modules too.
+    """Look for all the modules which depend on the module either directly or transitively
+    and search for data in those modules too. Modules are found by walking through the index
+    of dependents in breadth-first order.
     """
-    r_name = module['name']
-    if r_name not in resolved:
+    dependents = dependents_index()
+    queue = collections.deque([module['name']])
+    while queue:
+        r_name = queue.popleft()
+        if r_name in resolved:
+            continue
         resolved.add(r_name)
-        response = rpc_search({'input': {'dependencies': [{'name': r_name}]}})
-        modules = json.loads(response.get_data(as_text=True)).get('yang-catalog:modules')
-        if modules is None:
-            return
-        modules = modules.get('module')
-        if modules is None:
-            return
-        for mod in modules:
-            search_recursive(output, mod, leaf, resolved)
+        for mod in dependents.get(r_name, []):
+            queue.append(mod['name'])
             meta_data = mod.get(leaf)
-            output.add(meta_data)
+            if meta_data is not None:
+                output.add(meta_data)
+
+
+def dependents_index():
+    """Get index of modules which depend on the module with a given name
+    from the snapshot of current catalog generation.
+            :return dictionary of module names with list of modules which have it as dependency
+            :rtype dict
+    """
+    return yc_gc.catalog_cache.index('modules-data', 'dependents', create_dependents_index)
+
+
+def create_dependents_index(modules: dict):
+    """Create reverse dependency index - for each module name list all the modules
+    which have it in their dependencies.
+            Arguments:
+                :param modules: (dict) modules data as stored in Redis
+                :return dictionary of module names with list of modules which have it as dependency
+                :rtype dict
+    """
+    dependents = {}
+    for module in modules.get('module', []):
+        names = set(dependency['name'] for dependency in module.get('dependencies', []))
+        for name in names:
+            dependents.setdefault(name, []).append(module)
+    return dependents
 
 
-def process(data, passed_data, value, module, split, count):
-    """Iterates recursively through the data to find only modules
-    that are searched for
+def leaf_index(key: str):
+    """Get inverted index of the leaf values from the snapshot of current catalog generation.
             Arguments:
-                :param data: (dict) module that is searched
-                :param passed_data: (list) data that contain value searched
-                    for are saved in this variable
-                :param value: (str) value searched for
-                :param module: (dict) module that is searched
-                :param split: (str) key value that conatins value searched for
+                :param key: (str) one of the @module_keys
+                :return dictionary of leaf values with list of modules which contain the value
+                :rtype dict
+    """
+    return yc_gc.catalog_cache.index('modules-data', 'leaf-values/{}'.format(key),
+                                     lambda modules: create_leaf_index(modules, key.split('/')))
+
+
+def create_leaf_index(modules: dict, split: list):
+    """Create inverted index of all the values of the leaf defined by split path.
+    Index is created once per catalog generation, so searching for modules
+    with a specific leaf value does not need to iterate through all the modules.
+            Arguments:
+                :param modules: (dict) modules data as stored in Redis
+                :param split: (list) path of the leaf split by '/'
+                :return dictionary of leaf values with list of modules which contain the value
+                :rtype dict
+    """
+    index = {}
+    for module in modules.get('module', []):
+        for value in set(leaf_values(module, split)):
+            index.setdefault(value, []).append(module)
+    return index
+
+
+def leaf_values(data, split: list, count: int = -1):
+    """Iterates recursively through the data to find all the values of
+    the leaf defined by split path
+            Arguments:
+                :param data: (dict) module or its part that is searched
+                :param split: (list) key value that conatins value searched for
                 :param count: (int) if split contains '/' then we need to know
                     which part of the path are we searching.
+                :return generator of leaf values
     """
     if isinstance(data, str):
-        if data == value:
-            passed_data.append(module)
-            return True
+        yield data
     elif isinstance(data, list):
         for part in data:
-            if process(part, passed_data, value, module, split, count):
-                break
+            yield from leaf_values(part, split, count)
     elif isinstance(data, dict):
-        if data:
-            count += 1
-            return process(data.get(split[count]), passed_data, value, module, split, count)
-    return False
+        if data and count + 1 < len(split):
+            yield from leaf_values(data.get(split[count + 1]), split, count + 1)
 
 
-def modules_data():
-    """Get all the modules data from Redis.
-    Empty dictionary is returned if no data is stored under specified key.
+def latest_revision_requested():
+    return request.args.get('latest-revision') == 'True'
+
+
+def include_implementations(filtered: bool = False):
+    """Check whether implementations of the modules should be part of the response. Implementations
+    are included only if the request filters on them or asks for them by include argument,
+    for example include=implementations.
+            Arguments:
+                :param filtered: (bool) whether the request filters on implementations
+                :return True if implementations should be included
+                :rtype bool
     """
-    data = yc_gc.redis.get('modules-data')
-    if data is None:
-        data = '{}'
-    else:
-        data = data.decode('utf-8')
-    return json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode(data)
+    return filtered or 'implementations' in request.args.get('include', '').split(',')
 
 
-def vendors_data(clean_data=True):
-    """Get all the vendors data from Redis.
-    Empty dictionary is returned if no data is stored under specified key.
+def without_implementations(modules: list):
+    """Create copies of the modules without implementations.
+    Modules are shared with the catalog snapshot, so they are not modified.
+            Arguments:
+                :param modules: (list) modules from which the implementations are removed
+                :return list of modules without implementations
+                :rtype list
     """
-    data = yc_gc.redis.get('vendors-data')
-    if data is None:
-        data = '{}'
-    else:
-        data = data.decode('utf-8')
-    if clean_data:
-        json_data = \
-            json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode(data)
-    else:
-        json_data = json.loads(data)
-    return json_data
+    return [collections.OrderedDict((key, value) for key, value in module.items() if key != 'implementations')
+            if 'implementations' in module else module for module in modules]
 
 
-def catalog_data():
-    """Get all the catalog data (modules and vendors) from Redis.
-    Empty dictionary is returned if no data is stored under specified key.
+def modules_response(modules: list, implementations: bool = True):
+    """Create response with the list of modules. If only latest revisions are requested by latest-revision
+    argument, response contains only the list of latest revisions of the modules sorted by name.
+            Arguments:
+                :param modules: (list) modules which should be returned
+                :param implementations: (bool) whether implementations of the modules should be returned
+                :return response to the request.
     """
-    data = yc_gc.redis.get('all-catalog-data')
-    if data is None:
-        data = '{}'
+    if latest_revision_requested():
+        modules = only_latest_revisions(modules)
+    if not implementations:
+        modules = without_implementations(modules)
+    if latest_revision_requested():
+        return Response(json.dumps(modules), mimetype='application/json')
+    return Response(json.dumps({
+        'yang-catalog:modules': {
+            'module': modules
+        }
+    }), mimetype='application/json')
+
+
+def latest_modules_index():
+    """Get list of the latest revisions of all the modules from the snapshot of current catalog generation.
+            :return list of modules sorted by name
+            :rtype list
+    """
+    return yc_gc.catalog_cache.index('modules-data', 'latest-revisions',
+                                     lambda modules: only_latest_revisions(modules.get('module', [])))
+
+
+def only_latest_revisions(modules: list):
+    """Keep only the latest revision of each module from the list in single pass through the list.
+    Revisions in YYYY-MM-DD format are compared as strings, so invalid revisions like 02-29
+    of non-leap year do not need any special handling. If there are more modules with the same
+    name and revision, the first one is kept.
+            Arguments:
+                :param modules: (list) modules from which the latest revisions are selected
+                :return list of modules sorted by name
+                :rtype list
+    """
+    latest_modules = {}
+    for module in modules:
+        latest = latest_modules.get(module['name'])
+        if latest is None or latest['revision'] < module['revision']:
+            latest_modules[module['name']] = module
+    return sorted(latest_modules.values(), key=lambda module: module['name'])
+
+
+def raw_catalog_response(key: str, not_found_message: str):
+    """Create response which passes data stored in Redis under specified key to the client without decoding them.
+    Clients which accept gzip encoding get data compressed only once per catalog generation.
+    Response is tagged with strong ETag of the catalog generation, so conditional requests
+    get 304 response without touching the data at all.
+            Arguments:
+                :param key: (str) Redis key under which catalog data are stored
+                :param not_found_message: (str) description of the error if no data are stored under the key
+                :return response to the request.
+    """
+    use_gzip = 'gzip' in request.accept_encodings
+    generation = yc_gc.catalog_cache.generation()
+    etag = None
+    if generation is not None:
+        etag = '{}-{}{}'.format(key, generation, '-gzip' if use_gzip else '')
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+    if use_gzip:
+        data = yc_gc.catalog_cache.compressed(key)
     else:
-        data = data.decode('utf-8')
-    return json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode(data)
+        data = yc_gc.catalog_cache.raw(key)
+    if data is None:
+        return abort(404, description=not_found_message)
+
+    response = Response(data, mimetype='application/json')
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    if etag is not None:
+        response.set_etag(etag)
+    return response
 
 
-def create_bootstrap_info():
-    with open(get_curr_dir(__file__) + '/../../template/info.html', 'r') as f:
-        template = f.read()
-    return template
+def create_vendors_index(vendors: dict):
+    """Create tree of vendors, platforms, software-versions and software-flavors keyed by name on each level.
+    Each vendor, platform and software-version is represented by tuple of its data and dictionary
+    of its children, software-flavors are represented only by their data.
+            Arguments:
+                :param vendors: (dict) vendors data as stored in Redis
+                :return dictionary of vendor names with vendor data and its platforms
+                :rtype dict
+    """
+    vendors_index = {}
+    for vendor in vendors.get('vendor', []):
+        platforms = {}
+        for platform in vendor.get('platforms', {}).get('platform', []):
+            software_versions = {}
+            for software_version in platform.get('software-versions', {}).get('software-version', []):
+                software_flavors = {}
+                for software_flavor in software_version.get('software-flavors', {}).get('software-flavor', []):
+                    software_flavors[software_flavor['name']] = software_flavor
+                software_versions[software_version['name']] = (software_version, software_flavors)
+            platforms[platform['name']] = (platform, software_versions)
+        vendors_index[vendor['name']] = (vendor, platforms)
+    return vendors_index
+
+
+def create_vendors_statistics(vendors: dict):
+    """Create statistics of os-types with corresponding os-versions and platforms for each vendor.
+    Os-type of the software-version is taken from the first module of its first software-flavor.
+            Arguments:
+                :param vendors: (dict) vendors data as stored in Redis
+                :return dictionary of vendor names with their os-types statistics
+                :rtype dict
+    """
+    vendors_statistics = {}
+    for vendor in vendors.get('vendor', []):
+        os_type = {}
+        for plat in vendor.get('platforms', {}).get('platform', []):
+            for ver in plat.get('software-versions', {}).get('software-version', []):
+                flavors = ver.get('software-flavors', {}).get('software-flavor', [])
+                if len(flavors) == 0:
+                    continue
+                modules = flavors[0].get('modules', {}).get('module', [])
+                if len(modules) == 0 or modules[0].get('os-type') is None:
+                    continue
+                ver_os_type = modules[0]['os-type']
+                os_type.setdefault(ver_os_type, {}).setdefault(ver['name'], set()).add(plat['name'])
 
+        os_types = {}
+        for key, versions in os_type.items():
+            os_types[key] = {}
+            for key2, platforms in versions.items():
+                os_types[key][key2] = sorted(platforms)
+        vendors_statistics[vendor['name']] = os_types
+    return vendors_statistics
 
-def create_bootstrap_warning(text: str, message: str):
-    yc_gc.LOGGER.info('Rendering bootstrap warning data')
-    context = {'warn_text': text, 'warn_message': message}
-    path, filename = os.path.split(get_curr_dir(__file__) + '/../../template/warning.html')
 
-    return jinja2.Environment(loader=jinja2.FileSystemLoader(path or './')
-                              ).get_template(filename).render(context)
+def modules_data():
+    """Get all the modules data from worker snapshot of Redis data.
+    Empty dictionary is returned if no data is stored under specified key.
+    Returned data are shared between requests and must not be modified.
+    """
+    return yc_gc.catalog_cache.get('modules-data')
+
+
+def vendors_data():
+    """Get all the vendors data from worker snapshot of Redis data.
+    Empty dictionary is returned if no data is stored under specified key.
+    Returned data are shared between requests and must not be modified.
+    """
+    return yc_gc.catalog_cache.get('vendors-data')
+
+
+def catalog_data():
+    """Get all the catalog data (modules and vendors) from worker snapshot of Redis data.
+    Empty dictionary is returned if no data is stored under specified key.
+    Returned data are shared between requests and must not be modified.
+    """
+    return yc_gc.catalog_cache.get('all-catalog-data')
 
 
 def create_bootstrap_danger(message: str):
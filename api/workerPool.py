@@ -0,0 +1,181 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fixed-size pool of long-lived worker processes used by the receiver.
+Each worker process is driven by its own thread of the pool, which passes
+tasks to the worker one by one and waits for the result. Worker which does
+not finish the task in time is killed together with all the processes it
+started and it is replaced by a new worker before the next task. Callback
+of the task is called from the thread of the pool once the task is over.
+"""
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+
+# Outcomes of the tasks
+FINISHED = 'finished'
+FAILED = 'failed'
+TIMED_OUT = 'timed out'
+CRASHED = 'crashed'
+
+# Workers inherit the handler and the state of the parent process
+context = multiprocessing.get_context('fork')
+
+
+class WorkerPool:
+
+    def __init__(self, handler, size: int, timeout: float, logger: logging.Logger, name: str = 'worker'):
+        """
+        Arguments:
+            :param handler  (function) called with the task in the worker process, returns result of the task
+            :param size     (int) number of the worker processes
+            :param timeout  (float) seconds after which unfinished task is killed
+            :param logger   (Logger) logger of the pool
+            :param name     (str) name of the pool threads
+        """
+        self.__handler = handler
+        self.__timeout = timeout
+        self.__logger = logger
+        self.__tasks = queue.Queue()
+        self.__generation = 0
+        self.__threads = [threading.Thread(target=self.__run, name='{}-{}'.format(name, i), daemon=True)
+                          for i in range(size)]
+        for thread in self.__threads:
+            thread.start()
+
+    def submit(self, task, done):
+        """Queue the task for the next idle worker.
+
+        Arguments:
+            :param task     (object) picklable argument of the handler
+            :param done     (function) called with the outcome and result of the task once it is over -
+                            result is None unless task was FINISHED or FAILED
+        """
+        self.__tasks.put((task, done))
+
+    def recycle(self):
+        """Replace all the workers by new ones before their next task, e.g. after configuration was reloaded."""
+        self.__generation += 1
+
+    def close(self):
+        """Stop the workers once the queued tasks are over."""
+        for _ in self.__threads:
+            self.__tasks.put(None)
+        for thread in self.__threads:
+            thread.join()
+
+    def __run(self):
+        worker = None
+        generation = None
+        try:
+            while True:
+                item = self.__tasks.get()
+                if item is None:
+                    return
+                task, done = item
+                if worker is not None and (generation != self.__generation or not worker.is_alive()):
+                    worker.stop()
+                    worker = None
+                if worker is None:
+                    generation = self.__generation
+                    worker = Worker(self.__handler)
+                outcome, result = worker.run(task, self.__timeout)
+                if outcome in (TIMED_OUT, CRASHED):
+                    self.__logger.error('Worker {} {} while processing task'.format(worker.pid, outcome))
+                    worker.kill()
+                    worker = None
+                try:
+                    done(outcome, result)
+                except Exception:
+                    self.__logger.exception('Callback of the task failed')
+        finally:
+            if worker is not None:
+                worker.stop()
+
+
+class Worker:
+    """Worker process processing tasks sent through the pipe."""
+
+    def __init__(self, handler):
+        self.__connection, child_connection = context.Pipe()
+        # Not a daemon, so the tasks can start their own processes
+        self.__process = context.Process(target=work, args=(handler, child_connection))
+        self.__process.start()
+        child_connection.close()
+        self.pid = self.__process.pid
+
+    def is_alive(self) -> bool:
+        return self.__process.is_alive()
+
+    def run(self, task, timeout: float):
+        """Process the task in the worker.
+
+        :return tuple of the outcome and result of the task
+        """
+        try:
+            self.__connection.send(task)
+            # Pipe becomes readable also when the worker exits
+            if not self.__connection.poll(timeout):
+                return TIMED_OUT, None
+            return self.__connection.recv()
+        except (EOFError, OSError):
+            return CRASHED, None
+
+    def stop(self):
+        """Let the worker exit after its current task."""
+        try:
+            self.__connection.send(None)
+        except OSError:
+            pass
+        self.__connection.close()
+        self.__process.join()
+
+    def kill(self):
+        """Kill the worker and all the processes it started."""
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        if self.__process.is_alive():
+            self.__process.kill()
+        self.__connection.close()
+        self.__process.join()
+
+
+def work(handler, connection):
+    # Own process group, so processes started by the task are killed with the worker
+    os.setpgid(0, 0)
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            # Parent process exited
+            return
+        if task is None:
+            return
+        try:
+            result = FINISHED, handler(task)
+        except Exception as e:
+            result = FAILED, repr(e)
+        connection.send(result)
@@ -39,7 +39,6 @@ __copyright__ = "Copyright 2018 Cisco and its affiliates, Copyright The IETF Tru
 __license__ = "Apache License, Version 2.0"
 __email__ = "miroslav.kovac@pantheon.tech"
 
-import collections
 import errno
 import grp
 import json
@@ -50,7 +49,7 @@ import sys
 import threading
 import time
 import uuid
-from datetime import datetime, timedelta
+from datetime import timedelta
 from threading import Lock
 
 import requests
@@ -68,6 +67,10 @@ from api.views.userSpecificModuleMaintenace.moduleMaintanace import \
 from api.views.yangSearch.yangSearch import app as yang_search_app
 from api.views.ycJobs.ycJobs import app as jobs_app
 from api.views.ycSearch.ycSearch import app as search_app
+from api.views.ycSearch.ycSearch import leaf_index, only_latest_revisions
+from utility.redisCatalog import (current_generation, publish_catalog_stream,
+                                  refresh_catalog)
+from utility.staticVariables import redis_catalog_seed_lock_key
 
 
 class MyFlask(Flask):
@@ -88,7 +91,6 @@ class MyFlask(Flask):
 
     def process_response(self, response):
         response = super().process_response(response)
-        self.create_response_only_latest_revision(response)
         #self.create_response_with_yangsuite_link(response)
 
         try:
@@ -113,115 +115,35 @@ class MyFlask(Flask):
             if not yc_gc.oidc.user_loggedin and 'login' not in request.path:
                 return abort(401, description='not yet Authorized')
 
-    def create_response_only_latest_revision(self, response):
-        if request.args.get('latest-revision'):
-            if 'True' == request.args.get('latest-revision'):
-                if response.data:
-                        if sys.version_info >= (3, 4):
-                            decoded_string = response.data.decode(encoding='utf-8', errors='strict')
-                        else:
-                            decoded_string = response.data
-                        json_data = json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode(decoded_string)
-                else:
-                    return response
-                modules = None
-                if json_data.get('yang-catalog:modules') is not None:
-                    if json_data.get('yang-catalog:modules').get(
-                            'module') is not None:
-                        modules = json_data.get('yang-catalog:modules').get(
-                            'module')
-                elif json_data.get('module') is not None:
-                    modules = json_data.get('module')
-                modules_to_remove = []
-                if modules:
-                    if len(modules) > 0:
-                        newlist = sorted(modules, key=lambda k: k['name'])
-                        temp_module = None
-                        i = 0
-                        for mod in newlist:
-                            name = mod['name']
-                            if temp_module:
-                                if temp_module['name'] == name:
-                                    revisions = []
-                                    mod['index'] = i
-                                    year = int(temp_module['revision'].split('-')[0])
-                                    month = int(temp_module['revision'].split('-')[1])
-                                    day = int(temp_module['revision'].split('-')[2])
-                                    try:
-                                        revisions.append(datetime(year, month, day))
-                                    except ValueError:
-                                        if day == 29 and month == 2:
-                                            revisions.append(datetime(year, month, 28))
-                                    year = int(mod['revision'].split('-')[0])
-                                    month = int(mod['revision'].split('-')[1])
-                                    day = int(mod['revision'].split('-')[2])
-                                    try:
-                                        revisions.append(datetime(year, month, day))
-                                    except ValueError:
-                                        if day == 29 and month == 2:
-                                            revisions.append(datetime(year, month, 28))
-                                    latest = revisions.index(max(revisions))
-                                    if latest == 0:
-                                        modules_to_remove.append(mod['index'])
-                                    elif latest == 1:
-                                        modules_to_remove.append(temp_module['index'])
-                                else:
-                                    mod['index'] = i
-                                    temp_module = mod
-                            else:
-                                mod['index'] = i
-                                temp_module = mod
-                            i += 1
-                        for mod_to_remove in reversed(modules_to_remove):
-                            newlist.remove(newlist[mod_to_remove])
-                        for mod in newlist:
-                            if mod.get('index'):
-                                del mod['index']
-                        response.data = json.dumps(newlist)
-
     def get_dependencies(self, mod, mods, inset):
-        if mod.get('dependencies'):
-            for dep in mod['dependencies']:
-                if dep['name'] in inset:
+        """Resolve transitive dependencies of the module from the snapshot of current catalog generation.
+        Dependency with specified revision is resolved to the module with the same name and revision,
+        otherwise the latest revision of the module is used.
+
+        Arguments:
+            :param mod      (dict) module which dependencies are resolved
+            :param mods     (set) file names of the resolved modules - dependencies are added to it
+            :param inset    (set) names of the resolved modules - dependencies are added to it
+        """
+        modules_by_name = leaf_index('name')
+        for dep in mod.get('dependencies') or []:
+            if dep['name'] in inset:
+                continue
+            candidates = modules_by_name.get(dep['name'], [])
+            if dep.get('revision'):
+                mods.add('{}@{}.yang'.format(dep['name'], dep['revision']))
+                inset.add(dep['name'])
+                for candidate in candidates:
+                    if candidate['revision'] == dep['revision']:
+                        self.get_dependencies(candidate, mods, inset)
+                        break
+            else:
+                if not candidates:
                     continue
-                if dep.get('revision'):
-                    mods.add(dep['name'] + '@' + dep[
-                        'revision'] + '.yang')
-                    inset.add(dep['name'])
-                    search_filter = json.dumps({
-                        'input': {
-                            'name': dep['name'],
-                            'revision': dep['revision']
-                        }
-                    })
-                    rp = requests.post('{}search-filter'.format(
-                        yc_gc.yangcatalog_api_prefix), search_filter,
-                        headers={
-                            'Content-type': 'application/json',
-                            'Accept': 'application/json'}
-                    )
-                    mo = rp.json()['yang-catalog:modules']['module'][0]
-                    self.get_dependencies(mo, mods, inset)
-                else:
-                    rp = requests.get('{}search/name/{}'
-                                      .format(yc_gc.yangcatalog_api_prefix,
-                                              dep['name']))
-                    if rp.status_code == 404:
-                        continue
-                    mo = rp.json()['yang-catalog:modules']['module']
-                    revisions = []
-                    for m in mo:
-                        revision = m['revision']
-                        year = int(revision.split('-')[0])
-                        month = int(revision.split('-')[1])
-                        day = int(revision.split('-')[2])
-                        revisions.append(datetime(year, month, day))
-                    latest = revisions.index(max(revisions))
-                    inset.add(dep['name'])
-                    mods.add('{}@{}.yang'.format(dep['name'],
-                                                 mo[latest][
-                                                     'revision']))
-                    self.get_dependencies(mo[latest], mods, inset)
+                latest = only_latest_revisions(candidates)[0]
+                inset.add(dep['name'])
+                mods.add('{}@{}.yang'.format(dep['name'], latest['revision']))
+                self.get_dependencies(latest, mods, inset)
 
     def create_response_with_yangsuite_link(self, response):
         if request.headers.environ.get('HTTP_YANGSUITE'):
@@ -267,25 +189,30 @@ class MyFlask(Flask):
                     mods.add(name)
                     inset.add(mod['name'])
                     self.get_dependencies(mod, mods, inset)
+                iana_if_types = leaf_index('name').get('iana-if-type')
                 if (('openconfig-interfaces' in inset
                     or 'ietf-interfaces' in inset)
-                    and 'iana-if-type' not in inset):
-                    resp = requests.get(
-                        '{}search/name/iana-if-type?latest-revision=True'.format(yc_gc.yangcatalog_api_prefix),
-                        headers={
-                            'Content-type': 'application/json',
-                            'Accept': 'application/json'})
-                    name = '{}@{}.yang'.format(resp.json()[0]['name'],
-                                               resp.json()[0]['revision'])
+                    and 'iana-if-type' not in inset and iana_if_types):
+                    iana_if_type = only_latest_revisions(iana_if_types)[0]
+                    name = '{}@{}.yang'.format(iana_if_type['name'], iana_if_type['revision'])
                     mods.add(name)
-                    inset.add(resp.json()[0]['name'])
-                    self.get_dependencies(resp.json()[0], mods, inset)
+                    inset.add(iana_if_type['name'])
+                    self.get_dependencies(iana_if_type, mods, inset)
 
                 modules = []
+                linked = set()
                 for mod in mods:
                     if not os.path.exists(yc_gc.save_file_dir + '/' + mod):
                         continue
-                    shutil.copy(yc_gc.save_file_dir + '/' + mod, ys_dir)
+                    # Module files are never modified once saved, so they can be shared by hardlink
+                    target = ys_dir + '/' + mod
+                    try:
+                        os.link(yc_gc.save_file_dir + '/' + mod, target)
+                        linked.add(target)
+                    except FileExistsError:
+                        pass
+                    except OSError:
+                        shutil.copy(yc_gc.save_file_dir + '/' + mod, ys_dir)
                     modules.append([mod.split('@')[0], mod.split('@')[1]
                                    .replace('.yang', '')])
                 ys_dir = yc_gc.ys_users_dir
@@ -311,7 +238,9 @@ class MyFlask(Flask):
                     for momo in dirs:
                         os.chown(os.path.join(root, momo), uid, gid)
                     for momo in files:
-                        os.chown(os.path.join(root, momo), uid, gid)
+                        # Owner of hardlinked files would be changed in save_file_dir as well
+                        if os.path.join(root, momo) not in linked:
+                            os.chown(os.path.join(root, momo), uid, gid)
                 os.chown(path, uid, gid)
                 json_data['yangsuite-url'] = (
                     '{}yangsuite/{}'.format(yc_gc.yangcatalog_api_prefix, id))
@@ -408,9 +337,10 @@ CORS(application, supports_credentials=True)
 # monitor(application)              # to monitor requests using prometheus
 lock_for_load = Lock()
 
-def make_cache(credentials, response, data=None):
+def make_cache(credentials, response):
     """After we delete or add modules we need to reload all the modules to the file
-    for quicker search. This module is then loaded to the memory.
+    for quicker search. Catalog is streamed from ConfD and written to Redis as new
+    catalog generation module by module, so the whole catalog is never kept in memory.
             Arguments:
                 :param response: (str) Contains string 'work' which will be sent back if
                     everything went through fine
@@ -420,34 +350,38 @@ def make_cache(credentials, response, data=None):
                     why it failed.
     """
     try:
-        if data is None:
-            data = ''
-            while data is None or len(data) == 0 or data == 'None':
-                yc_gc.LOGGER.debug("Loading data from confd")
-                path = '{}://{}:{}//restconf/data/yang-catalog:catalog'.format(yc_gc.protocol, yc_gc.confd_ip,
-                                                                               yc_gc.confdPort)
-                try:
-                    data = requests.get(path, auth=(credentials[0], credentials[1]),
-                                        headers={'Accept': 'application/yang-data+json'}).json()
-                    data = json.dumps(data)
-                    yc_gc.LOGGER.debug("Data loaded and parsed to json from confd db successfully")
-                except ValueError as e:
-                    yc_gc.LOGGER.warning('not valid json returned')
-                    data = ''
-                except Exception:
-                    yc_gc.LOGGER.warning('exception during loading data from confd')
-                    data = None
-                if data is None or len(data) == 0 or data == 'None' or data == '':
-                    secs = 30
-                    yc_gc.LOGGER.info('Confd not started or does not contain any data. Waiting for {} secs before reloading'.format(secs))
-                    time.sleep(secs)
-        #yc_gc.LOGGER.info('is uwsgy {} type {}'.format(is_uwsgi, type(is_uwsgi)))
-        yc_gc.redis.set('all-catalog-data', data)
+        path = '{}://{}:{}//restconf/data/yang-catalog:catalog'.format(yc_gc.protocol, yc_gc.confd_ip,
+                                                                       yc_gc.confdPort)
+        while True:
+            yc_gc.LOGGER.debug("Loading data from confd")
+            recording = None
+            try:
+                with requests.get(path, auth=(credentials[0], credentials[1]),
+                                  headers={'Accept': 'application/yang-data+json'}, stream=True) as confd_response:
+                    confd_response.raise_for_status()
+                    # record catalog to the snapshot file used for the cold start while it is streamed
+                    recording = yc_gc.catalog_snapshot.record(confd_response.iter_content(chunk_size=65536))
+                    # write new catalog generation and publish it at once - workers will decode catalog data again
+                    generation, written = publish_catalog_stream(yc_gc.redis, recording)
+                yc_gc.LOGGER.info('Catalog generation {} published, {} modules written to Redis'
+                                  .format(generation, written))
+                save_catalog_snapshot(recording)
+                return response
+            except ValueError:
+                if recording is not None:
+                    recording.discard()
+                yc_gc.LOGGER.warning('not valid json or empty catalog returned')
+            except Exception:
+                if recording is not None:
+                    recording.discard()
+                yc_gc.LOGGER.warning('exception during loading data from confd')
+            secs = 30
+            yc_gc.LOGGER.info('Confd not started or does not contain any data. Waiting for {} secs before reloading'.format(secs))
+            time.sleep(secs)
     except:
         e = sys.exc_info()[0]
         yc_gc.LOGGER.error('Could not load json to cache. Error: {}'.format(e))
-        return 'Server error - downloading cache', None
-    return response, data
+        return 'Server error - downloading cache'
 
 
 def create_response(body, status, headers=None):
@@ -535,37 +469,56 @@ def load():
 
 def load_uwsgi_cache():
     response = 'work'
-    response, data = make_cache(yc_gc.credentials, response)
-    cat = json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode(data)['yang-catalog:catalog']
-    modules = cat['modules']
-    vendors = cat.get('vendors', {})
-
-    yc_gc.redis.set("modules-data", json.dumps(modules))
-    yc_gc.redis.set("vendors-data", json.dumps(vendors))
-    if len(modules) != 0:
-        existing_keys = ["modules-data", "vendors-data", "all-catalog-data"]
-        # recreate keys to redis if there are any
-        for i, mod in enumerate(modules['module']):
-            key = mod['name'] + '@' + mod['revision'] + '/' + mod['organization']
-            existing_keys.append(key)
-            value = json.dumps(mod)
-            yc_gc.redis.set(key, value)
-        list_to_delete_keys_from_redis = []
-        for key in yc_gc.redis.scan_iter():
-            if key.decode('utf-8') not in existing_keys:
-                list_to_delete_keys_from_redis.append(key)
-        if len(list_to_delete_keys_from_redis) != 0:
-            yc_gc.redis.delete(*list_to_delete_keys_from_redis)
-
+    response = make_cache(yc_gc.credentials, response)
     if response != 'work':
         yc_gc.LOGGER.error('Could not load or create cache')
         sys.exit(500)
 
 
+def save_catalog_snapshot(recording):
+    try:
+        if recording.save():
+            yc_gc.LOGGER.info('Catalog snapshot saved to {}'.format(recording.path))
+    except OSError as e:
+        yc_gc.LOGGER.warning('Could not save catalog snapshot: {}'.format(e))
+
+
+def refresh_cache():
+    # With preload this runs in the gunicorn master while workers are forked from it,
+    # so only Redis lock is held - forked workers would inherit lock_for_load locked forever
+    if not refresh_catalog(yc_gc.redis, load_uwsgi_cache):
+        yc_gc.LOGGER.info('Catalog is already being refreshed by other process')
+
+
+def seed_from_snapshot():
+    """Publish catalog from the local snapshot if Redis does not contain any catalog yet
+    and refresh it from ConfD in the background. Only one process seeds the catalog -
+    the gunicorn master when the application is preloaded - the others wait until it is published.
+    """
+    if not yc_gc.catalog_snapshot.exists():
+        return
+    if not yc_gc.redis.set(redis_catalog_seed_lock_key, os.getpid(), nx=True, ex=600):
+        return
+    try:
+        if current_generation(yc_gc.redis) is not None:
+            return
+        generation, written = publish_catalog_stream(yc_gc.redis, yc_gc.catalog_snapshot.read())
+        yc_gc.LOGGER.info('Catalog generation {} published from snapshot {}, {} modules written to Redis'
+                          .format(generation, yc_gc.catalog_snapshot.path, written))
+    except Exception as e:
+        yc_gc.LOGGER.warning('Could not load catalog snapshot {}: {}'.format(yc_gc.catalog_snapshot.path, e))
+        return
+    finally:
+        yc_gc.redis.delete(redis_catalog_seed_lock_key)
+    threading.Thread(target=refresh_cache, daemon=True).start()
+
+
 def load_app_first_time():
-    while yc_gc.redis.get('yang-catalog@2018-04-03/ietf') is None:
+    if current_generation(yc_gc.redis) is None:
+        seed_from_snapshot()
+    while current_generation(yc_gc.redis) is None:
         sec = 5
-        yc_gc.LOGGER.info('yang-catalog@2018-04-03 not loaded yet waiting for {} seconds'.format(sec))
+        yc_gc.LOGGER.info('Catalog generation not published yet waiting for {} seconds'.format(sec))
         time.sleep(sec)
 
 
@@ -24,6 +24,8 @@ from collections import OrderedDict
 
 import redis
 
+from utility.redisCatalog import publish_catalog
+
 
 def load_catalog_data():
     resources_path = '{}/tests/resources/'.format(os.path.dirname(os.path.abspath(__file__)))
@@ -36,25 +38,13 @@ def load_catalog_data():
         print('Failed to load data from .json file')
         sys.exit(1)
 
-    catalog = catalog_data.get('yang-catalog:catalog')
-    modules = catalog['modules']['module']
-    vendors = catalog['vendors']['vendor']
-
-    for module in modules:
-        if module['name'] == 'yang-catalog' and module['revision'] == '2018-04-03':
-            redis_cache.set('yang-catalog@2018-04-03/ietf', json.dumps(module))
-            print('yang-catalog@2018-04-03 module set in Redis')
-            break
-
-    catalog_data_json = json.JSONDecoder(object_pairs_hook=OrderedDict).decode(json.dumps(catalog_data))['yang-catalog:catalog']
-    modules = catalog_data_json['modules']
-    vendors = catalog_data_json.get('vendors', {})
-
-    redis_cache.set('modules-data', json.dumps(modules))
-    print('{} modules set in Redis.'.format(len(modules.get('module', {}))))
-    redis_cache.set('vendors-data', json.dumps(vendors))
-    print('{} vendors set in Redis.'.format(len(vendors.get('vendor', {}))))
-    redis_cache.set('all-catalog-data', json.dumps(catalog_data))
+    catalog = catalog_data['yang-catalog:catalog']
+    modules = catalog['modules']
+    vendors = catalog.get('vendors', {})
+
+    generation, written = publish_catalog(redis_cache, modules, vendors)
+    print('{} modules and {} vendors set in Redis.'.format(len(modules.get('module', {})), len(vendors.get('vendor', {}))))
+    print('Catalog generation {} published, {} modules written.'.format(generation, written))
 
 
 redis_cache = redis.Redis(host='localhost', port=6379)
@@ -36,6 +36,7 @@ from copy import deepcopy
 from datetime import datetime
 
 import requests
+from api.cache.checkUpdateFromCache import format_errors
 from pyang import plugin
 from pyang.plugins.tree import emit_tree
 from utility import log, messageFactory
@@ -48,7 +49,7 @@ from utility.yangParser import create_context
 class ModulesComplicatedAlgorithms:
 
     def __init__(self, log_directory, yangcatalog_api_prefix, credentials, confd_prefix,
-                 save_file_dir, direc, all_modules, yang_models_dir, temp_dir):
+                 save_file_dir, direc, all_modules, yang_models_dir, temp_dir, check_update_from_cache=None):
         global LOGGER
         LOGGER = log.get_logger('modulesComplicatedAlgorithms', '{}/parseAndPopulate.log'.format(log_directory))
         if all_modules is None:
@@ -66,6 +67,7 @@ class ModulesComplicatedAlgorithms:
         self.temp_dir = temp_dir
         self.__direc = direc
         self.__trees = dict()
+        self.__check_update_from_cache = check_update_from_cache
         self.__unavailable_modules = []
         LOGGER.info('get all existing modules')
         response = requests.get('{}search/modules'.format(self.__yangcatalog_api_prefix),
@@ -627,10 +629,11 @@ class ModulesComplicatedAlgorithms:
                             new_schema_exist = self.__check_schema_file(modules[-1])
 
                             if old_schema_exist and new_schema_exist:
-                                ctx, new_schema_ctx = context_check_update_from(old_schema, new_schema, self.__yang_models, self.__save_file_dir)
-                                if len(ctx.errors) == 0:
-                                    if ('{}@{}'.format(modules[-1]['name'], modules[-1]['revision']) in self.__trees and
-                                            '{}@{}'.format(modules[-2]['name'], modules[-2]['revision']) in self.__trees):
+                                trees_known = ('{}@{}'.format(modules[-1]['name'], modules[-1]['revision']) in self.__trees and
+                                               '{}@{}'.format(modules[-2]['name'], modules[-2]['revision']) in self.__trees)
+                                errors, ctx, new_schema_ctx = self.__check_update_from(old_schema, new_schema, trees_known)
+                                if errors == '':
+                                    if trees_known:
                                         new_yang_tree = self.__trees['{}@{}'.format(modules[-1]['name'], modules[-1]['revision'])]
                                         old_yang_tree = self.__trees['{}@{}'.format(modules[-2]['name'], modules[-2]['revision'])]
                                     else:
@@ -765,10 +768,11 @@ class ModulesComplicatedAlgorithms:
                                 new_schema_exist = self.__check_schema_file(modules[x])
 
                                 if old_schema_exist and new_schema_exist:
-                                    ctx, new_schema_ctx = context_check_update_from(old_schema, new_schema, self.__yang_models, self.__save_file_dir)
-                                    if len(ctx.errors) == 0:
-                                        if ('{}@{}'.format(modules[x - 1]['name'], modules[x - 1]['revision']) in self.__trees and
-                                                '{}@{}'.format(modules[x]['name'], modules[x]['revision']) in self.__trees):
+                                    trees_known = ('{}@{}'.format(modules[x - 1]['name'], modules[x - 1]['revision']) in self.__trees and
+                                                   '{}@{}'.format(modules[x]['name'], modules[x]['revision']) in self.__trees)
+                                    errors, ctx, new_schema_ctx = self.__check_update_from(old_schema, new_schema, trees_known)
+                                    if errors == '':
+                                        if trees_known:
                                             old_yang_tree = self.__trees['{}@{}'.format(modules[x - 1]['name'], modules[x - 1]['revision'])]
                                             new_yang_tree = self.__trees['{}@{}'.format(modules[x]['name'], modules[x]['revision'])]
                                         else:
@@ -961,6 +965,31 @@ class ModulesComplicatedAlgorithms:
 
         return result
 
+    def __check_update_from(self, old_schema: str, new_schema: str, trees_known: bool):
+        """ Get errors found by pyang --check-update-from validation of two revisions of the module.
+        Result is taken from the cache if possible. Pyang context is created only if the result
+        was not cached yet or if it is needed to create yang trees which are not known yet.
+
+        :param old_schema   (str) full path to the yang file with older revision
+        :param new_schema   (str) full path to the yang file with newer revision
+        :param trees_known  (bool) whether yang trees of both revisions are already known
+        :return             tuple of formatted errors, pyang context and context of the new module
+                            (both contexts are None if they were not created)
+        """
+        ctx = new_schema_ctx = None
+        cache = self.__check_update_from_cache
+        if cache is None:
+            ctx, new_schema_ctx = context_check_update_from(old_schema, new_schema, self.__yang_models, self.__save_file_dir)
+            return format_errors(ctx), ctx, new_schema_ctx
+
+        key = cache.key(old_schema, new_schema)
+        errors = cache.get(key)
+        if errors is None or (errors == '' and not trees_known):
+            ctx, new_schema_ctx = context_check_update_from(old_schema, new_schema, self.__yang_models, self.__save_file_dir)
+            errors = format_errors(ctx)
+            cache.set(key, errors)
+        return errors, ctx, new_schema_ctx
+
     def __check_if_latest_revision(self, module: dict):
         """ Check if the parsed module is the latest revision.
 
@@ -43,6 +43,8 @@ import utility.log as log
 from utility.staticVariables import confd_headers
 from utility.util import prepare_to_indexing, send_to_indexing2
 
+from api.cache.checkUpdateFromCache import CheckUpdateFromCache
+from api.cache.treeCache import TreeCache
 from parseAndPopulate.fileHasher import FileHasher
 from parseAndPopulate.modulesComplicatedAlgorithms import \
     ModulesComplicatedAlgorithms
@@ -112,6 +114,8 @@ class ScriptConfig:
                             type=str, help='Directory where the yang file will be saved. Default: {}'.format(self.__save_file_dir))
         parser.add_argument('--force-parsing', action='store_true', default=False,
                             help='Force to parse files (do not skip parsing for unchanged files).')
+        parser.add_argument('--prefill-trees', action='store_true', default=False,
+                            help='Render yang trees of the populated modules to the tree cache.')
         self.args, extra_args = parser.parse_known_args()
         self.defaults = [parser.get_default(key) for key in self.args.__dict__.keys()]
 
@@ -146,6 +150,7 @@ class ScriptConfig:
                                      ' Default: ' + self.__api_protocol
         ret['options']['api_ip'] = 'Set host address where the API is started. Default: ' + self.__api_host
         ret['options']['force_parsing'] = 'Force to parse files (do not skip parsing for unchanged files).'
+        ret['options']['prefill_trees'] = 'Render yang trees of the populated modules to the tree cache.'
         return ret
 
 
@@ -349,7 +354,8 @@ def main(scriptConf=None):
         complicatedAlgorithms = ModulesComplicatedAlgorithms(log_directory, yangcatalog_api_prefix,
                                                              args.credentials,
                                                              confd_prefix, args.save_file_dir,
-                                                             direc, None, yang_models, temp_dir)
+                                                             direc, None, yang_models, temp_dir,
+                                                             CheckUpdateFromCache('{}/check-update-from'.format(cache_dir)))
         complicatedAlgorithms.parse_non_requests()
         LOGGER.info('Waiting for cache reload to finish')
         process_reload_cache.join()
@@ -373,6 +379,13 @@ def main(scriptConf=None):
         except OSError:
             # Be happy if deleted
             pass
+
+    if args.prefill_trees:
+        LOGGER.info('Rendering yang trees of populated modules')
+        paths = ['{}/{}@{}.yang'.format(args.save_file_dir, module['name'], module['revision']) for module in modules_json]
+        tree_cache = TreeCache('{}/trees'.format(cache_dir))
+        rendered = tree_cache.prefill(paths, yang_models, args.save_file_dir, LOGGER)
+        LOGGER.info('{} yang trees rendered'.format(rendered))
     LOGGER.info('Populate script finished successfully')
 
 
@@ -41,6 +41,7 @@ import requests
 import utility.log as log
 from dateutil.parser import parse
 from requests import ConnectionError
+from utility.redisCatalog import publish_catalog
 from utility.util import job_log
 
 if sys.version_info >= (3, 4):
@@ -292,44 +293,16 @@ def main(scriptConf=None):
         file_load.close()
         LOGGER.info('Cache reloaded to ConfD. Starting to load data into Redis.')
 
-        # Init Redis and set values to empty dicts
         redis_cache = redis.Redis(
             host=redis_host,
             port=redis_port)
-        redis_cache.set('modules-data', '{}')
-        redis_cache.set('vendors-data', '{}')
-        redis_cache.set('all-catalog-data', '{}')
 
-        for module in modules_json:
-            if module['name'] == 'yang-catalog' and module['revision'] == '2018-04-03':
-                redis_cache.set('yang-catalog@2018-04-03/ietf', json.dumps(module))
-                break
-        LOGGER.debug('yang-catalog@2018-04-03/ietf module set')
-
-        catalog_data_json = json.JSONDecoder(object_pairs_hook=OrderedDict).decode(json.dumps(catalog_data))['yang-catalog:catalog']
-        modules = catalog_data_json['modules']
-        if catalog_data_json.get('vendors'):
-            vendors = catalog_data_json['vendors']
-        else:
-            vendors = {}
-        redis_cache.set('modules-data', json.dumps(modules))
-        redis_cache.set('vendors-data', json.dumps(vendors))
-        redis_cache.set('all-catalog-data', json.dumps(catalog_data))
-
-        if len(modules) != 0:
-            existing_keys = ['modules-data', 'vendors-data', 'all-catalog-data']
-            # recreate keys to redis if there are any
-            for i, mod in enumerate(modules['module']):
-                key = '{}@{}/{}'.format(mod['name'], mod['revision'], mod['organization'])
-                existing_keys.append(key)
-                value = json.dumps(mod)
-                redis_cache.set(key, value)
-            list_to_delete_keys_from_redis = []
-            for key in redis_cache.scan_iter():
-                if key.decode('utf-8') not in existing_keys:
-                    list_to_delete_keys_from_redis.append(key)
-            if len(list_to_delete_keys_from_redis) != 0:
-                redis_cache.delete(*list_to_delete_keys_from_redis)
+        catalog = catalog_data['yang-catalog:catalog']
+        modules = catalog['modules']
+        vendors = catalog.get('vendors', {})
+        # write new catalog generation and publish it at once
+        generation, written = publish_catalog(redis_cache, modules, vendors)
+        LOGGER.info('Catalog generation {} published, {} modules written to Redis'.format(generation, written))
 
         LOGGER.info('All the modules data set to Redis successfully')
 
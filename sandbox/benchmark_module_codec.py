@@ -0,0 +1,63 @@
+"""
+Compare size and encode/decode latency of the module documents stored in Redis
+using plain JSON and ZlibCodec with dictionary trained on the catalog.
+Modules are loaded either from JSON file with the catalog or from the catalog
+generation currently published in Redis.
+"""
+import argparse
+import json
+import time
+
+import redis
+from utility.moduleCodec import (JsonCodec, ZlibCodec, decode_module,
+                                 encode_module, train_dictionary)
+from utility.redisCatalog import current_generation, get_catalog_data
+
+
+def load_modules(args):
+    if args.catalog is not None:
+        with open(args.catalog, 'r') as f:
+            catalog = json.load(f)
+        return catalog['yang-catalog:catalog']['modules']['module']
+    redis_cache = redis.Redis(host=args.redis_host, port=args.redis_port)
+    data = get_catalog_data(redis_cache, current_generation(redis_cache), 'modules-data')
+    return json.loads(data).get('module', [])
+
+
+def benchmark(name: str, codec, values: list, redis_cache):
+    start = time.perf_counter()
+    encoded = [encode_module(codec, value) for value in values]
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for value in encoded:
+        json.loads(decode_module(redis_cache, value))
+    decode_time = time.perf_counter() - start
+    size = sum(len(value) for value in encoded)
+    largest = max(len(value) for value in encoded)
+    print('{:<20} {:>12} {:>12} {:>14.1f} {:>14.1f}'.format(
+        name, size, largest, encode_time / len(values) * 1e6, decode_time / len(values) * 1e6))
+    return size
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark codecs of the module documents stored in Redis')
+    parser.add_argument('--catalog', type=str, default=None,
+                        help='Path to the JSON file with the catalog. Catalog published in Redis is used if not set')
+    parser.add_argument('--redis-host', type=str, default='localhost', help='Redis host')
+    parser.add_argument('--redis-port', type=int, default=6379, help='Redis port')
+    args = parser.parse_args()
+
+    modules = load_modules(args)
+    values = [json.dumps(module, separators=(',', ':')) for module in modules]
+    start = time.perf_counter()
+    dictionary = train_dictionary(modules)
+    print('Dictionary of {} bytes trained on {} modules in {:.2f} s\n'.format(
+        len(dictionary), len(modules), time.perf_counter() - start))
+
+    # Dictionaries are registered by the codecs, so Redis is not needed for decoding
+    print('{:<20} {:>12} {:>12} {:>14} {:>14}'.format('codec', 'total B', 'largest B', 'encode us', 'decode us'))
+    json_size = benchmark('json', JsonCodec(), [json.dumps(module) for module in modules], None)
+    benchmark('compact json', JsonCodec(), values, None)
+    benchmark('zlib', ZlibCodec(), values, None)
+    zlib_size = benchmark('zlib + dictionary', ZlibCodec(dictionary), values, None)
+    print('\nzlib + dictionary uses {:.1f} % of the plain JSON size'.format(zlib_size / json_size * 100))
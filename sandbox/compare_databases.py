@@ -17,6 +17,7 @@ import redis
 import utility.log as log
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import RequestError
+from utility.redisCatalog import current_generation, get_module, get_module_keys, get_modules
 from utility.util import fetch_module_by_schema
 
 
@@ -45,14 +46,13 @@ def create_query(name: str, revision: str):
     return query
 
 
-def check_module_in_redis(hits: list):
+def check_module_in_redis(hits: list, generation):
     redis_missing = []
     redis_missing_count = 0
 
-    for hit in hits:
-        modules = hit['_source']
-        key = '{}@{}/{}'.format(modules['module'], modules['revision'], modules['organization'])
-        data = redis.get(key)
+    keys = ['{}@{}/{}'.format(hit['_source']['module'], hit['_source']['revision'], hit['_source']['organization'])
+            for hit in hits]
+    for key, data in zip(keys, get_modules(redis, generation, keys)):
         if data is None:
             redis_missing.append(key)
             redis_missing_count += 1
@@ -85,6 +85,7 @@ if __name__ == '__main__':
 
     # Create Redis and Elasticsearch connections
     redis = redis.Redis(host=redis_host, port=redis_port)
+    generation = current_generation(redis)
 
     if es_aws == 'True':
         es_aws = True
@@ -103,9 +104,8 @@ if __name__ == '__main__':
     redis_modules = 0
 
     # PHASE I: Check modules from Redis in Elasticsearch
-    for key in redis.scan_iter():
+    for key in get_module_keys(redis, generation):
         try:
-            key = key.decode('utf-8')
             name = key.split('@')[0]
             revision = key.split('@')[1].split('/')[0]
             organization = key.split('@')[1].split('/')[1]
@@ -116,7 +116,7 @@ if __name__ == '__main__':
 
             if es_result['hits']['total'] == 0:
                 es_missing_modules.append(key)
-                module = json.loads(redis.get(key).decode('utf-8'))
+                module = json.loads(get_module(redis, generation, key).decode('utf-8'))
                 # Check if this file is in /var/yang/all_modules folder
                 all_modules_path = '{}/{}@{}.yang'.format(save_file_dir, name, revision)
                 if not os.path.isfile(all_modules_path):
@@ -146,7 +146,7 @@ if __name__ == '__main__':
     scroll_id = es_result.get('_scroll_id')
     hits = es_result['hits']['hits']
     es_modules += len(hits)
-    result = check_module_in_redis(hits)
+    result = check_module_in_redis(hits, generation)
     redis_missing_modules.extend(result)
 
     while len(es_result['hits']['hits']):
@@ -158,7 +158,7 @@ if __name__ == '__main__':
         scroll_id = es_result.get('_scroll_id')
         hits = es_result['hits']['hits']
         es_modules += len(hits)
-        result = check_module_in_redis(hits)
+        result = check_module_in_redis(hits, generation)
         redis_missing_modules.extend(result)
 
     es.clear_scroll(body={'scroll_id': [scroll_id]}, ignore=(404, ))
@@ -61,6 +61,25 @@ class TestApiSearchClass(unittest.TestCase):
             self.assertIn(key, module)
             self.assertEqual(module.get(key), value)
 
+    def test_search_by_organization_latest_revision(self):
+        """Test if response contains only list of latest revisions of the modules sorted by name
+        if latest-revision argument is set.
+        """
+        key = 'organization'
+        value = 'ietf'
+        path = '{}/{}'.format(key, value)
+        result = self.client.get('api/search/{}?latest-revision=True'.format(path))
+        data = json.loads(result.data)
+        all_modules = json.loads(self.client.get('api/search/{}'.format(path)).data)['yang-catalog:modules']['module']
+
+        self.assertEqual(result.status_code, 200)
+        self.assertIsInstance(data, list)
+        names = [module['name'] for module in data]
+        self.assertEqual(names, sorted(set(names)))
+        for module in data:
+            revisions = [mod['revision'] for mod in all_modules if mod['name'] == module['name']]
+            self.assertEqual(module['revision'], max(revisions))
+
     def test_search_incorrect_module_key(self):
         """Test error response when invalid 'key' value was provided.
         """
@@ -283,6 +302,20 @@ class TestApiSearchClass(unittest.TestCase):
             self.assertIn('submodule', module)
             self.assertEqual(module.get('organization'), 'ietf')
 
+    def test_rpc_search_without_implementations(self):
+        """Test if implementations are left out of the modules if the request does not filter on them.
+        """
+        with open('{}payloads.json'.format(self.resources_path), 'r') as f:
+            content = json.load(f)
+        body = content.get('submodule')
+        result = self.client.post('api/search-filter', json=body)
+        data = json.loads(result.data)
+        modules = data.get('yang-catalog:modules')
+
+        self.assertEqual(result.status_code, 200)
+        for module in modules['module']:
+            self.assertNotIn('implementations', module)
+
     def test_rpc_search_implementations(self):
         """Test if response has the correct structure. Each module should have implementations property
         and organization same as on body of request.
@@ -405,13 +438,9 @@ class TestApiSearchClass(unittest.TestCase):
 
         self.assertEqual(data, 'Server error - could not create directory')
 
-    @mock.patch('api.views.ycSearch.ycSearch.os.makedirs')
-    def test_create_diff_file_raise_exception(self, mock_os_makedirs: mock.MagicMock):
-        """os.mkdirs() method patched to raise OSError exception.
-        Error message is returned when exception was raised.
+    def test_create_diff_file(self):
+        """Test if side-by-side diff of two yang files is rendered without calling any external service.
         """
-        mock_os_makedirs.side_effect = OSError()
-
         file1 = 'yang-catalog'
         revision1 = '2018-04-03'
         file2 = 'yang-catalog'
@@ -421,15 +450,14 @@ class TestApiSearchClass(unittest.TestCase):
         result = self.client.get(path)
         data = result.data.decode()
 
-        self.assertEqual(data, 'Server error - could not create directory')
+        self.assertEqual(result.status_code, 200)
+        self.assertIn('{}@{}.yang'.format(file1, revision1), data)
+        self.assertIn('{}@{}.yang'.format(file2, revision2), data)
+        self.assertIn('diff_chg', data)
 
-    @mock.patch('api.views.ycSearch.ycSearch.os.makedirs')
-    def test_create_diff_tree_raise_exception(self, mock_os_makedirs: mock.MagicMock):
-        """os.mkdirs() method patched to raise OSError exception.
-        Error message is returned when exception was raised.
+    def test_create_diff_tree(self):
+        """Test if side-by-side diff of two yang trees is rendered without calling any external service.
         """
-        mock_os_makedirs.side_effect = OSError()
-
         file1 = 'yang-catalog'
         revision1 = '2018-04-03'
         file2 = 'yang-catalog'
@@ -439,7 +467,9 @@ class TestApiSearchClass(unittest.TestCase):
         result = self.client.get(path)
         data = result.data.decode()
 
-        self.assertEqual(data, 'Server error - could not create directory')
+        self.assertEqual(result.status_code, 200)
+        self.assertIn('{}@{}.yang'.format(file1, revision1), data)
+        self.assertIn('{}@{}.yang'.format(file2, revision2), data)
 
     def test_get_common_by_implementation(self):
         """Test if json payload has correct form (should not contain empty 'output' list)
@@ -0,0 +1,135 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import collections
+import gzip
+import json
+import unittest
+from unittest import mock
+
+from api.cache.catalogCache import CatalogCache
+from utility.staticVariables import redis_catalog_generation_key
+
+
+class TestCatalogCacheClass(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestCatalogCacheClass, self).__init__(*args, **kwargs)
+        self.modules = {'module': [{'name': 'yang-catalog', 'revision': '2018-04-03', 'organization': 'ietf'}]}
+
+    def redis_mock(self, store: dict):
+        redis = mock.MagicMock()
+        redis.get.side_effect = lambda key: store.get(key)
+        return redis
+
+    def test_get_decodes_once_per_generation(self):
+        """Test if data are decoded only once while the catalog generation stays the same.
+        """
+        store = {redis_catalog_generation_key: b'1', 'catalog:1:modules-data': json.dumps(self.modules).encode('utf-8')}
+        redis = self.redis_mock(store)
+        catalog_cache = CatalogCache(redis)
+
+        first = catalog_cache.get('modules-data')
+        second = catalog_cache.get('modules-data')
+
+        self.assertEqual(first, self.modules)
+        self.assertIsInstance(first, collections.OrderedDict)
+        self.assertIs(first, second)
+        data_gets = [call for call in redis.get.call_args_list if call.args[0] == 'catalog:1:modules-data']
+        self.assertEqual(len(data_gets), 1)
+
+    def test_get_new_generation(self):
+        """Test if data are decoded again after the catalog generation was bumped.
+        """
+        store = {redis_catalog_generation_key: b'1', 'catalog:1:modules-data': json.dumps(self.modules).encode('utf-8')}
+        catalog_cache = CatalogCache(self.redis_mock(store))
+
+        first = catalog_cache.get('modules-data')
+        store['catalog:2:modules-data'] = b'{}'
+        store[redis_catalog_generation_key] = b'2'
+        second = catalog_cache.get('modules-data')
+
+        self.assertEqual(first, self.modules)
+        self.assertEqual(second, {})
+
+    def test_get_no_generation(self):
+        """Test if data stored in Redis without generation are always used if no generation was published yet.
+        """
+        store = {'modules-data': json.dumps(self.modules).encode('utf-8')}
+        catalog_cache = CatalogCache(self.redis_mock(store))
+
+        first = catalog_cache.get('modules-data')
+        store['modules-data'] = None
+        second = catalog_cache.get('modules-data')
+
+        self.assertEqual(first, self.modules)
+        self.assertEqual(len(second), 0)
+        self.assertIsInstance(second, collections.OrderedDict)
+
+    def test_generation_resolver(self):
+        """Test if all the data are read from the generation returned by generation resolver.
+        """
+        store = {redis_catalog_generation_key: b'2', 'catalog:1:modules-data': json.dumps(self.modules).encode('utf-8')}
+        catalog_cache = CatalogCache(self.redis_mock(store), lambda: 1)
+
+        self.assertEqual(catalog_cache.generation(), 1)
+        self.assertEqual(catalog_cache.get('modules-data'), self.modules)
+        self.assertEqual(catalog_cache.raw('modules-data'), store['catalog:1:modules-data'])
+
+    def test_index_built_once_per_generation(self):
+        """Test if index is built only once per catalog generation and rebuilt after generation was bumped.
+        """
+        store = {redis_catalog_generation_key: b'1', 'catalog:1:modules-data': json.dumps(self.modules).encode('utf-8')}
+        catalog_cache = CatalogCache(self.redis_mock(store))
+        builder = mock.MagicMock(side_effect=lambda data: {module['name']: module for module in data['module']})
+
+        first = catalog_cache.index('modules-data', 'names', builder)
+        second = catalog_cache.index('modules-data', 'names', builder)
+        store['catalog:2:modules-data'] = store['catalog:1:modules-data']
+        store[redis_catalog_generation_key] = b'2'
+        third = catalog_cache.index('modules-data', 'names', builder)
+
+        self.assertIn('yang-catalog', first)
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(builder.call_count, 2)
+
+    def test_compressed_once_per_generation(self):
+        """Test if data are compressed without decoding only once per catalog generation.
+        """
+        raw = json.dumps(self.modules).encode('utf-8')
+        store = {redis_catalog_generation_key: b'1', 'catalog:1:modules-data': raw}
+        redis = self.redis_mock(store)
+        catalog_cache = CatalogCache(redis)
+
+        first = catalog_cache.compressed('modules-data')
+        second = catalog_cache.compressed('modules-data')
+        store['catalog:2:modules-data'] = b'{}'
+        store[redis_catalog_generation_key] = b'2'
+        third = catalog_cache.compressed('modules-data')
+
+        self.assertEqual(gzip.decompress(first), raw)
+        self.assertIs(first, second)
+        self.assertIsNone(third)
+        data_gets = [call for call in redis.get.call_args_list if call.args[0].startswith('catalog:')]
+        self.assertEqual(len(data_gets), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
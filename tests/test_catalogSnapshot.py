@@ -0,0 +1,82 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import os
+import tempfile
+import unittest
+
+from api.cache.catalogSnapshot import CatalogSnapshot
+
+
+class TestCatalogSnapshotClass(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot = CatalogSnapshot(os.path.join(self.temp_dir.name, 'cache', 'catalog-snapshot.json'))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_record_and_read(self):
+        """Test if recorded chunks are passed through and can be read back after the snapshot is saved.
+        """
+        chunks = [b'{"yang-catalog:catalog": ', b'{}}']
+        recording = self.snapshot.record(chunks)
+
+        self.assertEqual(list(recording), chunks)
+        self.assertFalse(self.snapshot.exists())
+        self.assertTrue(recording.save())
+
+        self.assertTrue(self.snapshot.exists())
+        self.assertEqual(list(self.snapshot.read(chunk_size=10)),
+                         [b'{"yang-cat', b'alog:catal', b'og": {}}'])
+
+    def test_incomplete_record_not_saved(self):
+        """Test if snapshot is not replaced by catalog which was not read completely.
+        """
+        recording = self.snapshot.record([b'{}'])
+        list(recording)
+        recording.save()
+
+        recording = self.snapshot.record([b'{"yang-catalog:catalog": ', b'{}}'])
+        chunks = iter(recording)
+        next(chunks)
+        chunks.close()
+
+        self.assertFalse(recording.save())
+        self.assertEqual(b''.join(self.snapshot.read()), b'{}')
+        self.assertEqual(os.listdir(os.path.dirname(self.snapshot.path)), ['catalog-snapshot.json'])
+
+    def test_concurrent_records(self):
+        """Test if recordings of the same snapshot at the same time do not affect each other.
+        """
+        first = iter(self.snapshot.record([b'{"first": ', b'1}']))
+        second = self.snapshot.record([b'{"second": ', b'2}'])
+        next(first)
+
+        self.assertEqual(list(second), [b'{"second": ', b'2}'])
+        self.assertEqual(list(first), [b'1}'])
+        first.close()
+        self.assertTrue(second.save())
+
+        self.assertEqual(b''.join(self.snapshot.read()), b'{"second": 2}')
+        self.assertEqual(len(os.listdir(os.path.dirname(self.snapshot.path))), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from api.cache.checkUpdateFromCache import CheckUpdateFromCache
+
+
+class TestCheckUpdateFromCacheClass(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, 'check-update-from')
+        resources_path = '{}/resources/all_modules'.format(os.path.dirname(os.path.abspath(__file__)))
+        self.old_schema = '{}/yang-catalog@2017-09-26.yang'.format(resources_path)
+        self.new_schema = '{}/yang-catalog@2018-04-03.yang'.format(resources_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key(self):
+        """Test if key depends on the order of compared yang files.
+        """
+        cache = CheckUpdateFromCache(self.cache_dir)
+
+        self.assertEqual(cache.key(self.old_schema, self.new_schema), cache.key(self.old_schema, self.new_schema))
+        self.assertNotEqual(cache.key(self.old_schema, self.new_schema), cache.key(self.new_schema, self.old_schema))
+
+    @mock.patch('api.cache.checkUpdateFromCache.context_check_update_from')
+    def test_check_update_from_validates_once(self, mock_context_check_update_from: mock.MagicMock):
+        """Test if pyang validation runs only once for the same pair of yang files, even if no error was found.
+        """
+        ctx = mock.MagicMock()
+        ctx.errors = []
+        mock_context_check_update_from.return_value = (ctx, mock.MagicMock())
+        cache = CheckUpdateFromCache(self.cache_dir)
+
+        first = cache.check_update_from(self.old_schema, self.new_schema, '', '')
+        second = cache.check_update_from(self.old_schema, self.new_schema, '', '')
+
+        self.assertEqual(first, '')
+        self.assertEqual(second, '')
+        self.assertEqual(mock_context_check_update_from.call_count, 1)
+
+    def test_get_not_cached(self):
+        """Test if None is returned for the pair of yang files which was not compared yet.
+        """
+        cache = CheckUpdateFromCache(self.cache_dir)
+
+        self.assertIsNone(cache.get(cache.key(self.old_schema, self.new_schema)))
+
+
+if __name__ == "__main__":
+    unittest.main()
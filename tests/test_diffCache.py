@@ -0,0 +1,88 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import unittest
+from unittest import mock
+
+from api.cache.diffCache import DiffCache, content_hash, render_diff
+
+
+class TestDiffCacheClass(unittest.TestCase):
+
+    def test_evict_least_recently_used(self):
+        """Test if least recently used diffs are evicted once cache is full.
+        """
+        diff_cache = DiffCache(max_entries=2)
+        diff_cache.set(('file', 'a', 'b'), 'first')
+        diff_cache.set(('file', 'b', 'c'), 'second')
+        # Reading first diff makes the second one least recently used
+        diff_cache.get(('file', 'a', 'b'))
+        diff_cache.set(('file', 'c', 'd'), 'third')
+
+        self.assertEqual(diff_cache.get(('file', 'a', 'b')), 'first')
+        self.assertIsNone(diff_cache.get(('file', 'b', 'c')))
+        self.assertEqual(diff_cache.get(('file', 'c', 'd')), 'third')
+
+    def test_content_hash(self):
+        """Test if content hash changes only if the content changes.
+        """
+        self.assertEqual(content_hash('module a {}'), content_hash('module a {}'))
+        self.assertNotEqual(content_hash('module a {}'), content_hash('module b {}'))
+
+    def test_render_diff(self):
+        """Test if rendered diff contains both descriptions and highlights changed lines.
+        """
+        html = render_diff('module a {\n  prefix a;\n}', 'module a {\n  prefix b;\n}', 'a@2018-01-01', 'a@2019-01-01')
+
+        self.assertIn('a@2018-01-01', html)
+        self.assertIn('a@2019-01-01', html)
+        self.assertIn('diff_chg', html)
+
+    @mock.patch('api.cache.diffCache.full_diff_lines', 20)
+    @mock.patch('api.cache.diffCache.max_side_by_side_lines', 100)
+    def test_render_diff_large(self):
+        """Test if only the context of the changed lines is rendered for large files
+        and unified diff is rendered for the largest files.
+        """
+        text1 = '\n'.join('leaf l{} {{ type string; }}'.format(i) for i in range(50))
+        text2 = text1.replace('leaf l25 ', 'leaf changed ')
+
+        html = render_diff(text1, text2, 'a@2018-01-01', 'a@2019-01-01')
+        self.assertIn('changed', html)
+        self.assertNotIn('l10 ', html)
+
+        html = render_diff('\n'.join([text1] * 3), '\n'.join([text2] * 3), 'a@2018-01-01', 'a@2019-01-01')
+        self.assertIn('+leaf changed { type string; }', html)
+        self.assertIn('--- a@2018-01-01', html)
+        self.assertNotIn('diff_chg', html)
+
+    def test_render_diff_large_replaced_block(self):
+        """Test if unified diff is rendered if too many replaced lines would be compared.
+        """
+        lines = ['leaf l{} {{ type string; }}'.format(i) for i in range(60)]
+        text1 = '\n'.join(lines)
+        text2 = '\n'.join(line.replace('string', 'uint8') for line in lines)
+
+        html = render_diff(text1, text2, 'a@2018-01-01', 'a@2019-01-01')
+
+        self.assertIn('+leaf l59 { type uint8; }', html)
+        self.assertNotIn('diff_chg', html)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import unittest
+from unittest import mock
+
+from api.cache.moduleCache import ModuleCache
+from utility.redisCatalog import current_generation, publish_catalog
+from utility.tests.test_redisCatalog import RedisStore
+
+
+class TestModuleCacheClass(unittest.TestCase):
+
+    def setUp(self):
+        self.store = RedisStore()
+        self.modules = [
+            {'name': 'yang-catalog', 'revision': '2018-04-03', 'organization': 'ietf'},
+            {'name': 'yang-catalog', 'revision': '2017-09-26', 'organization': 'ietf'}
+        ]
+        publish_catalog(self.store, {'module': self.modules}, {})
+        self.cache = ModuleCache(self.store, lambda: current_generation(self.store), max_entries=1)
+
+    def test_get(self):
+        """Test if module is read from Redis only on the first request.
+        """
+        module = self.cache.get('yang-catalog@2018-04-03/ietf')
+        module['dependents'] = []
+
+        self.assertEqual(self.cache.get('yang-catalog@2018-04-03/ietf'), self.modules[0])
+        self.assertIsNone(self.cache.get('yang-catalog@2016-01-01/ietf'))
+        statistics = self.cache.statistics()
+        self.assertEqual((statistics['hits'], statistics['misses'], statistics['entries']), (1, 2, 1))
+
+    def test_get_evicts_least_recently_used(self):
+        """Test if the least recently used module is evicted once the cache is full.
+        """
+        self.cache.get('yang-catalog@2018-04-03/ietf')
+        self.cache.get('yang-catalog@2017-09-26/ietf')
+        self.cache.get('yang-catalog@2018-04-03/ietf')
+
+        self.assertEqual(self.cache.statistics()['misses'], 3)
+        self.assertEqual(self.cache.statistics()['entries'], 1)
+
+    def test_get_new_generation(self):
+        """Test if module of the newly published generation is not served from the cache.
+        """
+        self.cache.get('yang-catalog@2018-04-03/ietf')
+        changed = dict(self.modules[0], description='changed')
+        publish_catalog(self.store, {'module': [changed]}, {})
+
+        self.assertEqual(self.cache.get('yang-catalog@2018-04-03/ietf'), changed)
+        self.assertEqual(self.cache.statistics()['hits'], 0)
+
+    def test_invalidate(self):
+        """Test if all the modules are dropped from the cache.
+        """
+        self.cache.get('yang-catalog@2018-04-03/ietf')
+        self.cache.invalidate()
+
+        statistics = self.cache.statistics()
+        self.assertEqual((statistics['entries'], statistics['invalidations']), (0, 1))
+        self.assertEqual(self.cache.get('yang-catalog@2018-04-03/ietf'), self.modules[0])
+        self.assertEqual(self.cache.statistics()['misses'], 2)
+
+    def test_set_redis(self):
+        """Test if subscriber of the old Redis client is stopped and new client is used.
+        """
+        self.store.pubsub = mock.MagicMock()
+        self.cache.get('yang-catalog@2018-04-03/ietf')
+        subscriber = self.store.pubsub.return_value.run_in_thread.return_value
+        store = RedisStore()
+        store.pubsub = mock.MagicMock()
+        publish_catalog(store, {'module': self.modules[1:]}, {})
+
+        self.cache.set_redis(store)
+
+        subscriber.stop.assert_called_once_with()
+        subscriber.join.assert_called_once_with(timeout=5)
+        self.assertEqual(self.cache.statistics()['entries'], 0)
+        self.assertEqual(self.cache.get('yang-catalog@2017-09-26/ietf'), self.modules[1])
+        store.pubsub.return_value.run_in_thread.assert_called_once_with(sleep_time=1, daemon=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import copy
+import unittest
+
+from api.views.ycSearch.moduleFilter import ModuleFilter
+
+
+class TestModuleFilterClass(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestModuleFilterClass, self).__init__(*args, **kwargs)
+        self.module = {
+            'name': 'fujitsu-entity-states',
+            'revision': '2015-05-19',
+            'organization': 'fujitsu',
+            'dependencies': [{'name': 'ietf-yang-types', 'schema': 'https://example.com/ietf-yang-types.yang'}],
+            'implementations': {
+                'implementation': [
+                    {'vendor': 'fujitsu', 'platform': 'T100', 'software-version': '2.4', 'feature': ['a', 'b']},
+                    {'vendor': 'fujitsu', 'platform': 'T600', 'software-version': '1.2',
+                     'deviation': [{'name': 'fujitsu-entity-states-deviations', 'revision': '2015-05-19'}]}
+                ]
+            }
+        }
+
+    def test_match_leafs(self):
+        """Test if top-level leafs have to be equal unless partial search is requested.
+        """
+        self.assertTrue(ModuleFilter({'organization': 'fujitsu', 'revision': '2015-05-19'}).match(self.module))
+        self.assertFalse(ModuleFilter({'organization': 'fuji'}).match(self.module))
+        self.assertTrue(ModuleFilter({'organization': 'fuji', 'partial': True}).match(self.module))
+        self.assertTrue(ModuleFilter({'organization': 'fujitsu', 'partial': False}).match(self.module))
+
+    def test_match_dependencies(self):
+        """Test if each searched dependency has to match one of the module dependencies.
+        """
+        self.assertTrue(ModuleFilter({'dependencies': [{'name': 'ietf-yang-types'}]}).match(self.module))
+        self.assertFalse(ModuleFilter({'dependencies': [{'name': 'ietf-yang'}]}).match(self.module))
+        self.assertTrue(ModuleFilter({'dependencies': [{'name': 'ietf-yang'}], 'partial': True}).match(self.module))
+        self.assertFalse(ModuleFilter({'dependents': [{'name': 'ietf-yang-types'}]}).match(self.module))
+
+    def test_match_implementations(self):
+        """Test if all the implementation leafs have to match the same implementation.
+        """
+        body = {'implementations': {'implementation': [{'vendor': 'fujitsu', 'platform': 'T600'}]}}
+        module_filter = ModuleFilter(body)
+        self.assertTrue(module_filter.match(self.module))
+        self.assertEqual(len(module_filter.matching_implementations(self.module)), 1)
+
+        body = {'implementations': {'implementation': [{'platform': 'T600', 'software-version': '2.4'}]}}
+        self.assertFalse(ModuleFilter(body).match(self.module))
+
+        body = {'implementations': {'implementation': [{'feature': 'b'}]}}
+        self.assertTrue(ModuleFilter(body).match(self.module))
+
+        body = {'implementations': {'implementation': [{'deviation': [{'name': 'fujitsu-entity-states-deviations'}]}]}}
+        self.assertTrue(ModuleFilter(body).match(self.module))
+
+    def test_match_does_not_modify_module(self):
+        """Test if matching does not modify the module - modules are shared between requests.
+        """
+        original = copy.deepcopy(self.module)
+        body = {'implementations': {'implementation': [{'vendor': 'fujitsu', 'platform': 'T600'}]},
+                'dependencies': [{'name': 'ietf-yang-types'}]}
+        ModuleFilter(body).match(self.module)
+
+        self.assertEqual(original, self.module)
+
+    def test_exact_leafs(self):
+        """Test if only string leafs of exact search can be used to narrow the candidates.
+        """
+        body = {'organization': 'fujitsu', 'ietf': {'ietf-wg': 'netmod'}, 'dependencies': [{'name': 'ietf-yang-types'}]}
+
+        self.assertEqual(ModuleFilter(body).exact_leafs(), {'organization': 'fujitsu'})
+        self.assertEqual(ModuleFilter({**body, 'partial': True}).exact_leafs(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import collections
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import pika
+from api.sender import Sender, job_priority
+from utility.staticVariables import job_queues
+
+
+class InMemoryBroker:
+    """In-memory stand-in of RabbitMQ with the subset of pika BlockingConnection API used by API and receiver."""
+
+    def __init__(self):
+        self.queues = collections.defaultdict(collections.deque)
+        self.connections = 0
+        # Number of the following connection attempts refused and publishes lost
+        self.refused_connections = 0
+        self.lost_publishes = 0
+
+    def connection(self):
+        if self.refused_connections > 0:
+            self.refused_connections -= 1
+            raise pika.exceptions.AMQPConnectionError('Connection refused')
+        self.connections += 1
+        return BrokerConnection(self)
+
+
+class BrokerConnection:
+
+    def __init__(self, broker: InMemoryBroker):
+        self.broker = broker
+        self.is_open = True
+
+    def channel(self):
+        return BrokerChannel(self)
+
+    def close(self):
+        self.is_open = False
+
+
+class BrokerChannel:
+
+    def __init__(self, connection: BrokerConnection):
+        self.connection = connection
+        self.broker = connection.broker
+        self.confirmed = False
+
+    @property
+    def is_open(self):
+        return self.connection.is_open
+
+    def queue_declare(self, queue):
+        self.broker.queues[queue]
+
+    def confirm_delivery(self):
+        self.confirmed = True
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, mandatory=False):
+        if not self.is_open:
+            raise pika.exceptions.ChannelWrongStateError('Channel is closed')
+        if self.broker.lost_publishes > 0:
+            self.broker.lost_publishes -= 1
+            self.connection.is_open = False
+            raise pika.exceptions.StreamLostError('Stream connection lost')
+        if mandatory and routing_key not in self.broker.queues:
+            raise pika.exceptions.UnroutableError([])
+        self.broker.queues[routing_key].append((body.encode('utf-8'), properties))
+
+
+class TestSenderClass(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.broker = InMemoryBroker()
+        self.sender = Sender(self.temp_dir.name, self.temp_dir.name, connection_factory=self.broker.connection)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_send(self):
+        """Test if messages are published by the same confirmed channel and jobs are created.
+        """
+        job_ids = [self.sender.send('run_ping#ping') for _ in range(3)]
+
+        queue = self.broker.queues[job_queues['interactive']]
+        self.assertEqual(self.broker.connections, 1)
+        self.assertEqual([properties.correlation_id for _, properties in queue], job_ids)
+        self.assertEqual(queue[0][0], b'run_ping#ping')
+        self.assertEqual(self.sender.get_response(job_ids[0]), 'In progress')
+        self.assertEqual(self.sender.get_response('missing'), 'does not exist')
+
+    def test_send_reconnect(self):
+        """Test if message is published again using new connection when connection was lost.
+        """
+        self.sender.send('run_ping#ping')
+        self.broker.lost_publishes = 1
+
+        self.sender.send('run_ping#ping')
+
+        self.assertEqual(self.broker.connections, 2)
+        self.assertEqual(len(self.broker.queues[job_queues['interactive']]), 2)
+
+    def test_send_failed(self):
+        """Test if job is marked as failed when message can not be published even after reconnecting.
+        """
+        self.broker.lost_publishes = 2
+
+        with mock.patch('api.sender.uuid.uuid4', return_value='1b6b8c5c'):
+            with self.assertRaises(pika.exceptions.AMQPError):
+                self.sender.send('run_ping#ping')
+
+        self.assertEqual(self.sender.get_response('1b6b8c5c'), 'Failed#split#Job could not be sent to receiver')
+
+    @mock.patch('api.sender.time.sleep')
+    def test_send_rabbitmq_unavailable(self, sleep: mock.MagicMock):
+        """Test if sender waits until RabbitMQ accepts the connection.
+        """
+        self.broker.refused_connections = 2
+
+        self.sender.send('run_ping#ping')
+
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(len(self.broker.queues[job_queues['interactive']]), 1)
+
+    def test_send_forked_worker(self):
+        """Test if forked worker does not use the connection of its parent process.
+        """
+        self.sender.send('run_ping#ping')
+        with mock.patch('api.sender.os.getpid', return_value=-1):
+            self.sender.send('run_ping#ping')
+
+        self.assertEqual(self.broker.connections, 2)
+
+    def test_send_threads(self):
+        """Test if concurrent sends share one connection.
+        """
+        threads = [threading.Thread(target=self.sender.send, args=('run_ping#ping',)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.broker.connections, 1)
+        self.assertEqual(len(self.broker.queues[job_queues['interactive']]), 8)
+
+    def test_send_priority(self):
+        """Test if jobs are published to the queue of their priority class.
+        """
+        self.sender.send('run_ietf')
+        self.sender.send('run_ping#ping', priority='normal')
+
+        self.assertEqual(len(self.broker.queues[job_queues['bulk']]), 1)
+        self.assertEqual(len(self.broker.queues[job_queues['normal']]), 1)
+
+    def test_job_priority(self):
+        """Test if priority class is derived from the arguments of the job.
+        """
+        self.assertEqual(job_priority('run_ping#ping'), 'interactive')
+        self.assertEqual(job_priority('https://yangcatalog.org#username#password#DELETE#modules#{}'), 'interactive')
+        self.assertEqual(job_priority('python#populate.py#--sdo#--dir#/var/yang/tmp/1#--api'), 'normal')
+        self.assertEqual(job_priority('python#populate.py#repoLocalDir#standard/ietf#/var/yang/yang#github'), 'bulk')
+        self.assertEqual(job_priority('run_script#ietfYangDraftPull#draftPull#{}'), 'bulk')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from api.cache.treeCache import TreeCache
+
+
+class TestTreeCacheClass(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, 'trees')
+        self.yang_file = os.path.join(self.temp_dir.name, 'yang-catalog@2018-04-03.yang')
+        with open(self.yang_file, 'w') as f:
+            f.write('module yang-catalog {}')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key_content_hash(self):
+        """Test if key changes only if content of the yang file changes.
+        """
+        tree_cache = TreeCache(self.cache_dir)
+        first = tree_cache.key(self.yang_file)
+        second = tree_cache.key(self.yang_file)
+        with open(self.yang_file, 'w') as f:
+            f.write('module yang-catalog { namespace "urn:yang-catalog"; }')
+        third = tree_cache.key(self.yang_file)
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+
+    def test_get_set(self):
+        """Test if stored tree is returned and None is returned for tree which is not cached.
+        """
+        tree_cache = TreeCache(self.cache_dir)
+        key = tree_cache.key(self.yang_file)
+
+        self.assertIsNone(tree_cache.get(key))
+        tree_cache.set(key, '<html><body><pre>tree</pre></body></html>')
+        self.assertEqual(tree_cache.get(key), '<html><body><pre>tree</pre></body></html>')
+
+    def test_evict_least_recently_used(self):
+        """Test if least recently used trees are evicted down to the low-water mark once cache is full.
+        """
+        tree_cache = TreeCache(self.cache_dir, max_entries=4)
+        for key in ('first', 'second', 'third', 'fourth'):
+            tree_cache.set(key, key)
+        past = time.time() - 100
+        for key in ('first', 'second', 'third'):
+            os.utime(os.path.join(self.cache_dir, '{}.html'.format(key)), (past, past))
+        # Reading first tree makes the second and third ones least recently used
+        tree_cache.get('first')
+        tree_cache.set('fifth', 'fifth')
+
+        self.assertEqual(tree_cache.get('first'), 'first')
+        self.assertIsNone(tree_cache.get('second'))
+        self.assertIsNone(tree_cache.get('third'))
+        self.assertEqual(tree_cache.get('fourth'), 'fourth')
+        self.assertEqual(tree_cache.get('fifth'), 'fifth')
+
+    def test_evict_once_per_batch(self):
+        """Test if cache directory is not scanned again until the cache is full again after eviction.
+        """
+        tree_cache = TreeCache(self.cache_dir, max_entries=10)
+        for i in range(11):
+            tree_cache.set(str(i), str(i))
+
+        with mock.patch('api.cache.treeCache.os.scandir', wraps=os.scandir) as scandir:
+            tree_cache.set('11', '11')
+            self.assertEqual(scandir.call_count, 0)
+            tree_cache.set('12', '12')
+            self.assertEqual(scandir.call_count, 1)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 9)
+
+    @mock.patch('api.cache.treeCache.render_tree')
+    def test_prefill_evicts_once(self, render_tree: mock.MagicMock):
+        """Test if prefill scans the cache directory only once, after all the trees are stored.
+        """
+        render_tree.side_effect = lambda path_to_yang, yang_models, save_file_dir: path_to_yang
+        paths = []
+        for i in range(3):
+            paths.append(os.path.join(self.temp_dir.name, 'module-{}@2018-04-03.yang'.format(i)))
+            with open(paths[-1], 'w') as f:
+                f.write('module module-{} {{}}'.format(i))
+        tree_cache = TreeCache(self.cache_dir, max_entries=2)
+
+        with mock.patch('api.cache.treeCache.os.scandir', wraps=os.scandir) as scandir:
+            rendered = tree_cache.prefill(paths, 'yang_models', self.temp_dir.name)
+
+        self.assertEqual(rendered, 3)
+        self.assertEqual(scandir.call_count, 1)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import logging
+import os
+import queue
+import time
+import unittest
+
+from api.workerPool import CRASHED, FAILED, FINISHED, TIMED_OUT, WorkerPool
+
+
+def handle(task):
+    if task == 'sleep':
+        time.sleep(60)
+    elif task == 'exit':
+        os._exit(1)
+    elif task == 'raise':
+        raise ValueError('invalid task')
+    return os.getpid()
+
+
+class TestWorkerPoolClass(unittest.TestCase):
+
+    def setUp(self):
+        self.results = queue.Queue()
+        self.pool = WorkerPool(handle, 2, 1, logging.getLogger('test'))
+
+    def tearDown(self):
+        self.pool.close()
+
+    def submit(self, task):
+        self.pool.submit(task, lambda outcome, result: self.results.put((outcome, result)))
+
+    def result(self):
+        return self.results.get(timeout=10)
+
+    def test_submit(self):
+        """Test if the tasks are processed by long-lived workers other than the current process.
+        """
+        for _ in range(4):
+            self.submit('pid')
+        pids = set(result for _, result in (self.result() for _ in range(4)))
+
+        self.assertLessEqual(len(pids), 2)
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_submit_failed(self):
+        """Test if exception raised by the task is reported and the worker is kept.
+        """
+        self.submit('raise')
+
+        self.assertEqual(self.result(), (FAILED, "ValueError('invalid task')"))
+        self.submit('pid')
+        self.assertEqual(self.result()[0], FINISHED)
+
+    def test_submit_timed_out(self):
+        """Test if worker is killed once the task runs longer than the timeout and replaced by new one.
+        """
+        self.submit('sleep')
+
+        self.assertEqual(self.result(), (TIMED_OUT, None))
+        self.submit('pid')
+        self.assertEqual(self.result()[0], FINISHED)
+
+    def test_submit_crashed(self):
+        """Test if exit of the worker is reported and the worker is replaced by new one.
+        """
+        self.submit('exit')
+
+        self.assertEqual(self.result(), (CRASHED, None))
+        self.submit('pid')
+        self.assertEqual(self.result()[0], FINISHED)
+
+    def test_recycle(self):
+        """Test if workers are replaced before their next task.
+        """
+        pool = WorkerPool(handle, 1, 1, logging.getLogger('test'))
+        pool.submit('pid', lambda outcome, result: self.results.put(result))
+        first = self.results.get(timeout=10)
+
+        pool.recycle()
+        pool.submit('pid', lambda outcome, result: self.results.put(result))
+
+        self.assertNotEqual(self.results.get(timeout=10), first)
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Status of the jobs sent from API to receiver. Statuses are stored in SQLite
+database in the temporary directory shared by API and receiver, indexed
+by the job id. Every status is read and written by a single statement, so
+API workers and receiver processes can access the store at the same time.
+Store is in write-ahead log mode, so readers are never blocked by the writer
+and writers wait only for each other.
+Jobs from the correlation_ids file used before are imported when the store
+is opened for the first time.
+"""
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class JobStore:
+
+    def __init__(self, temp_dir: str, timeout: float = 30):
+        """
+        Arguments:
+            :param temp_dir     (str) directory shared by API and receiver
+            :param timeout      (float) seconds to wait for the store locked by another process
+        """
+        self.path = os.path.join(temp_dir, 'jobs.db')
+        self.__timeout = timeout
+        with self.__connect() as connection:
+            # Mode is persistent in the database file
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS jobs '
+                               '(id TEXT PRIMARY KEY, status TEXT NOT NULL, updated REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS jobs_updated ON jobs (updated)')
+        self.migrate(os.path.join(temp_dir, 'correlation_ids'))
+
+    def get(self, job_id: str):
+        """Get status of the job. None is returned if job does not exist."""
+        with self.__connect() as connection:
+            row = connection.execute('SELECT status FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def set(self, job_id: str, status: str):
+        """Create the job or replace its status."""
+        with self.__connect() as connection:
+            connection.execute('INSERT OR REPLACE INTO jobs (id, status, updated) VALUES (?, ?, ?)',
+                               (job_id, status, time.time()))
+
+    def remove_older_than(self, cutoff: float) -> int:
+        """Remove jobs which were not updated since the cutoff.
+
+        Argument:
+            :param cutoff   (float) unix timestamp
+            :return number of removed jobs
+        """
+        with self.__connect() as connection:
+            return connection.execute('DELETE FROM jobs WHERE updated < ?', (cutoff,)).rowcount
+
+    def migrate(self, path: str) -> int:
+        """Import jobs from the file with lines in '<ctime> -- <job id> - <status>' format.
+        Jobs already in the store are kept and the file is removed once it is imported.
+
+        Argument:
+            :param path     (str) path to the file
+            :return number of imported jobs
+        """
+        try:
+            with open(path, 'r') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return 0
+        jobs = []
+        for line in lines:
+            try:
+                created, job = line.rstrip('\n').split(' -- ', 1)
+                job_id, status = job.split(' - ', 1)
+                updated = datetime.strptime(created, '%a %b %d %H:%M:%S %Y').timestamp()
+            except ValueError:
+                continue
+            jobs.append((job_id.strip(), status.strip(), updated))
+        with self.__connect() as connection:
+            imported = connection.executemany('INSERT OR IGNORE INTO jobs (id, status, updated) VALUES (?, ?, ?)',
+                                              jobs).rowcount
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Imported by another process at the same time
+            pass
+        return imported
+
+    @contextmanager
+    def __connect(self):
+        # Connections are not shared, so the store can be used by the forked processes and threads
+        connection = sqlite3.connect(self.path, timeout=self.__timeout)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
@@ -0,0 +1,148 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Incremental reader of large JSON documents. Elements of the arrays on the
+requested paths are yielded one by one as they are read from the chunks of
+the document, so only one element at a time is kept in memory. Only the
+objects leading to the requested arrays are walked character by character,
+elements and all the other values are parsed by the json decoder.
+"""
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import codecs
+import json
+
+whitespace = ' \t\n\r'
+
+
+def iter_elements(chunks, paths: list):
+    """Yield elements of the arrays on the requested paths of the JSON document.
+    ValueError is raised if the document is not valid JSON.
+
+    Arguments:
+        :param chunks   (iterable) chunks of the document - bytes in UTF-8 or str
+        :param paths    (list) paths of the arrays as tuples of the object keys,
+                        e.g. ('yang-catalog:catalog', 'modules', 'module')
+        :return generator of the tuples of the path and decoded element
+    """
+    reader = StreamReader(chunks)
+    paths = set(tuple(path) for path in paths)
+    yield from __walk(reader, (), paths)
+    if reader.peek() != '':
+        raise ValueError('Extra data at position {}'.format(reader.position()))
+
+
+class StreamReader:
+    """Buffer of the document chunks which are read only when they are needed."""
+
+    def __init__(self, chunks):
+        self.__chunks = iter(chunks)
+        self.__decoder = codecs.getincrementaldecoder('utf-8')()
+        self.__json_decoder = json.JSONDecoder()
+        self.__buffer = ''
+        self.__pos = 0
+        self.__offset = 0
+        self.__eof = False
+
+    def position(self) -> int:
+        return self.__offset + self.__pos
+
+    def peek(self) -> str:
+        """Get next character which is not whitespace without consuming it. Empty string is returned at the end."""
+        while True:
+            while self.__pos < len(self.__buffer) and self.__buffer[self.__pos] in whitespace:
+                self.__pos += 1
+            if self.__pos < len(self.__buffer) or not self.__read():
+                return self.__buffer[self.__pos:self.__pos + 1]
+
+    def expect(self, characters: str) -> str:
+        """Consume next character which is not whitespace. ValueError is raised if it is not one of the characters."""
+        char = self.peek()
+        if char == '' or char not in characters:
+            raise ValueError('Expecting one of "{}" at position {}'.format(characters, self.position()))
+        self.__pos += 1
+        return char
+
+    def decode(self):
+        """Decode next value. More chunks are read until the value is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.__json_decoder.raw_decode(self.__buffer, self.__pos)
+            except json.JSONDecodeError:
+                if self.__read_more():
+                    continue
+                raise
+            # Number at the end of the buffer can continue in the next chunk
+            if end == len(self.__buffer) and self.__read():
+                continue
+            self.__pos = end
+            return value
+
+    def __read_more(self) -> bool:
+        # Value is parsed again from its start, so buffer is at least doubled to avoid parsing it too many times
+        size = 2 * (len(self.__buffer) - self.__pos)
+        if not self.__read():
+            return False
+        while len(self.__buffer) - self.__pos < size and self.__read():
+            pass
+        return True
+
+    def __read(self) -> bool:
+        if self.__eof:
+            return False
+        chunk = next(self.__chunks, None)
+        if chunk is None:
+            self.__eof = True
+            chunk = self.__decoder.decode(b'', final=True)
+        elif isinstance(chunk, bytes):
+            chunk = self.__decoder.decode(chunk)
+        # Drop already consumed part of the buffer
+        self.__offset += self.__pos
+        self.__buffer = self.__buffer[self.__pos:] + chunk
+        self.__pos = 0
+        return True
+
+
+def __walk(reader: StreamReader, path: tuple, paths: set):
+    if path in paths:
+        reader.expect('[')
+        if reader.peek() == ']':
+            reader.expect(']')
+            return
+        while True:
+            yield path, reader.decode()
+            if reader.expect(',]') == ']':
+                return
+    elif reader.peek() == '{' and any(path == requested[:len(path)] for requested in paths):
+        reader.expect('{')
+        if reader.peek() == '}':
+            reader.expect('}')
+            return
+        while True:
+            key = reader.decode()
+            if not isinstance(key, str):
+                raise ValueError('Expecting property name at position {}'.format(reader.position()))
+            reader.expect(':')
+            yield from __walk(reader, path + (key,), paths)
+            if reader.expect(',}') == '}':
+                return
+    else:
+        # Value which does not lead to any of the requested arrays
+        reader.decode()
@@ -0,0 +1,210 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Codecs of the module documents stored in Redis.
+Every encoded value starts with the tag of the codec which encoded it, so
+values written by different codecs can be read side by side. Plain JSON
+values start with '{' and are returned as they are.
+
+ZlibCodec compresses JSON using a preset dictionary trained on the
+catalog. Module documents repeat the same keys and values (implementations
+of the same vendors, platforms and software versions), so even small
+modules compress well once these are part of the dictionary. Dictionaries
+are stored in Redis under the hash of their content, never change, and are
+cached by every worker after first use.
+"""
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import hashlib
+import json
+import zlib
+from collections import Counter
+
+from utility.staticVariables import redis_module_dictionary_key
+
+# Dictionary window of the deflate algorithm
+max_dictionary_size = 32768
+dictionary_id_size = 8
+
+
+class JsonCodec:
+    """Module documents stored as plain JSON."""
+    tag = b'{'
+
+    def encode(self, value: bytes) -> bytes:
+        return value
+
+    def decode(self, redis_cache, value: bytes) -> bytes:
+        return value
+
+
+class ZlibCodec:
+    """Module documents stored as JSON compressed using deflate with preset dictionary.
+    Value consists of the codec tag, id of the dictionary and raw deflate stream.
+    """
+    tag = b'\x01'
+
+    def __init__(self, dictionary: bytes = b'', level: int = 9):
+        """
+        Arguments:
+            :param dictionary   (bytes) preset dictionary of the deflate algorithm
+            :param level        (int) compression level
+        """
+        self.dictionary = dictionary[-max_dictionary_size:]
+        self.dictionary_id = dictionary_id(self.dictionary)
+        self.level = level
+        dictionaries[self.dictionary_id] = self.dictionary
+
+    def encode(self, value: bytes) -> bytes:
+        if self.dictionary:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=self.dictionary)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        return self.tag + self.dictionary_id + compressor.compress(value) + compressor.flush()
+
+    def decode(self, redis_cache, value: bytes) -> bytes:
+        dictionary = load_dictionary(redis_cache, value[1:1 + dictionary_id_size])
+        if dictionary:
+            decompressor = zlib.decompressobj(-15, zdict=dictionary)
+        else:
+            decompressor = zlib.decompressobj(-15)
+        return decompressor.decompress(value[1 + dictionary_id_size:]) + decompressor.flush()
+
+
+codecs = {}
+# Dictionaries used by this worker - content of the dictionary never changes under its id
+dictionaries = {}
+
+
+def register_codec(codec):
+    """Register codec, so values starting with its tag are decoded by it."""
+    codecs[codec.tag] = codec
+
+
+def dictionary_id(dictionary: bytes) -> bytes:
+    return hashlib.sha1(dictionary).digest()[:dictionary_id_size]
+
+
+def dictionary_key(dictionary_id: bytes) -> str:
+    return '{}:{}'.format(redis_module_dictionary_key, dictionary_id.hex())
+
+
+register_codec(JsonCodec())
+register_codec(ZlibCodec())
+
+
+def encode_module(codec, value) -> bytes:
+    """Encode module document serialized to JSON using the codec."""
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return codec.encode(value)
+
+
+def decode_module(redis_cache, value):
+    """Decode module document stored in Redis to JSON. None is returned if value is None.
+    ValueError is raised if value was encoded by unknown codec.
+    """
+    if value is None:
+        return None
+    codec = codecs.get(value[:1])
+    if codec is None:
+        raise ValueError('Module encoded by unknown codec {}'.format(value[:1]))
+    return codec.decode(redis_cache, value)
+
+
+def load_dictionary(redis_cache, dictionary_id: bytes) -> bytes:
+    """Get dictionary with specified id from worker cache or Redis.
+    ValueError is raised if dictionary is not stored in Redis.
+    """
+    dictionary = dictionaries.get(dictionary_id)
+    if dictionary is None:
+        dictionary = redis_cache.get(dictionary_key(dictionary_id))
+        if dictionary is None:
+            raise ValueError('Module dictionary {} not found'.format(dictionary_id.hex()))
+        dictionaries[dictionary_id] = dictionary
+    return dictionary
+
+
+def store_dictionary(redis_cache, dictionary: bytes) -> ZlibCodec:
+    """Store dictionary in Redis and make it the one used by writers."""
+    codec = ZlibCodec(dictionary)
+    redis_cache.set(dictionary_key(codec.dictionary_id), codec.dictionary)
+    redis_cache.set(redis_module_dictionary_key, codec.dictionary_id)
+    return codec
+
+
+def stored_codec(redis_cache):
+    """Get codec using the dictionary stored in Redis. None is returned if there is no dictionary stored yet."""
+    current = redis_cache.get(redis_module_dictionary_key)
+    if current is None:
+        return None
+    return ZlibCodec(load_dictionary(redis_cache, current))
+
+
+def load_codec(redis_cache, modules: list):
+    """Get codec used to write module documents. Dictionary is trained on the modules
+    if there is no dictionary stored in Redis yet.
+
+    Arguments:
+        :param redis_cache  (Redis) Redis client
+        :param modules      (list) modules which are going to be written
+        :return ZlibCodec using current dictionary
+    """
+    codec = stored_codec(redis_cache)
+    if codec is not None:
+        return codec
+    return store_dictionary(redis_cache, train_dictionary(modules))
+
+
+def train_dictionary(modules: list, size: int = max_dictionary_size, samples: int = 2000) -> bytes:
+    """Build dictionary from the JSON fragments repeated in the module documents.
+    Fragments saving the most bytes are placed at the end of the dictionary,
+    where the deflate algorithm references them using the shortest distances.
+
+    Arguments:
+        :param modules  (list) module documents
+        :param size     (int) maximum size of the dictionary
+        :param samples  (int) maximum number of modules the dictionary is trained on
+        :return dictionary of the deflate algorithm
+    """
+    step = max(len(modules) // samples, 1)
+    fragments = Counter()
+    for module in modules[::step]:
+        __count_fragments(module, fragments)
+    ranked = sorted((fragment for fragment, count in fragments.items() if count > 1),
+                    key=lambda fragment: fragments[fragment] * len(fragment))
+    dictionary = b''
+    for fragment in reversed(ranked):
+        if len(dictionary) + len(fragment) > size:
+            continue
+        dictionary = fragment + dictionary
+    return dictionary
+
+
+def __count_fragments(value, fragments: Counter):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                fragments[json.dumps(key).encode('utf-8') + b':'] += 1
+                __count_fragments(item, fragments)
+            else:
+                fragments[json.dumps({key: item}, separators=(',', ':'))[1:-1].encode('utf-8')] += 1
+    elif isinstance(value, list):
+        for item in value:
+            __count_fragments(item, fragments)
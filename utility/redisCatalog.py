@@ -0,0 +1,530 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Catalog data stored in Redis in atomically published generations.
+Each generation is written under its own versioned key prefix
+catalog:<generation>: and it is published by a single write of the
+catalog-generation pointer, so readers never see a mix of old and new data.
+Readers resolve the published generation once and read all the keys of that
+generation. Previously published generation is kept, so readers which
+resolved it before the pointer flip can finish and it can be restored.
+
+Modules are stored only once under the hash of their content and each
+generation maps name@revision/organization keys to these hashes, so only
+new or changed modules are written, through pipeline in bounded chunks.
+Catalog can be written while it is being read, one module at a time.
+Modules which are not used by any kept generation are found as set
+difference of the hashes and deleted. Modules are encoded by the codec
+from utility.moduleCodec and decoded back to JSON by the read helpers.
+Summary of each module with the fields needed by search results is stored
+in module-summaries hash under the same hash, so search reads only these.
+Implementations of the modules are stored separately in the same way,
+so they are read only by the requests which need them.
+Generations are written, published and dropped by one process at a time
+under a lock stored in Redis, since publishers skip the modules which are
+already stored and would otherwise map modules other publisher deletes.
+"""
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import hashlib
+import json
+import time
+import uuid
+
+from utility.jsonStream import iter_elements
+from utility.moduleCodec import (decode_module, encode_module, stored_codec,
+                                 store_dictionary, train_dictionary)
+from utility.staticVariables import (redis_catalog_channel,
+                                     redis_catalog_generation_key,
+                                     redis_catalog_generations_key,
+                                     redis_catalog_publish_lock_key,
+                                     redis_catalog_refresh_lock_key,
+                                     redis_generation_counter_key,
+                                     redis_module_hashes_key,
+                                     redis_module_keys_key,
+                                     redis_module_summaries_key)
+
+catalog_keys = ('modules-data', 'vendors-data', 'all-catalog-data')
+modules_map = 'modules'
+implementations_map = 'implementations'
+catalog_modules_path = ('yang-catalog:catalog', 'modules', 'module')
+catalog_vendors_path = ('yang-catalog:catalog', 'vendors', 'vendor')
+# Fields of the module needed by search results - dependents are stored as their count
+summary_fields = ('maturity-level', 'compilation-status', 'namespace', 'yang-version')
+# Seconds after which the publish lock expires if the publishing process died
+publish_lock_timeout = 3600
+lock_poll_interval = 0.5
+
+
+def module_key(module: dict) -> str:
+    return '{}@{}/{}'.format(module['name'], module['revision'], module['organization'])
+
+
+def module_summary(module: dict) -> dict:
+    """Create projection of the module with the fields needed by search results."""
+    summary = {field: module[field] for field in summary_fields if field in module}
+    summary['dependents'] = len(module.get('dependents', []))
+    return summary
+
+
+def generation_key(generation: int, key: str) -> str:
+    return 'catalog:{}:{}'.format(generation, key)
+
+
+def module_content_key(digest) -> str:
+    if isinstance(digest, bytes):
+        digest = digest.decode('utf-8')
+    return 'module:{}'.format(digest)
+
+
+def implementations_content_key(digest) -> str:
+    if isinstance(digest, bytes):
+        digest = digest.decode('utf-8')
+    return 'implementations:{}'.format(digest)
+
+
+def acquire_lock(redis_cache, key: str, timeout: int, blocking: bool = True):
+    """Take lock stored in Redis under the key, so it is shared by all the processes.
+    Lock expires after @timeout seconds, so it is not held forever by a process which died.
+
+    :return token needed to release the lock or None if not blocking and lock is held by other process
+    """
+    token = uuid.uuid4().hex
+    while not redis_cache.set(key, token, nx=True, ex=timeout):
+        if not blocking:
+            return None
+        time.sleep(lock_poll_interval)
+    return token
+
+
+def release_lock(redis_cache, key: str, token: str):
+    """Release lock taken by acquire_lock() unless it expired and other process took it meanwhile."""
+    if redis_cache.get(key) == token.encode('utf-8'):
+        redis_cache.delete(key)
+
+
+def current_generation(redis_cache):
+    """Get published catalog generation. None is returned if no generation was published yet."""
+    generation = redis_cache.get(redis_catalog_generation_key)
+    if generation is None:
+        return None
+    return int(generation)
+
+
+def get_catalog_data(redis_cache, generation, key: str):
+    """Get raw catalog data stored under one of the @catalog_keys in specified generation.
+    Data stored without generation are used if no generation was published yet.
+    """
+    if generation is None:
+        return redis_cache.get(key)
+    return redis_cache.get(generation_key(generation, key))
+
+
+def get_module(redis_cache, generation, key: str):
+    """Get raw module stored under name@revision/organization key in specified generation.
+    None is returned if module is not part of the generation.
+    """
+    if generation is None:
+        return decode_module(redis_cache, redis_cache.get(key))
+    digest = redis_cache.hget(generation_key(generation, modules_map), key)
+    if digest is None:
+        return None
+    return decode_module(redis_cache, redis_cache.get(module_content_key(digest)))
+
+
+def get_module_keys(redis_cache, generation) -> list:
+    """Get name@revision/organization keys of all the modules in specified generation."""
+    if generation is None:
+        keys = redis_cache.scan_iter(match='*@*/*')
+    else:
+        keys = redis_cache.hkeys(generation_key(generation, modules_map))
+    return [key.decode('utf-8') for key in keys]
+
+
+def get_modules(redis_cache, generation, keys: list) -> list:
+    """Get raw modules stored under name@revision/organization keys in specified generation
+    using one request for the hashes and one request for the modules.
+    None is returned in place of each module which is not part of the generation.
+    """
+    if len(keys) == 0:
+        return []
+    if generation is None:
+        return [decode_module(redis_cache, module) for module in redis_cache.mget(keys)]
+    digests = redis_cache.hmget(generation_key(generation, modules_map), keys)
+    found = [module_content_key(digest) for digest in digests if digest is not None]
+    modules = iter(redis_cache.mget(found) if found else [])
+    return [None if digest is None else decode_module(redis_cache, next(modules)) for digest in digests]
+
+
+def get_implementations(redis_cache, generation, keys: list) -> list:
+    """Get raw implementations of the modules stored under name@revision/organization keys
+    in specified generation using one request for the hashes and one request for the implementations.
+    None is returned in place of each module which has no implementations in the generation.
+    """
+    if len(keys) == 0 or generation is None:
+        return [None] * len(keys)
+    digests = redis_cache.hmget(generation_key(generation, implementations_map), keys)
+    found = [implementations_content_key(digest) for digest in digests if digest is not None]
+    implementations = iter(redis_cache.mget(found) if found else [])
+    return [None if digest is None else decode_module(redis_cache, next(implementations)) for digest in digests]
+
+
+def attach_implementations(redis_cache, generation, modules: dict) -> dict:
+    """Add implementations to the decoded modules. Modules stored without generation
+    already contain their implementations.
+
+    Arguments:
+        :param redis_cache  (Redis) Redis client
+        :param generation   (int) catalog generation from which the implementations are read
+        :param modules      (dict) decoded modules under their name@revision/organization keys
+        :return same dictionary of the modules
+    """
+    keys = list(modules.keys())
+    for key, implementations in zip(keys, get_implementations(redis_cache, generation, keys)):
+        if implementations is not None:
+            modules[key]['implementations'] = json.loads(implementations)
+    return modules
+
+
+def get_summaries(redis_cache, generation, keys: list) -> list:
+    """Get summaries of the modules stored under name@revision/organization keys in specified
+    generation using one HMGET request for the hashes and one HMGET request for the summaries.
+    Whole modules are read if no generation was published yet or if summary of the module is missing.
+    None is returned in place of each module which is not part of the generation.
+    """
+    if len(keys) == 0:
+        return []
+    if generation is None:
+        return [None if module is None else module_summary(json.loads(module))
+                for module in get_modules(redis_cache, generation, keys)]
+    digests = redis_cache.hmget(generation_key(generation, modules_map), keys)
+    found = [digest for digest in digests if digest is not None]
+    stored = iter(redis_cache.hmget(redis_module_summaries_key, found) if found else [])
+    summaries = []
+    missing = []
+    for i, digest in enumerate(digests):
+        summary = None if digest is None else next(stored)
+        if digest is not None and summary is None:
+            # Summary was not written or it was deleted meanwhile
+            missing.append(i)
+        summaries.append(None if summary is None else json.loads(summary))
+    if missing:
+        modules = get_modules(redis_cache, generation, [keys[i] for i in missing])
+        for i, module in zip(missing, modules):
+            summaries[i] = None if module is None else module_summary(json.loads(module))
+    return summaries
+
+
+class CatalogPublisher:
+    """Writer of a new catalog generation which receives modules and vendors one by one,
+    so whole catalog does not need to be kept in memory. Modules are written through
+    pipeline in bounded chunks, aggregated catalog data are appended to as they come.
+    New generation is visible to the readers only after it is published.
+    Publish lock is held from the creation of the publisher until it is published or discarded,
+    so publisher must always be either published or discarded.
+    """
+
+    def __init__(self, redis_cache, keep: int = 2, chunk_size: int = 1000, codec=None,
+                 training_samples: int = 1000):
+        """
+        Arguments:
+            :param redis_cache      (Redis) Redis client
+            :param keep             (int) number of published generations which are kept
+            :param chunk_size       (int) maximum number of commands sent to Redis in one pipeline
+            :param codec            (obj) codec used to encode modules - ZlibCodec with stored dictionary by default
+            :param training_samples (int) number of modules the dictionary is trained on if there is none stored yet
+        """
+        self.__redis = redis_cache
+        self.__keep = keep
+        self.__chunk_size = chunk_size
+        self.__codec = codec if codec is not None else stored_codec(redis_cache)
+        self.__training_samples = training_samples
+        # Published generations must not change until this generation is published, otherwise
+        # modules known from them may be deleted before new generation is published
+        self.__lock = acquire_lock(redis_cache, redis_catalog_publish_lock_key, publish_lock_timeout)
+        # Modules waiting for the dictionary to be trained
+        self.__untrained = []
+        self.generation = redis_cache.incr(redis_generation_counter_key)
+        self.written = 0
+        self.__known_digests = set()
+        self.__known_implementations = set()
+        for kept in redis_cache.lrange(redis_catalog_generations_key, -keep, -1):
+            self.__known_digests.update(redis_cache.hvals(generation_key(int(kept), modules_map)))
+            self.__known_implementations.update(redis_cache.hvals(generation_key(int(kept), implementations_map)))
+        # Modules written without summary are written again
+        self.__known_digests.intersection_update(redis_cache.hkeys(redis_module_summaries_key))
+        self.__pipe = redis_cache.pipeline(transaction=False)
+        self.__containers = []
+        self.__count = 0
+        self.__pipe.set(generation_key(self.generation, 'all-catalog-data'), '{"yang-catalog:catalog": {')
+
+    def add_module(self, module: dict):
+        """Add module to the new generation."""
+        self.__append('modules', 'module', module)
+        if self.__codec is None:
+            self.__untrained.append(module)
+            if len(self.__untrained) >= self.__training_samples:
+                self.__train()
+        else:
+            self.__write_module(module)
+        self.__flush()
+
+    def add_vendor(self, vendor: dict):
+        """Add vendor to the new generation."""
+        self.__append('vendors', 'vendor', vendor)
+        self.__flush()
+
+    def publish(self):
+        """Publish new generation by single write of the generation pointer.
+        Generations older than @keep published generations are deleted afterwards.
+        ValueError is raised and new generation is deleted if newer generation was published
+        meanwhile, which happens only if the publish lock expired.
+
+        :return tuple of published generation and number of written modules
+        """
+        try:
+            if self.__codec is None:
+                self.__train()
+            self.__close_container()
+            for container in ('modules', 'vendors'):
+                if container not in self.__containers:
+                    self.__pipe.set(generation_key(self.generation, '{}-data'.format(container)), '{}')
+            self.__pipe.append(generation_key(self.generation, 'all-catalog-data'), '}}')
+            self.__pipe.execute()
+
+            published = current_generation(self.__redis)
+            if published is not None and published > self.generation:
+                self.__delete()
+                raise ValueError('Newer catalog generation {} was published meanwhile'.format(published))
+            # Readers resolve pointer, so they see either old or new generation
+            self.__redis.set(redis_catalog_generation_key, self.generation)
+            if not self.__redis.exists(redis_catalog_generations_key):
+                delete_legacy_keys(self.__redis, self.__chunk_size)
+            self.__redis.rpush(redis_catalog_generations_key, self.generation)
+            # Let workers drop modules cached from the previous generations
+            self.__redis.publish(redis_catalog_channel, self.generation)
+            drop_generations(self.__redis, self.__keep, self.__chunk_size)
+            return self.generation, self.written
+        finally:
+            release_lock(self.__redis, redis_catalog_publish_lock_key, self.__lock)
+
+    def discard(self):
+        """Delete everything written to the new generation which is not used by the published generations."""
+        try:
+            self.__delete()
+        finally:
+            release_lock(self.__redis, redis_catalog_publish_lock_key, self.__lock)
+
+    def __delete(self):
+        self.__pipe.execute()
+        kept = [int(generation) for generation in self.__redis.lrange(redis_catalog_generations_key, -self.__keep, -1)]
+        delete_generation(self.__redis, self.generation, kept, self.__chunk_size)
+
+    def __append(self, container: str, item: str, element: dict):
+        catalog_key = generation_key(self.generation, 'all-catalog-data')
+        data_key = generation_key(self.generation, '{}-data'.format(container))
+        if len(self.__containers) == 0 or self.__containers[-1] != container:
+            self.__close_container()
+            self.__pipe.set(data_key, '{{"{}": ['.format(item))
+            self.__pipe.append(catalog_key, '{}"{}": {{"{}": ['.format(', ' if self.__containers else '',
+                                                                     container, item))
+            self.__containers.append(container)
+            self.__count = 0
+        value = '{}{}'.format(', ' if self.__count else '', json.dumps(element))
+        self.__pipe.append(data_key, value)
+        self.__pipe.append(catalog_key, value)
+        self.__count += 1
+
+    def __close_container(self):
+        if self.__containers:
+            self.__pipe.append(generation_key(self.generation, '{}-data'.format(self.__containers[-1])), ']}')
+            self.__pipe.append(generation_key(self.generation, 'all-catalog-data'), ']}')
+
+    def __train(self):
+        self.__codec = store_dictionary(self.__redis, train_dictionary(self.__untrained))
+        for module in self.__untrained:
+            self.__write_module(module)
+            self.__flush()
+        self.__untrained = []
+
+    def __write_module(self, module: dict):
+        key = module_key(module)
+        document = dict(module)
+        implementations = document.pop('implementations', None)
+        if implementations is not None:
+            value = json.dumps(implementations, separators=(',', ':'))
+            digest = hashlib.sha1(value.encode('utf-8')).hexdigest()
+            if digest.encode('utf-8') not in self.__known_implementations:
+                self.__known_implementations.add(digest.encode('utf-8'))
+                self.__pipe.set(implementations_content_key(digest), encode_module(self.__codec, value))
+            self.__pipe.hset(generation_key(self.generation, implementations_map), mapping={key: digest})
+        value = json.dumps(document, separators=(',', ':'))
+        digest = hashlib.sha1(value.encode('utf-8')).hexdigest()
+        if digest.encode('utf-8') not in self.__known_digests:
+            self.__known_digests.add(digest.encode('utf-8'))
+            self.__pipe.set(module_content_key(digest), encode_module(self.__codec, value))
+            summary = json.dumps(module_summary(module), separators=(',', ':'))
+            self.__pipe.hset(redis_module_summaries_key, mapping={digest: summary})
+            self.written += 1
+        # Module is mapped in the same pipeline as its content, so discarded generation can find it
+        self.__pipe.hset(generation_key(self.generation, modules_map), mapping={key: digest})
+
+    def __flush(self):
+        if len(self.__pipe) >= self.__chunk_size:
+            self.__pipe.execute()
+
+
+def publish_catalog(redis_cache, modules: dict, vendors: dict, keep: int = 2, chunk_size: int = 1000, codec=None):
+    """Write new catalog generation and publish it by single write of the generation pointer.
+    Generations older than @keep published generations are deleted afterwards.
+
+    Arguments:
+        :param redis_cache      (Redis) Redis client
+        :param modules          (dict) modules container of the catalog
+        :param vendors          (dict) vendors container of the catalog
+        :param keep             (int) number of published generations which are kept
+        :param chunk_size       (int) maximum number of commands sent to Redis in one pipeline
+        :param codec            (obj) codec used to encode modules - ZlibCodec with stored dictionary by default
+        :return tuple of published generation and number of written modules
+    """
+    publisher = CatalogPublisher(redis_cache, keep, chunk_size, codec)
+    try:
+        for module in modules.get('module', []):
+            publisher.add_module(module)
+        for vendor in vendors.get('vendor', []):
+            publisher.add_vendor(vendor)
+    except Exception:
+        publisher.discard()
+        raise
+    return publisher.publish()
+
+
+def publish_catalog_stream(redis_cache, chunks, keep: int = 2, chunk_size: int = 1000, codec=None):
+    """Write new catalog generation while the catalog in RESTCONF JSON format is being read
+    and publish it, so only one module or vendor at a time is kept in memory.
+    Everything written is deleted again if the catalog can not be read. ValueError is raised
+    if the catalog does not contain any modules or vendors, e.g. error returned instead of it.
+
+    Arguments:
+        :param redis_cache      (Redis) Redis client
+        :param chunks           (iterable) chunks of the catalog, e.g. response.iter_content()
+        :param keep             (int) number of published generations which are kept
+        :param chunk_size       (int) maximum number of commands sent to Redis in one pipeline
+        :param codec            (obj) codec used to encode modules - ZlibCodec with stored dictionary by default
+        :return tuple of published generation and number of written modules
+    """
+    publisher = CatalogPublisher(redis_cache, keep, chunk_size, codec)
+    found = 0
+    try:
+        for path, element in iter_elements(chunks, (catalog_modules_path, catalog_vendors_path)):
+            if path == catalog_modules_path:
+                publisher.add_module(element)
+            else:
+                publisher.add_vendor(element)
+            found += 1
+        if found == 0:
+            # Empty generation would replace the published catalog for all the readers
+            raise ValueError('Catalog does not contain any modules or vendors')
+    except Exception:
+        publisher.discard()
+        raise
+    return publisher.publish()
+
+
+def refresh_catalog(redis_cache, load, timeout: int = 3600) -> bool:
+    """Load the catalog by the load function unless other process is already loading it.
+    Only the lock stored in Redis is held while the catalog is loaded, so processes forked
+    meanwhile do not inherit any lock held by the loading thread.
+
+    Arguments:
+        :param redis_cache  (Redis) Redis client
+        :param load         (function) loads the catalog and publishes it as new generation
+        :param timeout      (int) seconds after which the lock expires if the process died
+        :return whether the catalog was loaded by this process
+    """
+    lock = acquire_lock(redis_cache, redis_catalog_refresh_lock_key, timeout, blocking=False)
+    if lock is None:
+        return False
+    try:
+        load()
+    finally:
+        release_lock(redis_cache, redis_catalog_refresh_lock_key, lock)
+    return True
+
+
+def rollback_catalog(redis_cache):
+    """Publish previously published generation again and drop the current one.
+    None is returned if there is no previous generation.
+    """
+    lock = acquire_lock(redis_cache, redis_catalog_publish_lock_key, publish_lock_timeout)
+    try:
+        generations = redis_cache.lrange(redis_catalog_generations_key, -2, -1)
+        if len(generations) < 2:
+            return None
+        previous, current = int(generations[0]), int(generations[1])
+        redis_cache.set(redis_catalog_generation_key, previous)
+        redis_cache.rpop(redis_catalog_generations_key)
+        redis_cache.publish(redis_catalog_channel, previous)
+        delete_generation(redis_cache, current, [previous])
+        return previous
+    finally:
+        release_lock(redis_cache, redis_catalog_publish_lock_key, lock)
+
+
+def drop_generations(redis_cache, keep: int, chunk_size: int = 1000):
+    """Delete all but @keep last published generations."""
+    generations = [int(generation) for generation in redis_cache.lrange(redis_catalog_generations_key, 0, -1)]
+    if len(generations) <= keep:
+        return
+    redis_cache.ltrim(redis_catalog_generations_key, -keep, -1)
+    for generation in generations[:-keep]:
+        delete_generation(redis_cache, generation, generations[-keep:], chunk_size)
+
+
+def delete_generation(redis_cache, generation: int, kept_generations: list, chunk_size: int = 1000):
+    """Delete keys of the generation and modules and implementations which are not used
+    by any of the kept generations.
+    """
+    unused = __unused_digests(redis_cache, generation, kept_generations, modules_map)
+    for i in range(0, len(unused), chunk_size):
+        redis_cache.delete(*[module_content_key(digest) for digest in unused[i:i + chunk_size]])
+        redis_cache.hdel(redis_module_summaries_key, *unused[i:i + chunk_size])
+    unused = __unused_digests(redis_cache, generation, kept_generations, implementations_map)
+    for i in range(0, len(unused), chunk_size):
+        redis_cache.delete(*[implementations_content_key(digest) for digest in unused[i:i + chunk_size]])
+    redis_cache.delete(*[generation_key(generation, key)
+                         for key in catalog_keys + (modules_map, implementations_map)])
+
+
+def __unused_digests(redis_cache, generation: int, kept_generations: list, map_name: str) -> list:
+    kept_digests = set()
+    for kept in kept_generations:
+        kept_digests.update(redis_cache.hvals(generation_key(kept, map_name)))
+    return list(set(redis_cache.hvals(generation_key(generation, map_name))) - kept_digests)
+
+
+def delete_legacy_keys(redis_cache, chunk_size: int = 1000):
+    """Delete catalog data stored before catalog generations were introduced."""
+    if redis_cache.exists(redis_module_keys_key):
+        legacy_keys = list(redis_cache.smembers(redis_module_keys_key))
+    else:
+        legacy_keys = list(redis_cache.scan_iter(match='*@*/*'))
+    legacy_keys.extend(catalog_keys + (redis_module_keys_key, redis_module_hashes_key))
+    for i in range(0, len(legacy_keys), chunk_size):
+        redis_cache.delete(*legacy_keys[i:i + chunk_size])
@@ -38,6 +38,7 @@ from os import unlink
 
 import utility.log as lo
 from dateutil.parser import parse
+from utility.jobStore import JobStore
 from utility.util import job_log
 from elasticsearch import Elasticsearch
 
@@ -109,23 +110,9 @@ if __name__ == '__main__':
                 except:
                     pass
 
-        LOGGER.info('Removing old correlation ids')
-        # removing correlation ids from file that are older than a day
-        # Be lenient to missing files
-        try:
-            f = open('{}/correlation_ids'.format(temp_dir), 'r')
-            lines = f.readlines()
-            f.close()
-        except IOError:
-            lines = []
-        with open('{}/correlation_ids'.format(temp_dir), 'w') as f:
-            for line in lines:
-                line_datetime = line.split(' -')[0]
-                t = datetime.datetime.strptime(line_datetime,
-                                            "%a %b %d %H:%M:%S %Y")
-                diff = datetime.datetime.now() - t
-                if diff.days == 0:
-                    f.write(line)
+        LOGGER.info('Removing old jobs')
+        # removing jobs that were not updated for more than a day
+        JobStore(temp_dir).remove_older_than(cutoff)
         #LOGGER.info('Removing old elasticsearch snapshots')
         #if es_aws == 'True':
         #    es = Elasticsearch([es_host], http_auth=(elk_credentials[0], elk_credentials[1]), scheme='https', port=443)
@@ -9,3 +9,26 @@ json_header_str = 'application/json'
 json_content_type = {'Content-type': json_header_str}
 json_accept = {'Accept': json_header_str}
 json_headers = {**json_content_type, **json_accept}
+
+# RabbitMQ queues of the receiver jobs by their priority class
+job_queues = {
+    'interactive': 'module_queue_interactive',
+    'normal': 'module_queue',
+    'bulk': 'module_queue_bulk'
+}
+dead_letter_queue = 'module_queue_dead_letter'
+
+# Redis keys
+redis_catalog_generation_key = 'catalog-generation'
+redis_catalog_generations_key = 'catalog-generations'
+redis_catalog_seed_lock_key = 'catalog-seed-lock'
+redis_catalog_refresh_lock_key = 'catalog-refresh-lock'
+redis_catalog_publish_lock_key = 'catalog-publish-lock'
+# Channel of the messages about newly published catalog generations
+redis_catalog_channel = 'catalog-changes'
+redis_generation_counter_key = 'catalog-generation-counter'
+redis_module_dictionary_key = 'module-dictionary'
+redis_module_summaries_key = 'module-summaries'
+# Keys used before catalog generations were introduced
+redis_module_keys_key = 'module-keys'
+redis_module_hashes_key = 'module-hashes'
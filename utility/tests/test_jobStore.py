@@ -0,0 +1,92 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+from utility.jobStore import JobStore
+
+
+class TestJobStoreClass(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_set_and_get(self):
+        """Test if status of the job is replaced and other processes can read it.
+        """
+        jobs = JobStore(self.temp_dir.name)
+        jobs.set('1b6b8c5c', 'In progress')
+        jobs.set('1b6b8c5c', 'Failed#split#Server error')
+
+        self.assertEqual(JobStore(self.temp_dir.name).get('1b6b8c5c'), 'Failed#split#Server error')
+        self.assertIsNone(jobs.get('7d14ba29'))
+
+    def test_read_while_writing(self):
+        """Test if status can be read while other process holds write transaction open.
+        """
+        jobs = JobStore(self.temp_dir.name, timeout=0.1)
+        jobs.set('1b6b8c5c', 'In progress')
+        writer = sqlite3.connect(jobs.path, isolation_level=None)
+        writer.execute('BEGIN EXCLUSIVE')
+        writer.execute("UPDATE jobs SET status = 'Finished successfully'")
+
+        self.assertEqual(jobs.get('1b6b8c5c'), 'In progress')
+        writer.execute('COMMIT')
+        writer.close()
+        self.assertEqual(jobs.get('1b6b8c5c'), 'Finished successfully')
+
+    def test_remove_older_than(self):
+        """Test if only the jobs not updated since the cutoff are removed.
+        """
+        jobs = JobStore(self.temp_dir.name)
+        jobs.set('1b6b8c5c', 'Finished successfully')
+        cutoff = time.time() + 1
+
+        self.assertEqual(jobs.remove_older_than(cutoff - 86400), 0)
+        self.assertEqual(jobs.remove_older_than(cutoff), 1)
+        self.assertIsNone(jobs.get('1b6b8c5c'))
+
+    def test_migrate(self):
+        """Test if jobs from the correlation_ids file are imported and the file is removed.
+        """
+        path = os.path.join(self.temp_dir.name, 'correlation_ids')
+        created = datetime.now().ctime()
+        with open(path, 'w') as f:
+            f.write('{} -- 1b6b8c5c - In progress\n'.format(created))
+            f.write('{} -- 7d14ba29 - Failed#split#Server error - could not create directory\n'.format(created))
+            f.write('corrupted line\n')
+
+        jobs = JobStore(self.temp_dir.name)
+
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(jobs.get('1b6b8c5c'), 'In progress')
+        self.assertEqual(jobs.get('7d14ba29'), 'Failed#split#Server error - could not create directory')
+        self.assertEqual(jobs.remove_older_than(time.time() - 86400), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import json
+import unittest
+
+from utility.jsonStream import iter_elements
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestJsonStreamClass(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestJsonStreamClass, self).__init__(*args, **kwargs)
+        self.modules_path = ('yang-catalog:catalog', 'modules', 'module')
+        self.vendors_path = ('yang-catalog:catalog', 'vendors', 'vendor')
+        self.catalog = {
+            'yang-catalog:catalog': {
+                'count': 12345,
+                'modules': {'module': [{'name': 'module-{}'.format(i), 'description': 'Ä "quoted"'}
+                                       for i in range(20)]},
+                'vendors': {'vendor': [{'name': 'cisco'}, {'name': 'huawei'}]}
+            }
+        }
+
+    def test_iter_elements(self):
+        data = json.dumps(self.catalog, indent=2).encode('utf-8')
+        catalog = self.catalog['yang-catalog:catalog']
+
+        # Chunks split strings, numbers and multi-byte characters
+        for size in (1, 7, len(data)):
+            elements = list(iter_elements(chunked(data, size), [self.modules_path, self.vendors_path]))
+            modules = [element for path, element in elements if path == self.modules_path]
+            vendors = [element for path, element in elements if path == self.vendors_path]
+
+            self.assertEqual(modules, catalog['modules']['module'])
+            self.assertEqual(vendors, catalog['vendors']['vendor'])
+
+    def test_iter_elements_empty(self):
+        self.assertEqual(list(iter_elements([b'{"yang-catalog:catalog": {}}'], [self.modules_path])), [])
+        self.assertEqual(list(iter_elements([b'{"yang-catalog:catalog": {"modules": {"module": []}}}'],
+                                            [self.modules_path])), [])
+
+    def test_iter_elements_invalid(self):
+        data = json.dumps(self.catalog).encode('utf-8')
+
+        for invalid in (b'', data[:-20], data + b'}'):
+            with self.assertRaises(ValueError):
+                list(iter_elements(chunked(invalid, 16), [self.modules_path]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import json
+import unittest
+
+from utility import moduleCodec
+from utility.moduleCodec import (decode_module, encode_module, load_codec,
+                                 train_dictionary)
+
+
+class RedisStore:
+    """In-memory store with the subset of Redis commands used by utility.moduleCodec."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+
+class TestModuleCodecClass(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestModuleCodecClass, self).__init__(*args, **kwargs)
+        implementation = {'vendor': 'cisco', 'platform': 'ncs5500', 'software-version': '7.0.1',
+                          'software-flavor': 'ALL', 'os-version': '7.0.1', 'feature-set': 'ALL',
+                          'os-type': 'IOS-XR', 'conformance-type': 'implement'}
+        self.modules = [
+            {'name': 'Cisco-IOS-XR-module-{}'.format(i), 'revision': '2019-04-05', 'organization': 'cisco',
+             'implementations': {'implementation': [dict(implementation, platform='ncs{}'.format(j))
+                                                    for j in range(20)]}}
+            for i in range(20)
+        ]
+
+    def setUp(self):
+        moduleCodec.dictionaries.clear()
+
+    def test_encode_decode(self):
+        store = RedisStore()
+        codec = load_codec(store, self.modules)
+        value = json.dumps(self.modules[0], separators=(',', ':'))
+
+        encoded = encode_module(codec, value)
+
+        self.assertLess(len(encoded), len(value) / 4)
+        # Other worker loads the dictionary from Redis
+        moduleCodec.dictionaries.clear()
+        self.assertEqual(decode_module(store, encoded), value.encode('utf-8'))
+
+    def test_dictionary_trained_once(self):
+        store = RedisStore()
+        codec = load_codec(store, self.modules)
+
+        self.assertEqual(load_codec(store, []).dictionary_id, codec.dictionary_id)
+        self.assertLessEqual(len(train_dictionary(self.modules, size=100)), 100)
+
+    def test_decode_plain_json(self):
+        value = json.dumps(self.modules[0]).encode('utf-8')
+
+        self.assertEqual(decode_module(RedisStore(), value), value)
+        self.assertIsNone(decode_module(RedisStore(), None))
+        with self.assertRaises(ValueError):
+            decode_module(RedisStore(), b'\xffunknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,401 @@
+# Copyright The IETF Trust 2021, All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Slavomir Mazur"
+__copyright__ = "Copyright The IETF Trust 2021, All Rights Reserved"
+__license__ = "Apache License, Version 2.0"
+__email__ = "slavomir.mazur@pantheon.tech"
+
+import json
+import os
+import signal
+import threading
+import time
+import unittest
+from unittest import mock
+
+from utility.redisCatalog import (CatalogPublisher, attach_implementations,
+                                  current_generation, get_catalog_data,
+                                  get_module, get_module_keys, get_modules,
+                                  get_summaries, publish_catalog,
+                                  publish_catalog_stream, refresh_catalog,
+                                  rollback_catalog)
+from utility.staticVariables import (redis_catalog_channel,
+                                     redis_catalog_publish_lock_key,
+                                     redis_module_keys_key,
+                                     redis_module_summaries_key)
+
+
+def encode(value):
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode('utf-8')
+
+
+def decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class RedisStore:
+    """In-memory store with the subset of Redis commands used by utility.redisCatalog."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+        self.messages = []
+
+    def pipeline(self, transaction=True):
+        return PipelineStore(self)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(decode(key)) for key in keys]
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.commands.append(('set', key))
+        self.data[key] = encode(value)
+        return True
+
+    def append(self, key, value):
+        self.data[key] = self.data.get(key, b'') + encode(value)
+
+    def incr(self, key):
+        self.data[key] = encode(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(decode(key), None)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def hmget(self, key, fields):
+        return [self.data.get(key, {}).get(decode(field)) for field in fields]
+
+    def hvals(self, key):
+        return list(self.data.get(key, {}).values())
+
+    def hkeys(self, key):
+        return [field.encode('utf-8') for field in self.data.get(key, {})]
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.data.get(key, {}).pop(decode(field), None)
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update({field: encode(value) for field, value in mapping.items()})
+
+    def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(encode(member) for member in members)
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def rpush(self, key, value):
+        self.data.setdefault(key, []).append(encode(value))
+
+    def rpop(self, key):
+        return self.data[key].pop()
+
+    def lrange(self, key, start, end):
+        values = self.data.get(key, [])
+        start = max(len(values) + start, 0) if start < 0 else start
+        end = len(values) + end if end < 0 else end
+        return values[start:end + 1]
+
+    def ltrim(self, key, start, end):
+        self.data[key] = self.lrange(key, start, end)
+
+    def publish(self, channel, message):
+        self.commands.append(('publish', channel))
+        self.messages.append((channel, encode(message)))
+
+    def scan_iter(self, match):
+        return [key.encode('utf-8') for key in list(self.data) if '@' in key and '/' in key]
+
+
+class PipelineStore:
+
+    def __init__(self, store: RedisStore):
+        self.store = store
+        self.stack = []
+
+    def __len__(self):
+        return len(self.stack)
+
+    def set(self, key, value):
+        self.stack.append((self.store.set, key, value))
+
+    def hset(self, key, mapping):
+        self.stack.append((self.store.hset, key, mapping))
+
+    def append(self, key, value):
+        self.stack.append((self.store.append, key, value))
+
+    def execute(self):
+        for command, key, value in self.stack:
+            command(key, value)
+        self.stack = []
+
+
+class TestRedisCatalogClass(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestRedisCatalogClass, self).__init__(*args, **kwargs)
+        self.modules = [
+            {'name': 'yang-catalog', 'revision': '2018-04-03', 'organization': 'ietf'},
+            {'name': 'yang-catalog', 'revision': '2017-09-26', 'organization': 'ietf'}
+        ]
+
+    def publish(self, store: RedisStore, modules: list):
+        catalog = {'modules': {'module': modules}, 'vendors': {}}
+        return publish_catalog(store, catalog['modules'], catalog['vendors'])
+
+    def module_sets(self, store: RedisStore):
+        return [key for _, key in store.commands if key.startswith('module:')]
+
+    def test_publish_catalog(self):
+        store = RedisStore()
+
+        self.assertIsNone(current_generation(store))
+        self.assertEqual(self.publish(store, self.modules), (1, 2))
+        self.assertEqual(current_generation(store), 1)
+        self.assertEqual(json.loads(get_catalog_data(store, 1, 'modules-data')), {'module': self.modules})
+        self.assertEqual(store.messages, [(redis_catalog_channel, b'1')])
+        self.assertEqual(json.loads(get_module(store, 1, 'yang-catalog@2018-04-03/ietf')), self.modules[0])
+        self.assertIsNone(get_module(store, 1, 'yang-catalog@2016-01-01/ietf'))
+
+        self.assertEqual(sorted(get_module_keys(store, 1)),
+                         ['yang-catalog@2017-09-26/ietf', 'yang-catalog@2018-04-03/ietf'])
+        modules = get_modules(store, 1, ['yang-catalog@2017-09-26/ietf', 'missing@2016-01-01/ietf'])
+        self.assertEqual(json.loads(modules[0]), self.modules[1])
+        self.assertIsNone(modules[1])
+
+    def test_publish_catalog_writes_only_changed(self):
+        store = RedisStore()
+        self.publish(store, self.modules)
+        store.commands = []
+
+        changed = dict(self.modules[0], description='changed')
+        self.assertEqual(self.publish(store, [changed, self.modules[1]]), (2, 1))
+
+        self.assertEqual(len(self.module_sets(store)), 1)
+        # Previous generation is still readable until it is dropped
+        self.assertEqual(json.loads(get_module(store, 1, 'yang-catalog@2018-04-03/ietf')), self.modules[0])
+        self.assertEqual(json.loads(get_module(store, 2, 'yang-catalog@2018-04-03/ietf')), changed)
+
+    def test_publish_catalog_drops_old_generations(self):
+        store = RedisStore()
+        self.publish(store, self.modules)
+        self.publish(store, self.modules[:1])
+        self.publish(store, self.modules[:1])
+
+        self.assertEqual(current_generation(store), 3)
+        self.assertNotIn('catalog:1:modules-data', store.data)
+        self.assertNotIn('catalog:1:modules', store.data)
+        self.assertIsNotNone(get_module(store, 2, 'yang-catalog@2018-04-03/ietf'))
+        # Module which is not part of any kept generation is deleted
+        self.assertEqual(len([key for key in store.data if key.startswith('module:')]), 1)
+
+    def test_get_summaries(self):
+        store = RedisStore()
+        modules = [dict(self.modules[0], namespace='urn:ietf', dependents=[{'name': 'a'}, {'name': 'b'}]),
+                   self.modules[1]]
+        self.publish(store, modules)
+
+        summaries = get_summaries(store, 1, ['yang-catalog@2018-04-03/ietf', 'missing@2016-01-01/ietf'])
+
+        self.assertEqual(summaries, [{'namespace': 'urn:ietf', 'dependents': 2}, None])
+        self.assertEqual(len(store.data[redis_module_summaries_key]), 2)
+
+        # Summaries of the modules which are not part of any kept generation are deleted
+        self.publish(store, modules[:1])
+        self.publish(store, modules[:1])
+        self.assertEqual(len(store.data[redis_module_summaries_key]), 1)
+
+    def test_get_summaries_missing(self):
+        store = RedisStore()
+        modules = [dict(self.modules[0], namespace='urn:ietf'), self.modules[1]]
+        self.publish(store, modules)
+        store.hdel(redis_module_summaries_key, *list(store.data[redis_module_summaries_key]))
+
+        summaries = get_summaries(store, 1, ['missing@2016-01-01/ietf', 'yang-catalog@2018-04-03/ietf',
+                                             'yang-catalog@2017-09-26/ietf'])
+
+        # Modules are read whole if their summaries are missing
+        self.assertEqual(summaries, [None, {'namespace': 'urn:ietf', 'dependents': 0}, {'dependents': 0}])
+
+    def test_publish_catalog_implementations(self):
+        store = RedisStore()
+        implementations = {'implementation': [{'vendor': 'cisco', 'platform': 'asr1k'}]}
+        modules = [dict(self.modules[0], implementations=implementations), self.modules[1]]
+        self.publish(store, modules)
+
+        module = json.loads(get_module(store, 1, 'yang-catalog@2018-04-03/ietf'))
+        self.assertNotIn('implementations', module)
+        attached = attach_implementations(store, 1, {'yang-catalog@2018-04-03/ietf': module,
+                                                     'yang-catalog@2017-09-26/ietf': dict(self.modules[1])})
+        self.assertEqual(attached['yang-catalog@2018-04-03/ietf'], modules[0])
+        self.assertEqual(attached['yang-catalog@2017-09-26/ietf'], self.modules[1])
+
+        # Implementations which are not part of any kept generation are deleted
+        self.publish(store, self.modules)
+        self.publish(store, self.modules)
+        self.assertEqual([key for key in store.data if key.startswith('implementations:')], [])
+
+    def test_publish_catalog_stream(self):
+        store = RedisStore()
+        catalog = {'yang-catalog:catalog': {'modules': {'module': self.modules},
+                                            'vendors': {'vendor': [{'name': 'cisco'}]}}}
+        data = json.dumps(catalog).encode('utf-8')
+
+        generation, written = publish_catalog_stream(store, (data[i:i + 10] for i in range(0, len(data), 10)),
+                                                     chunk_size=3)
+
+        self.assertEqual((generation, written), (1, 2))
+        self.assertEqual(json.loads(get_catalog_data(store, 1, 'all-catalog-data')), catalog)
+        self.assertEqual(json.loads(get_catalog_data(store, 1, 'modules-data')), {'module': self.modules})
+        self.assertEqual(json.loads(get_catalog_data(store, 1, 'vendors-data')), {'vendor': [{'name': 'cisco'}]})
+        self.assertEqual(json.loads(get_module(store, 1, 'yang-catalog@2017-09-26/ietf')), self.modules[1])
+
+    def test_publish_catalog_stream_discarded(self):
+        store = RedisStore()
+        self.publish(store, self.modules[:1])
+        catalog = {'yang-catalog:catalog': {'modules': {'module': self.modules}}}
+        data = json.dumps(catalog).encode('utf-8')
+
+        with self.assertRaises(ValueError):
+            publish_catalog_stream(store, [data[:-10]], chunk_size=1)
+
+        self.assertEqual(current_generation(store), 1)
+        self.assertEqual([key for key in store.data if key.startswith('catalog:2:')], [])
+        self.assertEqual(len([key for key in store.data if key.startswith('module:')]), 1)
+
+    def test_publish_catalog_stream_empty(self):
+        store = RedisStore()
+        self.publish(store, self.modules[:1])
+        error = {'errors': {'error': [{'error-type': 'application', 'error-tag': 'operation-failed'}]}}
+
+        with self.assertRaises(ValueError):
+            publish_catalog_stream(store, [json.dumps(error).encode('utf-8')])
+
+        self.assertEqual(current_generation(store), 1)
+        self.assertEqual([key for key in store.data if key.startswith('catalog:2:')], [])
+
+    @mock.patch('utility.redisCatalog.lock_poll_interval', 0.01)
+    def test_publish_catalog_concurrent(self):
+        store = RedisStore()
+        self.publish(store, self.modules)
+        first = CatalogPublisher(store)
+        second = []
+        thread = threading.Thread(target=lambda: second.append(CatalogPublisher(store)))
+        thread.start()
+        thread.join(0.2)
+
+        # Second publisher waits until the first one is published and old generations are dropped
+        self.assertEqual(second, [])
+        first.add_module(self.modules[0])
+        self.assertEqual(first.publish(), (2, 0))
+        thread.join(10)
+        second[0].add_module(self.modules[1])
+        self.assertEqual(second[0].publish(), (3, 0))
+
+        self.assertEqual(json.loads(get_module(store, 3, 'yang-catalog@2017-09-26/ietf')), self.modules[1])
+        self.assertNotIn(redis_catalog_publish_lock_key, store.data)
+
+    def test_publish_catalog_newer_published(self):
+        store = RedisStore()
+        self.publish(store, self.modules[:1])
+        stale = CatalogPublisher(store)
+        stale.add_module(self.modules[1])
+        # Lock of the stale publisher expired and other publisher published newer generation
+        store.delete(redis_catalog_publish_lock_key)
+        self.publish(store, self.modules[:1])
+
+        with self.assertRaises(ValueError):
+            stale.publish()
+
+        self.assertEqual(current_generation(store), 3)
+        self.assertEqual([key for key in store.data if key.startswith('catalog:2:')], [])
+        self.assertIsNotNone(get_module(store, 3, 'yang-catalog@2018-04-03/ietf'))
+
+    def test_rollback_catalog(self):
+        store = RedisStore()
+        self.assertIsNone(rollback_catalog(store))
+        self.publish(store, self.modules)
+        self.publish(store, self.modules[:1])
+
+        self.assertEqual(rollback_catalog(store), 1)
+
+        self.assertEqual(current_generation(store), 1)
+        self.assertNotIn('catalog:2:modules', store.data)
+        self.assertEqual(store.messages[-1], (redis_catalog_channel, b'1'))
+        self.assertIsNotNone(get_module(store, 1, 'yang-catalog@2017-09-26/ietf'))
+
+    def test_refresh_catalog_fork(self):
+        store = RedisStore()
+        loading = threading.Event()
+        loaded = threading.Event()
+
+        def load():
+            loading.set()
+            loaded.wait(10)
+
+        thread = threading.Thread(target=refresh_catalog, args=(store, load))
+        thread.start()
+        loading.wait(10)
+        pid = os.fork()
+        if pid == 0:
+            # Forked process must not wait for the refresh running in the thread of its parent
+            os._exit(0 if refresh_catalog(store, load) is False else 1)
+        for _ in range(100):
+            exited, status = os.waitpid(pid, os.WNOHANG)
+            if exited:
+                break
+            time.sleep(0.1)
+        else:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        loaded.set()
+        thread.join()
+
+        self.assertTrue(exited)
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        # Lock is released once the refresh is over
+        self.assertTrue(refresh_catalog(store, lambda: None))
+
+    def test_publish_catalog_deletes_legacy_keys(self):
+        store = RedisStore()
+        store.set('yang-catalog@2018-04-03/ietf', json.dumps(self.modules[0]))
+        store.set('modules-data', '{}')
+        store.sadd(redis_module_keys_key, 'yang-catalog@2018-04-03/ietf')
+        self.assertEqual(json.loads(get_module(store, None, 'yang-catalog@2018-04-03/ietf')), self.modules[0])
+
+        self.publish(store, self.modules)
+
+        self.assertNotIn('yang-catalog@2018-04-03/ietf', store.data)
+        self.assertNotIn('modules-data', store.data)
+        self.assertNotIn(redis_module_keys_key, store.data)
+
+
+if __name__ == '__main__':
+    unittest.main()